@@ -13,566 +13,533 @@ Features:
 - Multi-algorithm comparison (insertion, bubble, quick sort)
 - Interactive web-based UI using Gradio
 - Comprehensive step-by-step execution trace
+
+The sorting core lives in the ``sortlab`` package and never imports Gradio;
+this module is the thin web layer on top of it. Gradio is imported and the
+Blocks UI built only when the app is launched (or ``app.demo`` is accessed),
+so importing the core names from here stays fast.
 """
 
-import gradio as gr
-import json
+import os
+import tempfile
+
+# Core API, re-exported so existing ``from app import ...`` code keeps working
+from sortlab import *  # noqa: F401,F403
+from sortlab import lab as _lab
+from sortlab import trace as _trace
+
+
+def _error_outputs(message):
+    """Output tuple that shows ``message`` as a Gradio error."""
+    import gradio as gr
+
+    return gr.Error(message), "", "", "", ""
 
 
-def parse_list(text):
+def run_lab(text, show_comparisons=True, upload=None, mode=MODE_TRACE, engine=ENGINE_LINEAR,
+            bubble_variant=BUBBLE_CLASSIC, probes=()):
     """
-    Parse comma-separated integers from user input string.
+    Gradio handler around sortlab.run_lab.
     
-    Args:
-        text (str): Comma-separated string of integers (e.g., "5, 2, 9, 1")
+    Same arguments and outputs as sortlab.run_lab, with the app's admission
+    limits (APP_LIMITS) applied. Invalid input and runs that exceed the time
+    budget are returned as a Gradio error output instead of raising.
     
     Returns:
-        list: List of parsed integers
-    
-    Raises:
-        ValueError: If any value cannot be converted to an integer
-    
-    Example:
-        >>> parse_list("5, 2, 9")
-        [5, 2, 9]
+        tuple: (summary, trace, html_dashboard, json_data, status)
     """
-    parts = text.split(",")
-    nums = []
-    
-    for p in parts:
-        p = p.strip()  # Remove leading/trailing whitespace
-        if p == "":
-            continue  # Skip empty strings
-        try:
-            nums.append(int(p))
-        except ValueError:
-            raise ValueError(f"'{p}' is not a valid integer")
-    
-    return nums
+    try:
+        return _lab.run_lab(text, show_comparisons, upload, mode, engine, bubble_variant, probes,
+                            limits=APP_LIMITS)
+    except (InputError, BudgetExceeded) as e:
+        return _error_outputs(str(e))
 
 
-def insertion_sort_with_steps(arr):
+def run_lab_stream(text, show_comparisons=True, upload=None, mode=MODE_TRACE,
+                   engine=ENGINE_LINEAR, bubble_variant=BUBBLE_CLASSIC):
     """
-    Implement insertion sort algorithm with complete step-by-step tracking.
-    
-    Algorithm:
-    - Start from index 1 (first element is trivially sorted)
-    - For each element (key), compare with sorted portion
-    - Shift larger elements right to make space
-    - Insert key in correct position
-    
-    Complexity:
-    - Time: O(n) best case, O(n²) average/worst case
-    - Space: O(1) - sorts in place
-    
-    Args:
-        arr (list): Input array of integers to sort
+    Gradio generator handler around sortlab.run_lab_stream, with APP_LIMITS.
     
-    Returns:
-        tuple: (sorted_array, steps_list, comparisons, moves, accesses)
-            - sorted_array: The sorted version of input array
-            - steps_list: List of dictionaries recording each step
-            - comparisons: Total number of element comparisons
-            - moves: Total number of array writes
-            - accesses: Total number of array read/write operations
+    Yields:
+        tuple: (summary, trace, html_dashboard, json_data, status, steps),
+            or a single error output (with ``steps`` None) for invalid input
+            or a run cancelled by its time budget
     """
-    steps = []
-    a = arr[:]  # Create a copy to avoid modifying original
-    comparisons = 0
-    moves = 0
-    array_accesses = 0
-
-    # Record initial state
-    steps.append({
-        "array": a[:],
-        "i": 0,
-        "j": 0,
-        "comparisons": comparisons,
-        "moves": moves,
-        "accesses": array_accesses,
-        "description": "Initial array",
-        "active_indices": []
-    })
-
-    # Main insertion sort loop
-    for i in range(1, len(a)):
-        key = a[i]  # Current element to insert
-        j = i - 1   # Start comparing from position before key
-        array_accesses += 1
-
-        # Shift elements greater than key to the right
-        while j >= 0:
-            comparisons += 1  # Count each comparison
-            array_accesses += 1
-            
-            if a[j] > key:
-                # Shift element right
-                a[j + 1] = a[j]
-                moves += 1
-                array_accesses += 1
-                
-                # Record this shift step
-                steps.append({
-                    "array": a[:],
-                    "i": i,
-                    "j": j,
-                    "comparisons": comparisons,
-                    "moves": moves,
-                    "accesses": array_accesses,
-                    "description": f"Shift {a[j+1]} right",
-                    "active_indices": [j, j+1]
-                })
-                j -= 1
-            else:
-                # Found correct position, stop shifting
-                break
-
-        # Insert key in correct position
-        a[j + 1] = key
-        moves += 1
-        array_accesses += 1
-        
-        # Record insertion step
-        steps.append({
-            "array": a[:],
-            "i": i,
-            "j": j + 1,
-            "comparisons": comparisons,
-            "moves": moves,
-            "accesses": array_accesses,
-            "description": f"Insert {key} at position {j+1}",
-            "active_indices": [j+1]
-        })
-
-    return a, steps, comparisons, moves, array_accesses
-
-
-def bubble_sort_comparison(arr):
+    try:
+        yield from _lab.run_lab_stream(text, show_comparisons, upload, mode, engine, bubble_variant,
+                                       limits=APP_LIMITS)
+    except (InputError, BudgetExceeded) as e:
+        yield (*_error_outputs(str(e)), None)
+
+
+def run_batch_upload(upload, show_comparisons=False, engine=ENGINE_LINEAR, export_format="csv"):
     """
-    Implement bubble sort for performance comparison with insertion sort.
-    
-    Algorithm:
-    - Compare adjacent elements
-    - Swap if they are in wrong order
-    - Repeat until array is sorted
+    Gradio handler: analyze every array in an uploaded batch file.
     
-    Complexity: O(n²) time, O(1) space
+    APP_LIMITS applies: arrays over the comparison limit get no bubble/quick
+    counters, and rows left when the time budget runs out are listed as
+    skipped in the summary.
     
     Args:
-        arr (list): Input array of integers
+        upload (str): Path of a .jsonl/.txt/.csv file with one array per line
+        show_comparisons (bool): Also count bubble sort and quicksort
+        engine (str): Key in SORT_ENGINES
+        export_format (str): One of BATCH_EXPORT_FORMATS
     
     Returns:
-        tuple: (sorted_array, comparisons, moves)
+        tuple: (summary_dict, export_path)
     """
-    a = arr[:]  # Work on copy
-    n = len(a)
-    comparisons = 0
-    moves = 0
-    
-    # Bubble sort implementation
-    for i in range(n):
-        for j in range(0, n - i - 1):
-            comparisons += 1
-            if a[j] > a[j + 1]:
-                # Swap adjacent elements
-                a[j], a[j + 1] = a[j + 1], a[j]
-                moves += 1
-    
-    return a, comparisons, moves
+    import gradio as gr
+
+    if not upload:
+        raise gr.Error("Please upload a batch file")
+    try:
+        result = run_batch(upload, show_comparisons, engine, limits=APP_LIMITS)
+    except (InputError, OSError) as e:
+        raise gr.Error(str(e))
+    path = os.path.join(tempfile.mkdtemp(prefix="sortlab-batch-"), f"batch.{export_format}")
+    result.export(path, export_format)
+    return result.summary(), path
 
 
-def quick_sort_comparison(arr):
+def append_to_session(session, text):
     """
-    Implement quicksort for performance comparison with insertion sort.
-    
-    Algorithm:
-    - Choose pivot element
-    - Partition array into elements less than, equal to, and greater than pivot
-    - Recursively sort left and right partitions
-    
-    Complexity: O(n log n) average case, O(n²) worst case, O(log n) space
-    
-    Args:
-        arr (list): Input array of integers
+    Gradio handler: append the typed values to the online session.
     
     Returns:
-        tuple: (sorted_array, comparisons, moves)
+        tuple: (session, summary, trace_of_new_insertions)
     """
-    def quicksort(a, comparisons, moves):
-        """
-        Recursive quicksort helper function.
-        """
-        if len(a) <= 1:
-            return a, comparisons, moves
-        
-        # Choose middle element as pivot
-        pivot = a[len(a) // 2]
-        left, middle, right = [], [], []
-        
-        # Partition elements
-        for x in a:
-            comparisons += 1
-            if x < pivot:
-                left.append(x)
-            elif x == pivot:
-                middle.append(x)
-            else:
-                right.append(x)
-            moves += 1
-        
-        # Recursively sort partitions
-        left, comparisons, moves = quicksort(left, comparisons, moves)
-        right, comparisons, moves = quicksort(right, comparisons, moves)
-        
-        return left + middle + right, comparisons, moves
-    
-    sorted_arr, comp, mov = quicksort(arr[:], 0, 0)
-    return sorted_arr, comp, mov
+    try:
+        return session_append(session, text)
+    except InputError as e:
+        import gradio as gr
+
+        raise gr.Error(str(e))
+
+
+def render_trace_page_for_i(steps, i, page_size=TRACE_PAGE_SIZE):
+    """Gradio handler around sortlab.render_trace_page_for_i (shows a missing ``i`` as an error)."""
+    try:
+        return _trace.render_trace_page_for_i(steps, i, page_size)
+    except ValueError as e:
+        import gradio as gr
+
+        raise gr.Error(str(e))
 
 
-def run_lab(text, show_comparisons=True):
+def export_trace(steps, codec="zlib"):
     """
-    Main orchestration function that coordinates the entire sorting analysis.
-    
-    This function:
-    1. Validates user input
-    2. Executes insertion sort with tracking
-    3. Runs bubble sort and quicksort for comparison
-    4. Calculates efficiency metrics
-    5. Formats comprehensive output for display
-    
-    Args:
-        text (str): Comma-separated integers from user input
-    
+    Gradio handler: write the current StepLog as a downloadable binary trace.
+
     Returns:
-        tuple: (summary, trace, html_dashboard, json_data, status)
-            All formatted for Gradio output components
+        str: Path of the .sltrace file
     """
-    # Input validation
-    if not text.strip():
-        return gr.Error("Please enter at least one number"), "", "", "", ""
+    import gradio as gr
 
-    try:
-        arr = parse_list(text)
-    except ValueError as e:
-        return gr.Error(f"Invalid input: {str(e)}"), "", "", "", ""
+    if not steps:
+        raise gr.Error("Run an analysis in trace mode first")
+    path = os.path.join(tempfile.mkdtemp(prefix="sortlab-trace-"), f"trace{TRACEFILE_EXTENSION}")
+    write_trace(steps, path, codec)
+    return path
 
-    if len(arr) == 0:
-        return gr.Error("Please enter at least one number"), "", "", "", ""
 
-    # Execute insertion sort with full tracking
-    sorted_arr, steps, comparisons, moves, accesses = insertion_sort_with_steps(arr)
-    
-    # Optionally execute alternative algorithms for comparison
-    bubble_comps = bubble_moves = quick_comps = quick_moves = None
-    if show_comparisons:
-        _, bubble_comps, bubble_moves = bubble_sort_comparison(arr)
-        _, quick_comps, quick_moves = quick_sort_comparison(arr)
-
-    # Build comprehensive analysis summary
-    summary_lines = [
-        "=" * 70,
-        "INSERTION SORT ANALYSIS",
-        "=" * 70,
-        f"Sorted {len(arr)} elements successfully",
-        "",
-        "RESULTS",
-        f"  Input:  {arr}",
-        f"  Output: {sorted_arr}",
-        "",
-        "PERFORMANCE METRICS",
-        f"  • Comparisons:     {comparisons:,}",
-        f"  • Array Moves:     {moves:,}",
-        f"  • Total Accesses:  {accesses:,}",
-        f"  • Total Operations: {comparisons + moves + accesses:,}",
-        "",
-                *(["ALGORITHM COMPARISON",
-                     f"  ┌─ Insertion Sort  → {comparisons} comparisons, {moves} moves",
-                     f"  ├─ Bubble Sort     → {bubble_comps} comparisons, {bubble_moves} moves",
-                     f"  └─ Quick Sort      → {quick_comps} comparisons, {quick_moves} moves"]
-                    if show_comparisons else ["ALGORITHM COMPARISON (disabled)"]),
-        "",
-        "EFFICIENCY INSIGHTS",
-        *(
-            [
-                f"  • Insertion vs Bubble: {bubble_comps/max(comparisons,1):.2f}x comparisons",
-                f"  • Insertion vs Quick:  {quick_comps/max(comparisons,1):.2f}x comparisons",
-            ] if show_comparisons else []
-        ),
-        f"  • Best Case: O(n) when array is sorted",
-        f"  • Worst Case: O(n²) when array is reverse sorted",
-        f"  • Average Case: O(n²)",
-        "",
-        "KEY CHARACTERISTICS",
-        f"  • Adaptive: Performs well on nearly-sorted data",
-        f"  • Stable: Preserves relative order of equal elements",
-        f"  • In-place: Requires O(1) extra space",
-        f"  • Online: Can sort data as it receives it",
-        "=" * 70
-    ]
-    summary = "\n".join(summary_lines)
-
-    # Build detailed step-by-step execution trace
-    trace_lines = []
-    trace_lines.append("+" + "-" * 68 + "+")
-    trace_lines.append("| " + "STEP-BY-STEP EXECUTION TRACE".center(66) + " |")
-    trace_lines.append("+" + "-" * 68 + "+")
-    
-    for idx, step in enumerate(steps):
-        trace_lines.append(f"\n+-- STEP {idx:02d} " + "-" * 56)
-        trace_lines.append(f"| Action: {step['description']}")
-        
-        # Format array with visual separators
-        array_visual = " -> ".join(f"[{x}]" for x in step['array'])
-        trace_lines.append(f"| Array:  {array_visual}")
-        trace_lines.append(f"| Indices: i={step['i']}, j={step['j']}")
-        trace_lines.append(f"| Stats:  {step['comparisons']} comps | {step['moves']} moves | {step['accesses']} accesses")
-        trace_lines.append(f"+" + "-" * 68)
-
-    steps_text = "\n".join(trace_lines)
-
-    # Generate interactive HTML performance dashboard
-    html_viz = f"""
-    <div style="font-family: 'Arial', sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 25px; border-radius: 15px; color: white; overflow-x: auto; box-shadow: 0 8px 25px rgba(0, 0, 0, 0.15);">
-        <h3 style="margin-top: 0; font-size: 1.8em; font-weight: 600; text-shadow: 1px 1px 2px rgba(0,0,0,0.2);">ALGORITHM PERFORMANCE DASHBOARD</h3>
-        <table style="width: 100%; border-collapse: collapse; background: rgba(255,255,255,0.15); backdrop-filter: blur(10px); border-radius: 10px; overflow: hidden;">
-            <tr style="background: rgba(255,255,255,0.25); font-weight: bold; border-bottom: 2px solid rgba(255,255,255,0.3);">
-                <th style="padding: 15px; text-align: left; font-size: 1.1em;">Metric</th>
-                <th style="padding: 15px; text-align: center; font-size: 1.1em;">Insertion</th>
-                {('<th style="padding: 15px; text-align: center; font-size: 1.1em;">Bubble</th>' if show_comparisons else '')}
-                {('<th style="padding: 15px; text-align: center; font-size: 1.1em;">Quick</th>' if show_comparisons else '')}
-                <th style="padding: 15px; text-align: center; font-size: 1.1em;">Best</th>
-            </tr>
-            <tr style="border-bottom: 1px solid rgba(255,255,255,0.15);">
-                <td style="padding: 15px; font-weight: 500;"><b>Comparisons</b></td>
-                <td style="padding: 15px; text-align: center; font-weight: 600; font-size: 1.1em;">{comparisons}</td>
-                {('<td style="padding: 15px; text-align: center; font-weight: 600; font-size: 1.1em;">' + str(bubble_comps) + '</td>' if show_comparisons else '')}
-                {('<td style="padding: 15px; text-align: center; font-weight: 600; font-size: 1.1em;">' + str(quick_comps) + '</td>' if show_comparisons else '')}
-                <td style="padding: 15px; text-align: center; font-weight: 600; background: rgba(255,255,255,0.2); border-radius: 5px;">{('Insertion' if not show_comparisons else ('Insertion' if comparisons <= min(bubble_comps, quick_comps) else 'Quick' if quick_comps <= bubble_comps else 'Bubble'))}</td>
-            </tr>
-            <tr style="border-bottom: 1px solid rgba(255,255,255,0.15);">
-                <td style="padding: 15px; font-weight: 500;"><b>Array Moves</b></td>
-                <td style="padding: 15px; text-align: center; font-weight: 600; font-size: 1.1em;">{moves}</td>
-                {('<td style="padding: 15px; text-align: center; font-weight: 600; font-size: 1.1em;">' + str(bubble_moves) + '</td>' if show_comparisons else '')}
-                {('<td style="padding: 15px; text-align: center; font-weight: 600; font-size: 1.1em;">' + str(quick_moves) + '</td>' if show_comparisons else '')}
-                <td style="padding: 15px; text-align: center; font-weight: 600; background: rgba(255,255,255,0.2); border-radius: 5px;">{'Best' if moves <= min(bubble_moves, quick_moves) else ''}</td>
-            </tr>
-            <tr>
-                <td style="padding: 15px; font-weight: 500;"><b>Total Operations</b></td>
-                <td style="padding: 15px; text-align: center;"><strong style="font-size: 1.2em; color: #ffd700;">{comparisons + moves + accesses}</strong></td>
-                {('<td style="padding: 15px; text-align: center; font-weight: 600; font-size: 1.1em;">' + str(bubble_comps + bubble_moves) + '</td>' if show_comparisons else '')}
-                {('<td style="padding: 15px; text-align: center; font-weight: 600; font-size: 1.1em;">' + str(quick_comps + quick_moves) + '</td>' if show_comparisons else '')}
-                <td style="padding: 15px; text-align: center; font-size: 1.2em;">✓</td>
-            </tr>
-        </table>
-        <br>
-        <h4 style="margin: 20px 0 10px 0; font-size: 1.3em;">Algorithm Rankings:</h4>
-        <div style="background: rgba(255,255,255,0.15); padding: 15px; border-radius: 10px; margin-top: 10px; backdrop-filter: blur(5px);">
-            {('' if show_comparisons else '<p style="font-size: 1.05em;">Comparisons disabled for single-algorithm mode.</p>')}
-            {('<p style="font-size: 1.05em;"><strong>Insertion Sort wins on comparisons</strong></p>' if comparisons <= min(bubble_comps, quick_comps) else '') if show_comparisons else ''}
-            {('<p style="font-size: 1.05em;"><strong>Quick Sort is most efficient overall</strong></p>' if quick_comps + quick_moves <= comparisons + moves else '') if show_comparisons else ''}
-            <p style="font-size: 1.05em; margin-bottom: 0;">Array Size: <strong style="font-size: 1.2em; color: #ffd700;">{len(arr)}</strong> elements</p>
-        </div>
-    </div>
+def import_trace(upload, page_size=TRACE_PAGE_SIZE):
     """
+    Gradio handler: open an uploaded binary trace for paging and playback.
+
+    The file is not decoded up front: its TraceFile stays open (memory-mapped)
+    in the session state, and the paged viewer and the playback seek into it
+    one block at a time. APP_LIMITS rejects files too large to page through.
 
-    # Prepare structured data for export/analysis
-    json_data = json.dumps({
-        "original": arr,
-        "sorted": sorted_arr,
-        "insertion": {
-            "comparisons": comparisons,
-            "moves": moves,
-            "accesses": accesses
-        },
-        **({
-            "bubble": {"comparisons": bubble_comps, "moves": bubble_moves},
-            "quick": {"comparisons": quick_comps, "moves": quick_moves}
-        } if show_comparisons else {})
-    })
+    Returns:
+        tuple: (trace_page, start, metadata, trace)
+    """
+    import gradio as gr
 
-    return summary, steps_text, html_viz, json_data, "Analysis Complete"
+    if not upload:
+        raise gr.Error("Please upload a .sltrace file")
+    path = getattr(upload, "name", upload)
+    try:
+        trace = TraceFile(path)
+    except (OSError, ValueError) as e:
+        raise gr.Error(str(e))
+    try:
+        APP_LIMITS.check_trace_file(os.path.getsize(path), trace.n, trace.block_steps)
+        trace_text, start = render_trace_page(trace, 0, page_size)
+    except (OSError, ValueError) as e:
+        trace.close()
+        raise gr.Error(str(e))
+    return trace_text, start, trace.metadata, trace
 
 
 # ==================== GRADIO USER INTERFACE ====================
 
-# Create the Gradio web interface using Blocks for custom layout
-with gr.Blocks(
-    title="Insertion Sort Laboratory",
-    theme=gr.themes.Soft(
-        primary_hue="blue",
-        secondary_hue="slate",
-    ),
-    css="""
-        .gradio-container {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-            background-attachment: fixed;
-        }
-        .contain {
-            background: rgba(255, 255, 255, 0.95) !important;
-            backdrop-filter: blur(10px);
-            border-radius: 15px !important;
-            padding: 25px !important;
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1) !important;
-        }
-        .gr-box {
-            background: white !important;
-            border-radius: 10px !important;
-        }
-        .gr-button-primary {
-            background: linear-gradient(90deg, #667eea 0%, #764ba2 100%) !important;
-            border: none !important;
-            font-weight: 600 !important;
-            text-transform: uppercase !important;
-            letter-spacing: 1px !important;
-        }
-        .gr-button-primary:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4) !important;
-            transition: all 0.3s ease !important;
-        }
-        textarea, input {
-            border: 2px solid #e5e7eb !important;
-            border-radius: 8px !important;
-        }
-        textarea:focus, input:focus {
-            border-color: #667eea !important;
-            box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1) !important;
-        }
-        h1, h2, h3 {
-            color: #1e293b !important;
-        }
+def build_demo():
+    """
+    Build the Gradio web interface.
+    
+    Returns:
+        gr.Blocks: The (not yet launched) app
     """
-) as demo:
+    import gradio as gr
+
+    # Create the Gradio web interface using Blocks for custom layout
+    with gr.Blocks(
+        title="Insertion Sort Laboratory",
+        # Canvas player for the animated playback (see sortlab.playback)
+        head=PLAYER_SCRIPT,
+        theme=gr.themes.Soft(
+            primary_hue="blue",
+            secondary_hue="slate",
+        ),
+        css="""
+            .gradio-container {
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
+                background-attachment: fixed;
+            }
+            .contain {
+                background: rgba(255, 255, 255, 0.95) !important;
+                backdrop-filter: blur(10px);
+                border-radius: 15px !important;
+                padding: 25px !important;
+                box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1) !important;
+            }
+            .gr-box {
+                background: white !important;
+                border-radius: 10px !important;
+            }
+            .gr-button-primary {
+                background: linear-gradient(90deg, #667eea 0%, #764ba2 100%) !important;
+                border: none !important;
+                font-weight: 600 !important;
+                text-transform: uppercase !important;
+                letter-spacing: 1px !important;
+            }
+            .gr-button-primary:hover {
+                transform: translateY(-2px);
+                box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4) !important;
+                transition: all 0.3s ease !important;
+            }
+            textarea, input {
+                border: 2px solid #e5e7eb !important;
+                border-radius: 8px !important;
+            }
+            textarea:focus, input:focus {
+                border-color: #667eea !important;
+                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1) !important;
+            }
+            h1, h2, h3 {
+                color: #1e293b !important;
+            }
+        """
+    ) as demo:
     
-    # Header section
-    gr.Markdown("""
-    <div style="font-family: 'Georgia', 'Times New Roman', serif; background: linear-gradient(135deg, #1e3a8a 0%, #3b82f6 50%, #8b5cf6 100%); padding: 40px; border-radius: 15px; color: white; margin-bottom: 25px; box-shadow: 0 10px 40px rgba(0, 0, 0, 0.2);">
-        <h1 style="margin: 0; font-size: 2.8em; font-weight: 700; text-shadow: 2px 2px 4px rgba(0,0,0,0.3);">Insertion Sort Laboratory</h1>
-        <p style="margin: 15px 0 0 0; font-size: 1.2em; opacity: 0.95; font-weight: 300;">Interactive Algorithm Analysis and Visualization</p>
-    </div>
-    """)
-
-    # Main input/instruction section
-    with gr.Row():
-        # Left column: Instructions and algorithm info
-        with gr.Column(scale=1):
-            gr.Markdown("""
-            ### Quick Start
+        # Header section
+        gr.Markdown("""
+        <div style="font-family: 'Georgia', 'Times New Roman', serif; background: linear-gradient(135deg, #1e3a8a 0%, #3b82f6 50%, #8b5cf6 100%); padding: 40px; border-radius: 15px; color: white; margin-bottom: 25px; box-shadow: 0 10px 40px rgba(0, 0, 0, 0.2);">
+            <h1 style="margin: 0; font-size: 2.8em; font-weight: 700; text-shadow: 2px 2px 4px rgba(0,0,0,0.3);">Insertion Sort Laboratory</h1>
+            <p style="margin: 15px 0 0 0; font-size: 1.2em; opacity: 0.95; font-weight: 300;">Interactive Algorithm Analysis and Visualization</p>
+        </div>
+        """)
+
+        # Main input/instruction section
+        with gr.Row():
+            # Left column: Instructions and algorithm info
+            with gr.Column(scale=1):
+                gr.Markdown("""
+                ### Quick Start
             
-            Enter integers separated by commas:
+                Enter integers separated by commas, spaces or new lines, or upload a file:
             
-            **Examples:**
-            - Small: `5, 2, 9`
-            - Medium: `7, 2, 8, 1, 5, 3`
-            - Reverse: `10, 9, 8, 7, 6, 5`
-            - Nearly sorted: `1, 2, 3, 5, 4, 6`
+                **Examples:**
+                - Small: `5, 2, 9`
+                - Medium: `7, 2, 8, 1, 5, 3`
+                - Reverse: `10, 9, 8, 7, 6, 5`
+                - Nearly sorted: `1, 2, 3, 5, 4, 6`
             
-            The system will analyze insertion sort and compare it with bubble sort and quicksort.
-            """)
+                The system will analyze insertion sort and compare it with bubble sort and quicksort.
+                """)
             
-            gr.Markdown("""
-            ### Algorithm Characteristics
+                gr.Markdown("""
+                ### Algorithm Characteristics
             
-            **Time Complexity:**
-            - Best: O(n)
-            - Average: O(n²)
-            - Worst: O(n²)
+                **Time Complexity:**
+                - Best: O(n)
+                - Average: O(n²)
+                - Worst: O(n²)
             
-            **Space Complexity:** O(1)
+                **Space Complexity:** O(1)
             
-            **Properties:**
-            - Stable: ✓
-            - In-place: ✓
-            - Online: ✓
-            """)
-
-        # Right column: Input field and submit button
-        with gr.Column(scale=2):
-            input_field = gr.Textbox(
-                label="Enter Array (comma-separated integers)",
-                placeholder="e.g., 5, 2, 9, 1, 5",
-                lines=4,
-                interactive=True
+                **Properties:**
+                - Stable: ✓
+                - In-place: ✓
+                - Online: ✓
+                """)
+
+            # Right column: Input field and submit button
+            with gr.Column(scale=2):
+                input_field = gr.Textbox(
+                    label="Enter Array (integers separated by commas, spaces or new lines)",
+                    placeholder="e.g., 5, 2, 9, 1, 5",
+                    lines=4,
+                    interactive=True
+                )
+                upload_input = gr.File(
+                    label="...or upload a file (.csv, .txt, .npy, or raw int64 .bin)",
+                    file_types=[".csv", ".txt", ".npy", ".bin", ".raw", ".i64"],
+                    type="filepath"
+                )
+                mode_radio = gr.Radio(
+                    label="Mode",
+                    choices=[
+                        ("Full step-by-step trace", MODE_TRACE),
+                        ("Metrics only (fast, no trace)", MODE_METRICS),
+                    ],
+                    value=MODE_TRACE
+                )
+                engine_dropdown = gr.Dropdown(
+                    label="Sort engine",
+                    choices=[(label, key) for key, (label, _, _) in SORT_ENGINES.items()],
+                    value=ENGINE_LINEAR
+                )
+                comparisons_toggle = gr.Checkbox(label="Show algorithm comparisons (bubble & quick)", value=False)
+                bubble_dropdown = gr.Dropdown(
+                    label="Bubble sort variant (comparison row)",
+                    choices=[(description, key) for key, (_, description) in BUBBLE_VARIANTS.items()],
+                    value=BUBBLE_CLASSIC
+                )
+                submit_btn = gr.Button("ANALYZE & VISUALIZE", size="lg", variant="primary")
+
+        gr.Markdown("---")
+
+        # Output sections
+        with gr.Row():
+            summary_output = gr.Textbox(
+                label="Comprehensive Analysis",
+                lines=20,
+                interactive=False,
+                show_label=True,
+                elem_classes="output-box"
+            )
+
+        with gr.Row():
+            trace_output = gr.Textbox(
+                label="Step-by-Step Execution Trace",
+                lines=24,
+                interactive=False,
+                show_label=True,
+                elem_classes="output-box"
             )
-            comparisons_toggle = gr.Checkbox(label="Show algorithm comparisons (bubble & quick)", value=False)
-            submit_btn = gr.Button("ANALYZE & VISUALIZE", size="lg", variant="primary")
-
-    gr.Markdown("---")
-
-    # Output sections
-    with gr.Row():
-        summary_output = gr.Textbox(
-            label="Comprehensive Analysis",
-            lines=20,
-            interactive=False,
-            show_label=True,
-            elem_classes="output-box"
+
+        # Paged trace viewer: the session keeps the StepLog and renders one window
+        with gr.Row():
+            page_start = gr.Number(label="Start at step", value=0, precision=0)
+            page_size = gr.Number(label="Steps per page", value=TRACE_PAGE_SIZE, precision=0)
+            jump_i = gr.Number(label="Jump to i =", value=1, precision=0)
+        with gr.Row():
+            prev_btn = gr.Button("◀ Previous page")
+            goto_btn = gr.Button("Go to step")
+            jump_btn = gr.Button("Jump to i")
+            next_btn = gr.Button("Next page ▶")
+
+        with gr.Row():
+            html_output = gr.HTML(
+                label="Performance Dashboard"
+            )
+
+        # Step animation, replayed in the browser from compact deltas
+        with gr.Accordion("Animated playback", open=True):
+            playback_output = gr.HTML(label="Animated playback")
+
+        # Online mode: values are inserted into the already sorted session
+        with gr.Accordion("Online session (append values)", open=False):
+            gr.Markdown("Insertion sort is *online*: new values are inserted into the "
+                        "already sorted session instead of re-sorting everything. The "
+                        "trace shows only the new insertions.")
+            with gr.Row():
+                session_input = gr.Textbox(label="Values to append", placeholder="e.g., 4, 8", scale=3)
+                append_btn = gr.Button("Append", variant="primary", scale=1)
+                reset_session_btn = gr.Button("Reset session", scale=1)
+            with gr.Row():
+                session_summary = gr.Textbox(label="Session", lines=14, max_lines=30)
+                session_trace = gr.Textbox(label="Trace of this update", lines=14, max_lines=30)
+            session_state = gr.State()
+
+        # Many arrays at once: counters only, exported as a table
+        with gr.Accordion("Batch analysis", open=False):
+            gr.Markdown("Upload a .jsonl file (one JSON array or `{\"id\": ..., \"array\": [...]}` "
+                        "per line) or a .txt/.csv file with one array per line. Uses the engine "
+                        "selected above; no trace or dashboard is built.")
+            with gr.Row():
+                batch_upload = gr.File(
+                    label="Batch file",
+                    file_types=[".jsonl", ".ndjson", ".txt", ".csv"],
+                    type="filepath"
+                )
+                with gr.Column():
+                    batch_comparisons = gr.Checkbox(label="Include bubble & quick counters", value=False)
+                    batch_format = gr.Radio(
+                        label="Export format",
+                        choices=list(BATCH_EXPORT_FORMATS),
+                        value="csv"
+                    )
+                    batch_btn = gr.Button("Run batch")
+            with gr.Row():
+                batch_summary = gr.JSON(label="Batch summary")
+                batch_file = gr.File(label="Per-array metrics")
+
+        # Archive the recorded steps, or replay an archived run without re-sorting
+        with gr.Accordion("Binary trace (export / replay)", open=False):
+            gr.Markdown("Download the steps of the last trace-mode run as a compact binary "
+                        "`.sltrace` file, or upload one to page through and replay it.")
+            with gr.Row():
+                with gr.Column():
+                    trace_codec = gr.Radio(label="Compression", choices=list(TRACEFILE_CODECS),
+                                           value="zlib")
+                    export_trace_btn = gr.Button("Export binary trace")
+                    trace_file = gr.File(label="Binary trace")
+                with gr.Column():
+                    trace_upload = gr.File(
+                        label="Replay a binary trace",
+                        file_types=[TRACEFILE_EXTENSION],
+                        type="filepath"
+                    )
+                    trace_metadata = gr.JSON(label="Trace metadata")
+
+        # Result cache counters
+        with gr.Accordion("Result cache statistics", open=False):
+            cache_stats_output = gr.JSON(label="Cache counters")
+            cache_stats_btn = gr.Button("Refresh")
+
+        # Hidden outputs for data export
+        data_output = gr.Textbox(visible=False)
+        status_output = gr.Textbox(visible=False)
+        steps_state = gr.State()
+
+        # Connect button click event
+        # Stream partial results so the trace starts filling in immediately
+        submit_btn.click(
+            fn=run_lab_stream,
+            inputs=[input_field, comparisons_toggle, upload_input, mode_radio, engine_dropdown,
+                    bubble_dropdown],
+            outputs=[summary_output, trace_output, html_output, data_output, status_output, steps_state],
+            concurrency_limit=ANALYZE_CONCURRENCY,
+            concurrency_id="analyze"
+        ).then(fn=render_player, inputs=[steps_state], outputs=[playback_output])
+
+        # Allow Enter key to submit (same as clicking button)
+        input_field.submit(
+            fn=run_lab_stream,
+            inputs=[input_field, comparisons_toggle, upload_input, mode_radio, engine_dropdown,
+                    bubble_dropdown],
+            outputs=[summary_output, trace_output, html_output, data_output, status_output, steps_state],
+            concurrency_limit=ANALYZE_CONCURRENCY,
+            concurrency_id="analyze"
+        ).then(fn=render_player, inputs=[steps_state], outputs=[playback_output])
+
+        append_btn.click(
+            fn=append_to_session,
+            inputs=[session_state, session_input],
+            outputs=[session_state, session_summary, session_trace]
+        )
+        session_input.submit(
+            fn=append_to_session,
+            inputs=[session_state, session_input],
+            outputs=[session_state, session_summary, session_trace]
+        )
+        reset_session_btn.click(
+            fn=lambda: (None, "", ""),
+            inputs=[],
+            outputs=[session_state, session_summary, session_trace]
         )
 
-    with gr.Row():
-        trace_output = gr.Textbox(
-            label="Step-by-Step Execution Trace",
-            lines=24,
-            interactive=False,
-            show_label=True,
-            elem_classes="output-box"
+        batch_btn.click(
+            fn=run_batch_upload,
+            inputs=[batch_upload, batch_comparisons, engine_dropdown, batch_format],
+            outputs=[batch_summary, batch_file],
+            api_name="batch",
+            concurrency_limit=BATCH_CONCURRENCY
         )
 
-    with gr.Row():
-        html_output = gr.HTML(
-            label="Performance Dashboard"
+        export_trace_btn.click(fn=export_trace, inputs=[steps_state, trace_codec], outputs=[trace_file])
+        trace_upload.upload(
+            fn=import_trace,
+            inputs=[trace_upload, page_size],
+            outputs=[trace_output, page_start, trace_metadata, steps_state]
+        ).then(fn=render_player, inputs=[steps_state], outputs=[playback_output])
+
+        cache_stats_btn.click(fn=get_cache_stats, inputs=[], outputs=[cache_stats_output])
+
+        # Trace paging controls
+        goto_btn.click(
+            fn=render_trace_page,
+            inputs=[steps_state, page_start, page_size],
+            outputs=[trace_output, page_start]
+        )
+        prev_btn.click(
+            fn=lambda steps, start, size: render_trace_page(steps, start - size, size),
+            inputs=[steps_state, page_start, page_size],
+            outputs=[trace_output, page_start]
+        )
+        next_btn.click(
+            fn=lambda steps, start, size: render_trace_page(steps, start + size, size),
+            inputs=[steps_state, page_start, page_size],
+            outputs=[trace_output, page_start]
+        )
+        jump_btn.click(
+            fn=render_trace_page_for_i,
+            inputs=[steps_state, jump_i, page_size],
+            outputs=[trace_output, page_start]
         )
 
-    # Hidden outputs for data export
-    data_output = gr.Textbox(visible=False)
-    status_output = gr.Textbox(visible=False)
-
-    # Connect button click event
-    submit_btn.click(
-        fn=run_lab,
-        inputs=[input_field, comparisons_toggle],
-        outputs=[summary_output, trace_output, html_output, data_output, status_output]
-    )
-
-    # Allow Enter key to submit (same as clicking button)
-    input_field.submit(
-        fn=run_lab,
-        inputs=[input_field, comparisons_toggle],
-        outputs=[summary_output, trace_output, html_output, data_output, status_output]
-    )
-
-    # Educational information section
-    gr.Markdown("""
-    ---
-    ### How Insertion Sort Works
+        # Educational information section
+        gr.Markdown("""
+        ---
+        ### How Insertion Sort Works
     
-    1. **Start from Index 1**: The first element is trivially sorted
-    2. **Extract Key**: Take the current element (key)
-    3. **Compare Backwards**: Compare key with sorted portion from right to left
-    4. **Shift Right**: Move larger elements one position to the right
-    5. **Insert Key**: Place key in its correct position
-    6. **Repeat**: Move to next element until array is sorted
+        1. **Start from Index 1**: The first element is trivially sorted
+        2. **Extract Key**: Take the current element (key)
+        3. **Compare Backwards**: Compare key with sorted portion from right to left
+        4. **Shift Right**: Move larger elements one position to the right
+        5. **Insert Key**: Place key in its correct position
+        6. **Repeat**: Move to next element until array is sorted
     
-    #### Why Use Insertion Sort?
-    - **Adaptive**: Excellent for nearly-sorted data (O(n) best case)
-    - **Online**: Can process data as it arrives
-    - **Stable**: Maintains relative order of equal elements
-    - **Practical**: Efficient for small datasets (< 50 elements)
-    - **Memory Efficient**: Sorts in-place with O(1) space
+        #### Why Use Insertion Sort?
+        - **Adaptive**: Excellent for nearly-sorted data (O(n) best case)
+        - **Online**: Can process data as it arrives
+        - **Stable**: Maintains relative order of equal elements
+        - **Practical**: Efficient for small datasets (< 50 elements)
+        - **Memory Efficient**: Sorts in-place with O(1) space
     
-    #### When to Use
-    ✓ Small datasets  
-    ✓ Nearly sorted data  
-    ✓ Memory-constrained systems  
-    ✓ Online sorting scenarios  
+        #### When to Use
+        ✓ Small datasets  
+        ✓ Nearly sorted data  
+        ✓ Memory-constrained systems  
+        ✓ Online sorting scenarios  
     
-    #### When to Avoid
-    ✗ Large random datasets (use quicksort or mergesort)  
-    ✗ Performance-critical applications requiring O(n log n)
-    """)
+        #### When to Avoid
+        ✗ Large random datasets (use quicksort or mergesort)  
+        ✗ Performance-critical applications requiring O(n log n)
+        """)
+
+    # Bounded queue; events without their own limit share the default one
+    demo.queue(default_concurrency_limit=DEFAULT_CONCURRENCY, max_size=QUEUE_MAX_SIZE)
+    return demo
+
+
+_demo = None
+
+
+def __getattr__(name):
+    """Build ``app.demo`` on first access (for ``gradio app.py`` and Spaces)."""
+    global _demo
+    if name == "demo":
+        if _demo is None:
+            _demo = build_demo()
+        return _demo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Main entry point - launch the Gradio app
 if __name__ == "__main__":
-    demo.launch(share=True)
+    build_demo().launch(share=True)
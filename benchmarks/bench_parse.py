@@ -0,0 +1,80 @@
+"""
+Benchmark for parse_list: bulk parser vs. the original per-token loop.
+
+Usage:
+    python benchmarks/bench_parse.py [--sizes 1000 100000 1000000] [--repeat 5]
+
+Prints the best-of-N wall time of each parser for every input size, plus the
+speedup of the bulk parser. load_array_file is timed on a raw int64 file for
+the same sizes.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sortlab import load_array_file, parse_list  # noqa: E402
+
+
+def parse_list_loop(text):
+    """The pre-bulk parse_list implementation, kept here as the baseline."""
+    parts = text.split(",")
+    nums = []
+
+    for p in parts:
+        p = p.strip()
+        if p == "":
+            continue
+        try:
+            nums.append(int(p))
+        except ValueError:
+            raise ValueError(f"'{p}' is not a valid integer")
+
+    return nums
+
+
+def best_time(fn, arg, repeat):
+    """Return the fastest of ``repeat`` timed calls of fn(arg), in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(121)
+    print(f"{'size':>10} {'loop (s)':>10} {'bulk (s)':>10} {'speedup':>8} {'raw file (s)':>13}")
+    for n in args.sizes:
+        values = [rng.randint(-10**9, 10**9) for _ in range(n)]
+        text = ", ".join(map(str, values))
+        assert parse_list(text) == parse_list_loop(text) == values
+
+        loop = best_time(parse_list_loop, text, args.repeat)
+        bulk = best_time(parse_list, text, args.repeat)
+
+        with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
+            array("q", values).tofile(f)
+        try:
+            assert load_array_file(f.name) == values
+            raw = best_time(load_array_file, f.name, args.repeat)
+        finally:
+            os.remove(f.name)
+
+        print(f"{n:>10,} {loop:>10.4f} {bulk:>10.4f} {loop / bulk:>7.1f}x {raw:>13.4f}")
+
+
+if __name__ == "__main__":
+    main()
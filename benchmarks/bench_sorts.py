@@ -0,0 +1,254 @@
+"""
+Reproducible benchmark suite for the Insertion Sort Lab sort engines.
+
+Runs every benchmark over several input shapes (random, sorted, reversed,
+few-unique, nearly-sorted) and sizes, recording wall time (best of N),
+peak memory (tracemalloc, measured in a separate run so it does not skew the
+timings) and the counters each algorithm reports. Results are written as
+JSON so two runs can be diffed to catch regressions.
+
+Usage:
+    python benchmarks/bench_sorts.py --output results.json
+    python benchmarks/bench_sorts.py --sizes 10 100 1000 --shapes random reversed
+    python benchmarks/bench_sorts.py --compare old.json new.json [--threshold 1.2]
+
+Quadratic benchmarks (tracked insertion sort, bubble sort, run_lab with
+comparisons) are skipped above --max-quadratic elements, and run_lab with a
+full text trace (whose output grows as n³) above --max-trace; the skip is
+recorded in the results. Comparison runs that run in the process pool are
+not seen by tracemalloc.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import sortlab  # noqa: E402
+
+SHAPES = ("random", "sorted", "reversed", "few-unique", "nearly-sorted")
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+
+
+def make_input(shape, n, seed):
+    """
+    Build a deterministic input array.
+
+    Args:
+        shape (str): One of SHAPES
+        n (int): Number of elements
+        seed (int): Random seed (combined with shape and size)
+
+    Returns:
+        list: The input array
+    """
+    rng = random.Random(f"{seed}-{shape}-{n}")
+    if shape == "random":
+        return [rng.randint(-n, n) for _ in range(n)]
+    if shape == "sorted":
+        return list(range(n))
+    if shape == "reversed":
+        return list(range(n, 0, -1))
+    if shape == "few-unique":
+        return [rng.randint(0, 4) for _ in range(n)]
+    if shape == "nearly-sorted":
+        a = list(range(n))
+        # Swap ~1% of adjacent pairs (at least one)
+        for _ in range(max(1, n // 100)):
+            i = rng.randrange(max(n - 1, 1))
+            if i + 1 < n:
+                a[i], a[i + 1] = a[i + 1], a[i]
+        return a
+    raise ValueError(f"unknown shape '{shape}'")
+
+
+def bench_insertion_steps(arr):
+    sorted_arr, steps, comparisons, moves, accesses = sortlab.insertion_sort_with_steps(arr)
+    return {"steps": len(steps), "comparisons": comparisons, "moves": moves, "accesses": accesses}
+
+
+def bench_insertion_metrics(arr):
+    _, comparisons, moves, accesses = sortlab.insertion_sort_metrics(arr)
+    return {"comparisons": comparisons, "moves": moves, "accesses": accesses}
+
+
+def bench_insertion_raw(arr):
+    sortlab.raw_insertion_sort(arr)
+    return {}
+
+
+def bench_bubble(arr):
+    _, comparisons, moves = sortlab.bubble_sort_comparison(arr)
+    return {"comparisons": comparisons, "moves": moves}
+
+
+def bench_quick(arr):
+    _, comparisons, moves = sortlab.quick_sort_comparison(arr)
+    return {"comparisons": comparisons, "moves": moves}
+
+
+def run_lab_bench(mode, show_comparisons):
+    """Build an end-to-end run_lab benchmark (cache cleared before every call)."""
+    def bench(arr):
+        sortlab.result_cache.clear()
+        text = ", ".join(map(str, arr))
+        summary, trace, html_viz, json_data, status = sortlab.run_lab(text, show_comparisons, mode=mode)
+        data = json.loads(json_data)
+        return {
+            "comparisons": data["insertion"]["comparisons"],
+            "moves": data["insertion"]["moves"],
+            "output_chars": len(summary) + len(trace) + len(html_viz) + len(json_data),
+        }
+    return bench
+
+
+# name -> (function, size limit option: None, "max_quadratic" or "max_trace")
+BENCHMARKS = {
+    "insertion_sort_with_steps": (bench_insertion_steps, "max_quadratic"),
+    "insertion_sort_metrics": (bench_insertion_metrics, None),
+    "raw_insertion_sort": (bench_insertion_raw, "max_quadratic"),
+    "bubble_sort_comparison": (bench_bubble, "max_quadratic"),
+    "quick_sort_comparison": (bench_quick, None),
+    "run_lab[trace]": (run_lab_bench(sortlab.MODE_TRACE, False), "max_trace"),
+    "run_lab[metrics]": (run_lab_bench(sortlab.MODE_METRICS, False), None),
+    "run_lab[metrics+comparisons]": (run_lab_bench(sortlab.MODE_METRICS, True), "max_quadratic"),
+}
+
+
+def measure(fn, arr, repeat):
+    """
+    Time fn(arr) (best of ``repeat``) and measure its peak traced memory.
+
+    Returns:
+        tuple: (best_seconds, peak_bytes, counters)
+    """
+    best = float("inf")
+    counters = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        counters = fn(arr)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn(arr)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, counters
+
+
+def git_commit():
+    """Return the current git commit hash, or None outside a checkout."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args):
+    results = []
+    for name in args.benchmarks:
+        fn, limit_option = BENCHMARKS[name]
+        limit = getattr(args, limit_option) if limit_option else None
+        for shape in args.shapes:
+            for n in args.sizes:
+                row = {"benchmark": name, "shape": shape, "size": n}
+                if limit is not None and n > limit:
+                    flag = "--" + limit_option.replace("_", "-")
+                    row["skipped"] = f"size above {flag} {limit}"
+                else:
+                    arr = make_input(shape, n, args.seed)
+                    seconds, peak, counters = measure(fn, arr, args.repeat)
+                    row.update(seconds=seconds, peak_bytes=peak, counters=counters)
+                    print(f"{name:<28} {shape:<14} {n:>8,}  {seconds:>10.4f}s  "
+                          f"{peak / 1e6:>9.2f} MB", flush=True)
+                results.append(row)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(old_path, new_path, threshold):
+    """
+    Print a per-benchmark comparison of two result files.
+
+    Returns:
+        int: Number of regressions (slower than ``threshold`` or changed counters)
+    """
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def key(row):
+        return row["benchmark"], row["shape"], row["size"]
+
+    old_rows = {key(r): r for r in old["results"] if "seconds" in r}
+    regressions = 0
+    print(f"{'benchmark':<28} {'shape':<14} {'size':>8}  {'old (s)':>10} {'new (s)':>10} {'ratio':>7}")
+    for row in new["results"]:
+        base = old_rows.get(key(row))
+        if base is None or "seconds" not in row:
+            continue
+        ratio = row["seconds"] / max(base["seconds"], 1e-9)
+        flags = []
+        if ratio > threshold:
+            flags.append("SLOWER")
+        if row["counters"] != base["counters"]:
+            flags.append("COUNTERS CHANGED")
+        regressions += bool(flags)
+        print(f"{row['benchmark']:<28} {row['shape']:<14} {row['size']:>8,}  "
+              f"{base['seconds']:>10.4f} {row['seconds']:>10.4f} {ratio:>6.2f}x  {' '.join(flags)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--benchmarks", nargs="+", default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument("--shapes", nargs="+", default=list(SHAPES), choices=list(SHAPES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--max-quadratic", type=int, default=2_000,
+                        help="largest size for O(n²) benchmarks (default: 2000)")
+    parser.add_argument("--max-trace", type=int, default=200,
+                        help="largest size for run_lab with a full text trace (default: 200)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=121)
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="slowdown ratio reported as a regression (default: 1.2)")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    report = run_suite(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(report['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Insertion Sort Lab core: sort engines, step tracing and analysis reports.
+
+This package has no Gradio dependency, so batch jobs and worker processes can
+import it cheaply; the web UI lives in ``app.py`` and the command line
+interface in ``sortlab.cli`` (``python -m sortlab``).
+"""
+
+from .admission import (
+    ADMISSION_MAX_COMPARISON_ELEMENTS,
+    ADMISSION_MAX_TRACE_BLOCK_STEPS,
+    ADMISSION_MAX_TRACE_ELEMENTS,
+    ADMISSION_MAX_TRACE_FILE_BYTES,
+    ANALYZE_CONCURRENCY,
+    APP_LIMITS,
+    BATCH_CONCURRENCY,
+    DEADLINE_CHECK_INTERVAL,
+    DEFAULT_CONCURRENCY,
+    QUEUE_MAX_SIZE,
+    REQUEST_TIME_BUDGET,
+    BudgetExceeded,
+    Deadline,
+    RequestLimits,
+)
+from .batch import (
+    BATCH_COLUMNS,
+    BATCH_EXPORT_FORMATS,
+    BATCH_MISSING,
+    BatchResult,
+    load_batch,
+    run_batch,
+)
+from .cache import (
+    CACHE_DIR,
+    CACHE_MAX_BYTES,
+    CACHE_MAX_ENTRIES,
+    ResultCache,
+    get_cache_stats,
+    input_fingerprint,
+    result_cache,
+)
+from .comparisons import (
+    BUBBLE_CLASSIC,
+    BUBBLE_VARIANTS,
+    COMPARISON_ALGORITHMS,
+    COMPARISON_PARALLEL_MIN_SIZE,
+    COMPARISON_TIMEOUT,
+    COMPARISON_WORKERS,
+    QUICK_SORT_INSERTION_CUTOFF,
+    QUICK_SORT_NINTHER_THRESHOLD,
+    PendingComparisons,
+    bubble_sort_comparison,
+    quick_sort_comparison,
+    start_comparisons,
+)
+from .dashboard import (
+    DASHBOARD_BAR_BINS,
+    DASHBOARD_CSS,
+    render_array_bars,
+    render_dashboard,
+)
+from .engines import (
+    CIURA_GAPS,
+    ENGINE_HYBRID,
+    ENGINE_LINEAR,
+    ENGINE_TYPED,
+    HYBRID_MIN_RUN,
+    HYBRID_SHIFT_BUDGET,
+    SHELL_GAP_SEQUENCES,
+    SORT_ENGINES,
+    compile_sort,
+    count_inversions,
+    get_engine,
+    insertion_sort_metrics,
+    insertion_sort_with_steps,
+    iter_binary_insertion_sort,
+    iter_block_insertion_sort,
+    iter_hybrid_sort,
+    iter_insertion_sort,
+    iter_shell_sort,
+    iter_typed_insertion_sort,
+    shell_gaps,
+    sort_metrics,
+    sort_with_steps,
+    typed_insertion_metrics,
+)
+from .external import (
+    EXTERNAL_CHUNK_ELEMENTS,
+    EXTERNAL_INSERTION_MAX,
+    EXTERNAL_MAX_FAN_IN,
+    EXTERNAL_MIN_BUFFER,
+    external_sort,
+    iter_chunks,
+)
+from .lab import (
+    METRICS_ONLY_TRACE,
+    MODE_METRICS,
+    MODE_TRACE,
+    NO_TRACE_TEXT,
+    InputError,
+    build_report,
+    run_lab,
+    run_lab_stream,
+    run_lab_uncached,
+    validate_input,
+)
+from .parsing import RAW_FLOAT64_EXTENSIONS, RAW_INT64_EXTENSIONS, load_array_file, parse_list
+from .playback import PLAYBACK_MAX_STEPS, PLAYER_SCRIPT, encode_playback, render_player
+from .presortedness import (
+    HYBRID_INSERTION,
+    HYBRID_NONE,
+    HYBRID_RUN_MERGE,
+    INVERSION_SAMPLE_SIZE,
+    analyze_presortedness,
+    choose_hybrid_strategy,
+    find_runs,
+    format_presortedness,
+)
+from .probes import (
+    LOOP_PROBES,
+    PROBES,
+    Instrumentation,
+    raw_insertion_sort,
+)
+from .records import (
+    RECORD_EXTENSIONS,
+    decorate,
+    load_records,
+    parse_key_spec,
+    parse_records,
+    sort_records,
+    sort_records_with_steps,
+    undecorate,
+    write_records,
+)
+from .session import InsertionSession, session_append
+from .steps import (
+    DEFAULT_KEYFRAME_INTERVAL,
+    STEP_BLOCK_INSERT,
+    STEP_INITIAL,
+    STEP_INSERT,
+    STEP_MERGE,
+    STEP_REVERSE,
+    STEP_SHIFT,
+    StepLog,
+    describe_step,
+)
+from .trace import (
+    TRACE_PAGE_SIZE,
+    TRACE_STREAM_INTERVAL,
+    TRACE_STREAM_MAX_CELLS,
+    TRACE_STREAM_WINDOW,
+    format_trace,
+    format_trace_header,
+    format_trace_range,
+    format_trace_step,
+    format_trace_tail,
+    render_trace_page,
+    render_trace_page_for_i,
+)
+from .tracefile import (
+    TRACEFILE_BLOCK_STEPS,
+    TRACEFILE_CODECS,
+    TRACEFILE_EXTENSION,
+    TRACEFILE_VERSION,
+    TraceFile,
+    load_trace,
+    write_trace,
+)
+from .typed import (
+    dtype_name,
+    is_typed,
+    load_typed,
+    numpy_inversions,
+    prefix_minimum_count,
+    to_typed,
+)
+from .variants import (
+    COUNTERS,
+    DEADLINE_CHECK_KEYS,
+    VARIANT_TEMPLATES,
+    compile_variant,
+    variant_source,
+)
+from .workers import (
+    WORKER_POOL_SIZE,
+    WorkerPool,
+    WorkerSlot,
+    worker_pool,
+)
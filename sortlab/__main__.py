@@ -0,0 +1,7 @@
+"""Allow ``python -m sortlab``."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Admission control for the web app: input-size limits that downgrade expensive
+requests, per-request time budgets, and the queue/concurrency settings.
+
+Every limit can be overridden with an environment variable, like
+SORTLAB_COMPARISON_TIMEOUT. The core functions apply none of this unless a
+RequestLimits is passed in, so the CLI and batch jobs run unrestricted.
+"""
+
+import os
+import time
+
+# Inputs longer than this run in metrics-only mode (the tracked sort is O(n²)
+# steps, each kept in the StepLog)
+ADMISSION_MAX_TRACE_ELEMENTS = int(os.environ.get("SORTLAB_MAX_TRACE_ELEMENTS", 2_000))
+# Inputs longer than this skip the bubble/quick comparisons (bubble sort is O(n²))
+ADMISSION_MAX_COMPARISON_ELEMENTS = int(os.environ.get("SORTLAB_MAX_COMPARISON_ELEMENTS", 10_000))
+# Uploaded .sltrace files: largest file accepted, and most steps per block (a
+# seek decodes one whole block)
+ADMISSION_MAX_TRACE_FILE_BYTES = int(os.environ.get("SORTLAB_MAX_TRACE_FILE_BYTES", 64 << 20))
+ADMISSION_MAX_TRACE_BLOCK_STEPS = int(os.environ.get("SORTLAB_MAX_TRACE_BLOCK_STEPS", 16_384))
+# Wall-clock seconds one analysis may take before it is cancelled
+REQUEST_TIME_BUDGET = float(os.environ.get("SORTLAB_TIME_BUDGET", 30))
+# Steps between deadline checks in the sort loops (a clock read per step would dominate)
+DEADLINE_CHECK_INTERVAL = 4096
+
+# Gradio queue: requests waiting beyond QUEUE_MAX_SIZE are turned away, and each
+# endpoint group runs at most this many requests at once
+QUEUE_MAX_SIZE = int(os.environ.get("SORTLAB_QUEUE_MAX_SIZE", 32))
+ANALYZE_CONCURRENCY = int(os.environ.get("SORTLAB_ANALYZE_CONCURRENCY", 2))
+BATCH_CONCURRENCY = int(os.environ.get("SORTLAB_BATCH_CONCURRENCY", 1))
+DEFAULT_CONCURRENCY = int(os.environ.get("SORTLAB_DEFAULT_CONCURRENCY", 8))
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised by Deadline.check when a request has used up its time budget."""
+
+
+class Deadline:
+    """
+    Cooperative cancellation point for one request.
+
+    Long loops call check() every few thousand iterations; once the budget
+    is spent it raises BudgetExceeded, which unwinds the sort and the
+    request without killing any thread or process.
+
+    Args:
+        seconds (float): Time budget from now (None for no limit)
+    """
+
+    __slots__ = ("seconds", "expires")
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        """Seconds left (None for no limit, never negative)."""
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.monotonic())
+
+    def check(self):
+        """
+        Raise BudgetExceeded if the budget is spent.
+
+        Raises:
+            BudgetExceeded: Once the deadline has passed
+        """
+        if self.expires is not None and time.monotonic() >= self.expires:
+            raise BudgetExceeded(
+                f"Analysis stopped after its {self.seconds:g}s time budget; "
+                "try metrics-only mode or a smaller input"
+            )
+
+
+class RequestLimits:
+    """
+    Size and time limits applied to one analysis request.
+
+    Args:
+        max_trace_elements (int): Longest input analyzed in trace mode
+        max_comparison_elements (int): Longest input given bubble/quick runs
+        time_budget (float): Seconds per request (None for no limit)
+        max_trace_file_bytes (int): Largest uploaded trace file
+    """
+
+    def __init__(self, max_trace_elements=ADMISSION_MAX_TRACE_ELEMENTS,
+                 max_comparison_elements=ADMISSION_MAX_COMPARISON_ELEMENTS,
+                 time_budget=REQUEST_TIME_BUDGET,
+                 max_trace_file_bytes=ADMISSION_MAX_TRACE_FILE_BYTES):
+        self.max_trace_elements = max_trace_elements
+        self.max_comparison_elements = max_comparison_elements
+        self.time_budget = time_budget
+        self.max_trace_file_bytes = max_trace_file_bytes
+
+    def admit(self, n, trace, show_comparisons):
+        """
+        Decide how an input of ``n`` elements is actually analyzed.
+
+        Args:
+            n (int): Input length
+            trace (bool): Whether a step trace was requested
+            show_comparisons (bool): Whether comparisons were requested
+
+        Returns:
+            tuple: (trace, show_comparisons, notice) where ``notice`` explains
+                a downgrade, or is None when the request runs as asked
+        """
+        limits = []
+        if trace and n > self.max_trace_elements:
+            trace = False
+            limits.append(f"{self.max_trace_elements:,}-element trace limit")
+        if show_comparisons and n > self.max_comparison_elements:
+            show_comparisons = False
+            limits.append(f"{self.max_comparison_elements:,}-element comparison limit")
+        if not limits:
+            return trace, show_comparisons, None
+        return trace, show_comparisons, (
+            f"Input has {n:,} elements, over the {' and '.join(limits)}: "
+            f"analyzed {'with' if trace else 'without'} a step trace and "
+            f"{'with' if show_comparisons else 'without'} bubble/quick comparisons."
+        )
+
+    def check_trace_file(self, size, n, block_steps):
+        """
+        Reject an uploaded trace file the app should not open for paging.
+
+        Traces are replayed, not re-run, so nothing can be downgraded: the
+        file is refused when it is too large, when its array is wider than
+        the trace limit (every page formats the whole array per step), or
+        when its blocks are longer than ADMISSION_MAX_TRACE_BLOCK_STEPS.
+
+        Args:
+            size (int): File size in bytes
+            n (int): Array length stored in the trace
+            block_steps (int): Steps per block stored in the trace
+
+        Raises:
+            ValueError: With the limit the file exceeds
+        """
+        if size > self.max_trace_file_bytes:
+            raise ValueError(f"Trace file is {size:,} bytes, over the "
+                             f"{self.max_trace_file_bytes:,}-byte upload limit")
+        if n > self.max_trace_elements:
+            raise ValueError(f"Trace has {n:,} elements, over the "
+                             f"{self.max_trace_elements:,}-element trace limit")
+        if block_steps > ADMISSION_MAX_TRACE_BLOCK_STEPS:
+            raise ValueError(f"Trace blocks hold {block_steps:,} steps, over the "
+                             f"{ADMISSION_MAX_TRACE_BLOCK_STEPS:,}-step limit")
+
+    def deadline(self):
+        """Start the clock for a request."""
+        return Deadline(self.time_budget)
+
+
+# Limits the web app applies to every analysis
+APP_LIMITS = RequestLimits()
@@ -0,0 +1,407 @@
+"""
+Batch analysis: run the lab over many arrays in one call and collect the
+counters in a compact columnar table.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+from array import array
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from .admission import BudgetExceeded
+from .comparisons import (
+    BUBBLE_CLASSIC,
+    bubble_sort_comparison,
+    quick_sort_comparison,
+)
+from .engines import ENGINE_LINEAR, sort_metrics
+from .lab import MODE_METRICS, InputError, run_lab_uncached
+from .parsing import parse_list
+from .workers import worker_pool
+
+# Counter columns of a BatchResult, in export order
+BATCH_COLUMNS = (
+    "n",
+    "comparisons",
+    "moves",
+    "accesses",
+    "bubble_comparisons",
+    "bubble_moves",
+    "quick_comparisons",
+    "quick_moves",
+)
+
+# Stored for counters that were not computed (comparisons disabled)
+BATCH_MISSING = -1
+
+# Batches with fewer elements than this in total (or on a single CPU) run
+# in-process; larger ones are split into chunks of about BATCH_CHUNK_ELEMENTS
+# for the worker processes
+BATCH_PARALLEL_MIN_ELEMENTS = 20_000
+BATCH_CHUNK_ELEMENTS = 50_000
+# Worker slots a batch run checks out of the shared WorkerPool
+BATCH_WORKERS = int(os.environ.get("SORTLAB_BATCH_WORKERS", 2))
+
+# File extensions read as one JSON value per line
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
+BATCH_EXPORT_FORMATS = ("csv", "jsonl", "npy")
+
+
+def _as_int_list(value):
+    """Turn one batch entry (a list of ints or a string of numbers) into a list."""
+    if isinstance(value, str):
+        return parse_list(value)
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"expected a list of integers, got {type(value).__name__}")
+    for v in value:
+        if isinstance(v, bool) or not isinstance(v, int):
+            raise ValueError(f"'{v}' is not a valid integer")
+    return list(value)
+
+
+def load_batch(source):
+    """
+    Read the arrays of a batch from a list or a file.
+
+    A list may hold arrays (lists of ints), strings of numbers, or dicts with
+    an ``array`` and an optional ``id``. In a .jsonl/.ndjson file every
+    non-blank line is either a JSON array or such an object; any other file
+    holds one comma/space-separated array per line. An open text stream (like
+    stdin) may mix both: lines starting with ``[`` or ``{`` are read as JSON.
+    Lines that fail to parse become errors, never exceptions.
+
+    Args:
+        source (list, str or text stream): The arrays, a path (or Gradio
+            upload) to read, or an open text stream
+
+    Returns:
+        tuple: (ids, arrays, errors) where ``errors`` is a list of
+            (id, message) for entries that could not be parsed
+    """
+    ids, arrays, errors = [], [], []
+
+    def add(entry_id, value):
+        try:
+            arr = _as_int_list(value)
+            if not arr:
+                raise ValueError("empty array")
+        except ValueError as e:
+            errors.append((entry_id, str(e)))
+            return
+        ids.append(entry_id)
+        arrays.append(arr)
+
+    if isinstance(source, (list, tuple)):
+        for index, value in enumerate(source):
+            entry_id = str(index)
+            if isinstance(value, dict):
+                entry_id = str(value.get("id", entry_id))
+                value = value.get("array")
+            add(entry_id, value)
+        return ids, arrays, errors
+
+    def add_lines(lines, is_jsonl):
+        for line_no, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            entry_id = str(line_no)
+            if not (is_jsonl or line.lstrip()[:1] in ("[", "{")):
+                add(entry_id, line)
+                continue
+            try:
+                value = json.loads(line)
+            except ValueError as e:
+                errors.append((entry_id, f"invalid JSON: {e}"))
+                continue
+            if isinstance(value, dict):
+                entry_id = str(value.get("id", entry_id))
+                value = value.get("array")
+            add(entry_id, value)
+
+    if isinstance(source, io.TextIOBase):
+        add_lines(source, False)
+        return ids, arrays, errors
+
+    # Gradio may hand us a tempfile wrapper instead of a path
+    path = getattr(source, "name", source)
+    with open(path, encoding="utf-8") as f:
+        add_lines(f, os.path.splitext(path)[1].lower() in JSONL_EXTENSIONS)
+    return ids, arrays, errors
+
+
+class BatchResult:
+    """
+    Columnar per-array counters for a batch run.
+
+    Each counter in BATCH_COLUMNS is one ``array('q')`` column, so a batch of
+    thousands of arrays costs a few bytes per value rather than a dict per
+    row. Counters that were not computed hold BATCH_MISSING.
+
+    Attributes:
+        ids (list): Identifier of every row (list index or file line number)
+        columns (dict): Column name -> array('q'), in BATCH_COLUMNS order
+        errors (list): (id, message) for inputs that were skipped
+        reports (list): Per-row (summary, trace, html, json) when requested,
+            else None
+    """
+
+    def __init__(self, ids=None, errors=None):
+        self.ids = list(ids or [])
+        self.columns = {name: array("q") for name in BATCH_COLUMNS}
+        self.errors = list(errors or [])
+        self.reports = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append_counters(self, counters):
+        """Append one row of counters (in BATCH_COLUMNS order; None for missing)."""
+        for name, value in zip(BATCH_COLUMNS, counters):
+            self.columns[name].append(BATCH_MISSING if value is None else value)
+
+    def append_row(self, row_id, counters):
+        """Append a row and its id."""
+        self.ids.append(row_id)
+        self.append_counters(counters)
+
+    def skip(self, row_ids, message):
+        """Record rows that were not analyzed as errors."""
+        self.errors.extend((row_id, message) for row_id in row_ids)
+
+    def rows(self):
+        """Yield every row as a dict (missing counters as None)."""
+        for index, row_id in enumerate(self.ids):
+            row = {"id": row_id}
+            for name, column in self.columns.items():
+                value = column[index]
+                row[name] = None if value == BATCH_MISSING else value
+            yield row
+
+    def summary(self):
+        """Small JSON-friendly overview (row count, skipped inputs, totals)."""
+        return {
+            "rows": len(self),
+            "skipped": len(self.errors),
+            "errors": [{"id": i, "error": message} for i, message in self.errors[:20]],
+            "total_elements": sum(self.columns["n"]),
+            "total_comparisons": sum(self.columns["comparisons"]),
+        }
+
+    def to_csv(self, path):
+        """Write the table as CSV with a header row (missing counters left empty)."""
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("id",) + BATCH_COLUMNS)
+            for row in self.rows():
+                writer.writerow(["" if v is None else v for v in row.values()])
+
+    def to_jsonl(self, path):
+        """Write one JSON object per row."""
+        with open(path, "w", encoding="utf-8") as f:
+            for row in self.rows():
+                f.write(json.dumps(row))
+                f.write("\n")
+
+    def to_npy(self, path):
+        """
+        Write the counters as an int64 .npy matrix of shape (rows, len(BATCH_COLUMNS)).
+
+        Columns are in BATCH_COLUMNS order and row ids are not included. The
+        file is Fortran-ordered so each column is written straight from its
+        array('q') buffer; NumPy is not needed to write it.
+        """
+        header = "{'descr': '<i8', 'fortran_order': True, 'shape': (%d, %d), }" % (
+            len(self), len(BATCH_COLUMNS)
+        )
+        # NPY 1.0: magic, version, header length, header padded to 64 bytes
+        header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+        with open(path, "wb") as f:
+            f.write(b"\x93NUMPY\x01\x00")
+            f.write(len(header).to_bytes(2, "little"))
+            f.write(header.encode("latin1"))
+            for name in BATCH_COLUMNS:
+                column = self.columns[name]
+                if sys.byteorder == "big":
+                    column = array("q", column)
+                    column.byteswap()
+                f.write(column.tobytes())
+
+    def export(self, path, fmt=None):
+        """
+        Write the table in one of BATCH_EXPORT_FORMATS.
+
+        Args:
+            path (str): Output file
+            fmt (str): "csv", "jsonl" or "npy"; guessed from the extension
+                when omitted
+
+        Returns:
+            str: ``path``
+        """
+        fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+        if fmt not in BATCH_EXPORT_FORMATS:
+            raise ValueError(f"unknown export format '{fmt}' (expected one of "
+                             f"{', '.join(BATCH_EXPORT_FORMATS)})")
+        getattr(self, f"to_{fmt}")(path)
+        return path
+
+
+def _batch_counters(arr, engine, show_comparisons, bubble_variant, deadline=None):
+    """Counters for one array, in BATCH_COLUMNS order."""
+    _, comparisons, moves, accesses = sort_metrics(arr, engine, deadline)
+    bubble = quick = (None, None)
+    if show_comparisons:
+        bubble = bubble_sort_comparison(arr, bubble_variant)[1:]
+        quick = quick_sort_comparison(arr)[1:]
+    return (len(arr), comparisons, moves, accesses, *bubble, *quick)
+
+
+def _run_batch_chunk(arrays, engine, comparisons, bubble_variant):
+    """Pool task: counters for a chunk of arrays (``comparisons`` is a flag per array)."""
+    return [_batch_counters(arr, engine, show, bubble_variant)
+            for arr, show in zip(arrays, comparisons)]
+
+
+def _chunks(items, target_elements):
+    """Split (id, array, show_comparisons) items into chunks of ~``target_elements`` elements."""
+    chunk, size = [], 0
+    for item in items:
+        chunk.append(item)
+        size += len(item[1])
+        if size >= target_elements:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+def run_batch(source, show_comparisons=False, engine=ENGINE_LINEAR,
+              bubble_variant=BUBBLE_CLASSIC, reports=False, mode=MODE_METRICS, limits=None):
+    """
+    Analyze many arrays in one call.
+
+    Only the counters are computed by default: no step trace, summary or HTML
+    is built. Large batches are split into chunks that run on slots of the
+    shared WorkerPool (one task per chunk, so the per-task overhead is paid
+    per ~BATCH_CHUNK_ELEMENTS elements rather than per array). With
+    ``reports=True`` every array instead goes through the full run_lab
+    pipeline and its outputs are kept in ``result.reports``.
+
+    With ``limits``, arrays over the comparison limit get no bubble/quick
+    counters and the whole batch shares one time budget. Rows not finished
+    when it runs out, or lost to a crashed worker, are moved to
+    ``result.errors`` instead of failing the batch.
+
+    Args:
+        source (list, str or text stream): Arrays, a file path/upload, or an
+            open text stream (see load_batch)
+        show_comparisons (bool): Also count bubble sort and quicksort
+        engine (str): Key in SORT_ENGINES
+        bubble_variant (str): Key in BUBBLE_VARIANTS
+        reports (bool): Also build each array's summary, trace and HTML
+        mode (str): MODE_TRACE or MODE_METRICS for the reports
+        limits (RequestLimits): Optional size and time limits (the web app
+            passes APP_LIMITS)
+
+    Returns:
+        BatchResult: Per-array counters (and reports when requested)
+
+    Raises:
+        InputError: If the source holds no valid array
+    """
+    ids, arrays, errors = load_batch(source)
+    if not arrays:
+        raise InputError("No valid arrays in batch" + (f" ({len(errors)} skipped)" if errors else ""))
+    result = BatchResult(errors=errors)
+    deadline = limits.deadline() if limits is not None else None
+    items = []
+    for row_id, arr in zip(ids, arrays):
+        show = show_comparisons
+        if limits is not None:
+            _, show, _ = limits.admit(len(arr), False, show_comparisons)
+        items.append((row_id, arr, show))
+
+    if reports:
+        result.reports = []
+        for index, (row_id, arr, show) in enumerate(items):
+            try:
+                if deadline is not None:
+                    deadline.check()
+                summary, trace, html_viz, json_data, _ = run_lab_uncached(
+                    arr, show, mode, engine, bubble_variant, deadline=deadline
+                )
+            except BudgetExceeded as e:
+                result.skip([item[0] for item in items[index:]], str(e))
+                break
+            data = json.loads(json_data)
+            insertion = data["insertion"]
+            bubble, quick = data.get("bubble", {}), data.get("quick", {})
+            result.append_row(row_id, (
+                len(arr), insertion["comparisons"], insertion["moves"], insertion["accesses"],
+                bubble.get("comparisons"), bubble.get("moves"),
+                quick.get("comparisons"), quick.get("moves"),
+            ))
+            result.reports.append((summary, trace, html_viz, json_data))
+        return result
+
+    chunks = list(_chunks(items, BATCH_CHUNK_ELEMENTS))
+    parallel = (len(chunks) > 1 and (os.cpu_count() or 1) > 1
+                and sum(map(len, arrays)) >= BATCH_PARALLEL_MIN_ELEMENTS)
+    if parallel:
+        _run_chunks_in_pool(chunks, engine, bubble_variant, deadline, result)
+    else:
+        for index, (row_id, arr, show) in enumerate(items):
+            try:
+                if deadline is not None:
+                    deadline.check()
+                counters = _batch_counters(arr, engine, show, bubble_variant, deadline)
+            except BudgetExceeded as e:
+                result.skip([item[0] for item in items[index:]], str(e))
+                break
+            result.append_row(row_id, counters)
+    return result
+
+
+def _run_chunks_in_pool(chunks, engine, bubble_variant, deadline, result, pool=None):
+    """
+    Run batch chunks on worker slots and collect their rows in order.
+
+    Chunks are dealt round-robin to up to BATCH_WORKERS slots of ``pool``
+    (the shared worker_pool when omitted). A chunk whose worker died is
+    skipped; once the deadline passes, the remaining chunks are skipped and
+    only the slots still busy are killed.
+    """
+    pool = worker_pool if pool is None else pool
+    slots = [pool.acquire() for _ in range(min(len(chunks), BATCH_WORKERS))]
+    futures = []
+    try:
+        for index, chunk in enumerate(chunks):
+            arrays = [arr for _, arr, _ in chunk]
+            shows = [show for _, _, show in chunk]
+            futures.append(slots[index % len(slots)].submit(
+                _run_batch_chunk, arrays, engine, shows, bubble_variant
+            ))
+
+        # Collect in submission order so rows stay aligned with ids
+        for index, (chunk, future) in enumerate(zip(chunks, futures)):
+            chunk_ids = [row_id for row_id, _, _ in chunk]
+            try:
+                rows = future.result(timeout=None if deadline is None else deadline.remaining())
+            except BrokenProcessPool:
+                result.skip(chunk_ids, "worker process failed")
+                continue
+            except FutureTimeout:
+                # Only possible with a deadline: skip this chunk and every later one
+                result.skip([row_id for rest in chunks[index:] for row_id, _, _ in rest],
+                            f"Batch stopped after its {deadline.seconds:g}s time budget")
+                break
+            for row_id, counters in zip(chunk_ids, rows):
+                result.append_row(row_id, counters)
+    finally:
+        for index, slot in enumerate(slots):
+            pool.finish(slot, futures[index::len(slots)])
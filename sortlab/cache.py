@@ -0,0 +1,183 @@
+"""
+LRU result cache keyed by input fingerprint, optionally persisted to disk.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+from .steps import StepLog
+
+# Result cache limits (entries, bytes) and optional on-disk store directory
+CACHE_MAX_ENTRIES = 128
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_DIR = os.environ.get("SORTLAB_CACHE_DIR")
+
+
+def input_fingerprint(arr, *options):
+    """
+    Hash a parsed input array together with the options that affect the output.
+    
+    Args:
+        arr (list): Parsed input array
+        *options: Extra values that change the result (flags, mode, engine, ...)
+    
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(options).encode())
+    digest.update(repr(arr).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache of finished run_lab results, bounded by entry count and size.
+    
+    Entries are evicted least-recently-used first whenever either the number
+    of entries or their estimated size goes over budget. With a ``cache_dir``
+    every entry is also pickled to disk, so a restarted app starts warm; the
+    directory is trimmed (oldest files first) to the same byte budget.
+    
+    Args:
+        max_entries (int): Maximum number of entries kept in memory
+        max_bytes (int): Maximum estimated bytes kept in memory (and on disk)
+        cache_dir (str): Optional directory for the persistent store
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, cache_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, key):
+        """
+        Look up a cached value.
+        
+        Returns:
+            object: The cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        value = self._load(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._insert(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store a value, evicting old entries as needed, and persist it if enabled."""
+        with self._lock:
+            self._insert(key, value)
+        self._save(key, value)
+
+    def clear(self):
+        """Drop every in-memory entry (the disk store is left alone)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return the hit/miss/eviction counters and current size as a dict."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _insert(self, key, value):
+        size = self.estimate_size(value)
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        self._entries[key] = (value, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    @staticmethod
+    def estimate_size(value):
+        """Estimate the memory held by a cached value (strings and StepLogs)."""
+        if isinstance(value, str):
+            return len(value)
+        if isinstance(value, StepLog):
+            return value.nbytes()
+        if isinstance(value, (tuple, list)):
+            return sum(ResultCache.estimate_size(v) for v in value)
+        return sys.getsizeof(value)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _save(self, key, value):
+        if not self.cache_dir:
+            return
+        tmp = self._path(key) + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+            self._trim_disk()
+        except OSError:
+            pass  # The disk store is best effort; the in-memory cache still works
+
+    def _trim_disk(self):
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+result_cache = ResultCache(cache_dir=CACHE_DIR)
+
+
+def get_cache_stats():
+    """Return the shared result cache's counters (for the UI and monitoring)."""
+    return result_cache.stats()
@@ -0,0 +1,433 @@
+"""
+Command line interface: analyze arrays from files or stdin without the web UI.
+
+Usage:
+    python -m sortlab data.csv                   # one JSON document
+    python -m sortlab a.txt b.npy c.bin          # one JSON line per file
+    echo "5, 2, 9, 1" | python -m sortlab --mode trace --comparisons
+    python -m sortlab --batch arrays.jsonl --output metrics.csv
+    python -m sortlab data.txt --probes comparisons,sections,profile --flamegraph out.folded
+    python -m sortlab --typed big.npy prices.f64     # counters only, typed buffers
+    python -m sortlab prices.f64 --dtype auto        # full report for floats
+    python -m sortlab --external huge.bin --output sorted.bin --chunk-elements 500000
+    python -m sortlab data.txt --save-trace run.sltrace --trace-codec lzma
+    python -m sortlab --replay run.sltrace --step 1000   # one step, read from the archive
+    python -m sortlab --records people.csv --key city,-age --output sorted.csv
+"""
+
+import argparse
+import json
+import sys
+
+from .batch import BATCH_EXPORT_FORMATS, run_batch
+from .comparisons import BUBBLE_CLASSIC, BUBBLE_VARIANTS, bubble_sort_comparison, quick_sort_comparison
+from .engines import (
+    ENGINE_HYBRID,
+    ENGINE_LINEAR,
+    ENGINE_TYPED,
+    SORT_ENGINES,
+    typed_insertion_metrics,
+)
+from .external import EXTERNAL_CHUNK_ELEMENTS, EXTERNAL_MAX_FAN_IN, external_sort
+from .lab import MODE_METRICS, MODE_TRACE, InputError, run_lab
+from .parsing import parse_list
+from .probes import PROBES, Instrumentation
+from .records import (
+    decorate,
+    load_records,
+    parse_key_spec,
+    parse_records,
+    sort_records,
+    write_records,
+)
+from .tracefile import TRACEFILE_CODECS, TraceFile, write_trace
+from .typed import dtype_name, load_typed, to_typed
+
+# --dtype choices -> the dtype argument of validate_input
+_DTYPES = {"int": int, "float": float, "auto": "auto"}
+
+
+def analyze(text=None, path=None, mode=MODE_METRICS, engine=ENGINE_LINEAR,
+            show_comparisons=False, bubble_variant=BUBBLE_CLASSIC, probes=(), dtype=int,
+            on_steps=None):
+    """
+    Run the lab on one input and return its JSON export as a dict.
+
+    Args:
+        text (str): Raw numbers (used when ``path`` is None)
+        path (str): Optional .csv/.txt/.npy/.bin file to load instead
+        mode (str): MODE_TRACE or MODE_METRICS
+        engine (str): Key in SORT_ENGINES
+        show_comparisons (bool): Also run bubble sort and quicksort
+        bubble_variant (str): Key in BUBBLE_VARIANTS
+        probes (iterable or Instrumentation): Probes to enable (see run_lab)
+        dtype: ``int`` (default), ``float`` or ``"auto"`` (see validate_input)
+        on_steps (callable): Receives the StepLog of a trace-mode run (see run_lab)
+
+    Returns:
+        dict: The run_lab JSON data
+
+    Raises:
+        InputError: If the input is empty or cannot be parsed
+    """
+    # Only the JSON is used, so the trace text is never rendered
+    _, _, _, json_data, _ = run_lab(text or "", show_comparisons, path, mode, engine, bubble_variant,
+                                    probes, trace_text=False, dtype=dtype, on_steps=on_steps)
+    return json.loads(json_data)
+
+
+def build_parser():
+    """Create the argument parser for ``python -m sortlab``."""
+    parser = argparse.ArgumentParser(
+        prog="python -m sortlab",
+        description="Sort and analyze integer arrays with the Insertion Sort Lab engines.",
+    )
+    parser.add_argument("files", nargs="*",
+                        help="input files (.csv/.txt/.npy/.bin); reads stdin when omitted or '-'")
+    parser.add_argument("--mode", choices=[MODE_METRICS, MODE_TRACE], default=MODE_METRICS,
+                        help="record the full step trace or only the counters (default: metrics)")
+    parser.add_argument("--engine", choices=list(SORT_ENGINES), default=None,
+                        help=f"sort engine (default: {ENGINE_LINEAR}; {ENGINE_HYBRID} for the "
+                             "chunks of --external)")
+    parser.add_argument("--comparisons", action="store_true",
+                        help="also run bubble sort and quicksort")
+    parser.add_argument("--bubble-variant", choices=list(BUBBLE_VARIANTS), default=BUBBLE_CLASSIC)
+    parser.add_argument("--dtype", choices=list(_DTYPES), default="int",
+                        help="number type of the input: int (default), float, or auto for ints "
+                             "unless a value is a float (.f64 files need float or auto)")
+    parser.add_argument("--indent", type=int, default=None,
+                        help="pretty-print a single result with this indent")
+    parser.add_argument("--batch", action="store_true",
+                        help="treat each input as many arrays (one per line, or JSON lines) "
+                             "and output a per-array metrics table")
+    parser.add_argument("--output", help="with --batch, write the table to this file "
+                                         "(default: JSON lines on stdout); with --external, "
+                                         "write the sorted values here as raw int64; with "
+                                         "--records, write the sorted records here (.csv or "
+                                         "JSON lines)")
+    parser.add_argument("--format", choices=BATCH_EXPORT_FORMATS, default=None,
+                        help="with --batch --output, the table format (default: from the extension)")
+    parser.add_argument("--probes", type=_probe_list, default=(),
+                        help=f"comma-separated instrumentation probes ({', '.join(PROBES)}); "
+                             "counter probes limit what metrics mode and the --external chunk "
+                             "sorts count, and stats are "
+                             "added to the JSON under 'instrumentation'")
+    parser.add_argument("--flamegraph", metavar="PATH",
+                        help="write the section/profile timings as a collapsed-stack file "
+                             "(needs --probes with sections or profile)")
+    parser.add_argument("--typed", action="store_true",
+                        help="load each input straight into an int64/float64 buffer and output "
+                             "only the insertion sort counters (for multi-million-element inputs)")
+    parser.add_argument("--external", action="store_true",
+                        help="out-of-core sort for files larger than memory: sort chunks, spill "
+                             "runs to temp files, k-way merge; outputs counters and I/O stats")
+    parser.add_argument("--chunk-elements", type=int, default=EXTERNAL_CHUNK_ELEMENTS,
+                        help="with --external, values sorted in memory per run "
+                             f"(default: {EXTERNAL_CHUNK_ELEMENTS:,})")
+    parser.add_argument("--fan-in", type=int, default=EXTERNAL_MAX_FAN_IN,
+                        help=f"with --external, most runs merged at once (default: {EXTERNAL_MAX_FAN_IN})")
+    parser.add_argument("--tmp-dir", help="with --external, directory for the run files")
+    parser.add_argument("--save-trace", metavar="PATH",
+                        help="also save the steps of a single input as a binary trace file "
+                             "(.sltrace) for offline replay; the input is analyzed in trace mode")
+    parser.add_argument("--trace-codec", choices=TRACEFILE_CODECS, default="zlib",
+                        help="with --save-trace, the block compression (default: zlib)")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="read a binary trace file instead of sorting: print its header and "
+                             "one step (see --step)")
+    parser.add_argument("--step", type=int, default=-1,
+                        help="with --replay, the step to print (default: the last one)")
+    parser.add_argument("--records", action="store_true",
+                        help="inputs are records (.csv with a header, .json array, .jsonl) "
+                             "sorted by --key; outputs the counters and the sorted records")
+    parser.add_argument("--key", type=_key_spec, default=(),
+                        help="with --records, comma-separated sort fields; '-' before a field "
+                             "sorts it descending, a number indexes list records "
+                             "(default: whole records)")
+    parser.add_argument("--reverse", action="store_true",
+                        help="with --records, sort descending (equal keys keep their order)")
+    return parser
+
+
+def _key_spec(value):
+    """argparse type for --key: see parse_key_spec."""
+    try:
+        return parse_key_spec(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _probe_list(value):
+    """argparse type for --probes: a comma-separated list of PROBES."""
+    probes = tuple(p.strip() for p in value.split(",") if p.strip())
+    unknown = [p for p in probes if p not in PROBES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown probe(s): {', '.join(unknown)}")
+    return probes
+
+
+def main(argv=None):
+    """
+    Entry point for ``python -m sortlab``.
+
+    Each input produces one JSON object; with several inputs they are written
+    as JSON lines with a ``source`` field. Invalid inputs are reported on
+    stderr and make the exit status 1, without stopping the other inputs.
+
+    Returns:
+        int: Process exit status
+    """
+    args = build_parser().parse_args(argv)
+    sources = args.files or ["-"]
+    if args.replay:
+        return replay_main(args)
+    if args.save_trace and len(sources) > 1:
+        print("sortlab: --save-trace takes a single input", file=sys.stderr)
+        return 2
+    if args.external:
+        return external_main(args, sources)
+    if args.engine is None:
+        args.engine = ENGINE_LINEAR
+    if args.batch:
+        return batch_main(args, sources)
+    if args.records:
+        return records_main(args, sources)
+    if args.typed:
+        return typed_main(args, sources)
+    options = dict(mode=args.mode, engine=args.engine, show_comparisons=args.comparisons,
+                   bubble_variant=args.bubble_variant, dtype=_DTYPES[args.dtype])
+    # One Instrumentation across all inputs, so the flamegraph covers the whole run
+    instrumentation = Instrumentation(args.probes)
+
+    if args.save_trace:
+        options["mode"] = MODE_TRACE
+
+    status = 0
+    for source in sources:
+        text, path = (sys.stdin.read(), None) if source == "-" else (None, source)
+        recorded = []
+        try:
+            data = analyze(text=text, path=path, probes=instrumentation,
+                           on_steps=recorded.append if args.save_trace else None, **options)
+            if args.save_trace:
+                data["trace_file"] = save_trace(args, recorded[0], path)
+        except (ValueError, OSError) as e:
+            # InputError for bad input, ValueError from write_trace (e.g. floats)
+            print(f"sortlab: {source}: {e}", file=sys.stderr)
+            status = 1
+            continue
+
+        if len(sources) > 1:
+            data = {"source": source, **data}
+            print(json.dumps(data))
+        else:
+            print(json.dumps(data, indent=args.indent))
+
+    if args.flamegraph:
+        instrumentation.write_collapsed(args.flamegraph)
+    return status
+
+
+def save_trace(args, steps, path):
+    """
+    ``--save-trace``: write the steps the analysis recorded as a binary trace.
+
+    Args:
+        args (argparse.Namespace): Parsed options (output path, codec, engine)
+        steps (StepLog): Steps handed over by run_lab's ``on_steps``
+        path (str): Input file, stored in the trace metadata (None for stdin)
+
+    Returns:
+        dict: The trace file's path, codec, step count and size in bytes
+    """
+    size = write_trace(steps, args.save_trace, args.trace_codec,
+                       metadata={"engine": args.engine, "source": path or "-"})
+    return {"path": args.save_trace, "codec": args.trace_codec, "steps": len(steps), "bytes": size}
+
+
+def replay_main(args):
+    """
+    ``--replay`` mode: print a binary trace's header and one step, decoding
+    only the block that holds it.
+
+    Returns:
+        int: Process exit status
+    """
+    try:
+        with TraceFile(args.replay) as trace:
+            step = args.step + len(trace) if args.step < 0 else args.step
+            data = {
+                "file": args.replay,
+                "codec": trace.codec,
+                "n": trace.n,
+                "steps": len(trace),
+                "block_steps": trace.block_steps,
+                "metadata": trace.metadata,
+                "step": step,
+                "state": trace[step],
+            }
+    except (OSError, ValueError, IndexError) as e:
+        print(f"sortlab: {args.replay}: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(data, indent=args.indent))
+    return 0
+
+
+def typed_main(args, sources):
+    """
+    ``--typed`` mode: counters for large inputs without building Python lists.
+
+    Files go through load_typed (memory-mapped for .npy and raw files) and
+    stdin through parse_list with integer/float auto-detection; the output
+    has the same ``insertion`` block as the lab's JSON, but no arrays.
+
+    Returns:
+        int: Process exit status
+    """
+    status = 0
+    for source in sources:
+        try:
+            if source == "-":
+                values = to_typed(parse_list(sys.stdin.read(), "auto"))
+            else:
+                values = load_typed(source)
+        except (OSError, ValueError) as e:
+            print(f"sortlab: {source}: {e}", file=sys.stderr)
+            status = 1
+            continue
+
+        _, comparisons, moves, accesses = typed_insertion_metrics(values)
+        data = {
+            "n": len(values),
+            "dtype": dtype_name(values),
+            "engine": ENGINE_TYPED,
+            "insertion": {"comparisons": comparisons, "moves": moves, "accesses": accesses},
+        }
+        if len(sources) > 1:
+            print(json.dumps({"source": source, **data}))
+        else:
+            print(json.dumps(data, indent=args.indent))
+    return status
+
+
+def external_main(args, sources):
+    """
+    ``--external`` mode: sort each input file out of core and print its stats.
+
+    Returns:
+        int: Process exit status
+    """
+    if "-" in sources:
+        print("sortlab: --external needs input files, not stdin", file=sys.stderr)
+        return 2
+    if args.output and len(sources) > 1:
+        print("sortlab: --external --output takes a single input file", file=sys.stderr)
+        return 2
+
+    status = 0
+    for source in sources:
+        try:
+            stats = external_sort(source, args.output, args.chunk_elements, args.fan_in,
+                                  args.engine or ENGINE_HYBRID, args.tmp_dir,
+                                  Instrumentation(args.probes).counters())
+        except (OSError, ValueError) as e:
+            print(f"sortlab: {source}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        if len(sources) > 1:
+            print(json.dumps({"source": source, **stats}))
+        else:
+            print(json.dumps(stats, indent=args.indent))
+    return status
+
+
+def records_main(args, sources):
+    """
+    ``--records`` mode: sort the records of each input by ``--key``.
+
+    Keys are computed once per record and decorated (see sortlab.records),
+    so the engine counters, and the bubble/quick rows with --comparisons,
+    count key comparisons. The sorted records go to --output when given,
+    otherwise into the JSON under ``records``.
+
+    Returns:
+        int: Process exit status
+    """
+    if args.output and len(sources) > 1:
+        print("sortlab: --records --output takes a single input", file=sys.stderr)
+        return 2
+
+    status = 0
+    for source in sources:
+        try:
+            records = parse_records(sys.stdin.read()) if source == "-" else load_records(source)
+            sorted_records, comparisons, moves, accesses = sort_records(
+                records, fields=args.key, reverse=args.reverse, engine=args.engine)
+        except (OSError, ValueError) as e:
+            print(f"sortlab: {source}: {e}", file=sys.stderr)
+            status = 1
+            continue
+
+        data = {
+            "n": len(records),
+            "engine": args.engine,
+            "key": [("-" if descending else "") + str(field) for field, descending in args.key],
+            "reverse": args.reverse,
+            "insertion": {"comparisons": comparisons, "moves": moves, "accesses": accesses},
+        }
+        if args.comparisons:
+            decorated = decorate(records, fields=args.key, reverse=args.reverse).tolist()
+            _, bubble_comps, bubble_moves = bubble_sort_comparison(decorated, args.bubble_variant)
+            _, quick_comps, quick_moves = quick_sort_comparison(decorated)
+            data["bubble"] = {"comparisons": bubble_comps, "moves": bubble_moves,
+                              "variant": args.bubble_variant}
+            data["quick"] = {"comparisons": quick_comps, "moves": quick_moves}
+        if args.output:
+            data["output"] = write_records(sorted_records, args.output)
+        else:
+            data["records"] = sorted_records
+
+        if len(sources) > 1:
+            print(json.dumps({"source": source, **data}))
+        else:
+            print(json.dumps(data, indent=args.indent))
+    return status
+
+
+def batch_main(args, sources):
+    """
+    ``--batch`` mode: analyze every array of every input and output one table.
+
+    Returns:
+        int: Process exit status (1 if any array was skipped)
+    """
+    status = 0
+    results = []
+    for source in sources:
+        # stdin may mix JSON and plain "1, 2, 3" lines; load_batch detects
+        # them per line and reports bad ones as row errors
+        batch = sys.stdin if source == "-" else source
+        try:
+            result = run_batch(batch, args.comparisons, args.engine, args.bubble_variant)
+        except (InputError, OSError) as e:
+            print(f"sortlab: {source}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        for row_id, message in result.errors:
+            print(f"sortlab: {source}: {row_id}: {message}", file=sys.stderr)
+            status = 1
+        results.append((source, result))
+
+    if args.output:
+        if len(results) != 1:
+            print("sortlab: --output needs exactly one readable batch input", file=sys.stderr)
+            return 1
+        results[0][1].export(args.output, args.format)
+        return status
+
+    for source, result in results:
+        for row in result.rows():
+            if len(sources) > 1:
+                row = {"source": source, **row}
+            print(json.dumps(row))
+    return status
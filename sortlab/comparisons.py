@@ -0,0 +1,429 @@
+"""
+Bubble sort and quicksort runs used to compare against insertion sort, and the
+shared worker processes that run them for large inputs.
+"""
+
+import os
+from array import array
+from concurrent.futures import wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+from .workers import worker_pool
+
+# Bubble sort variants: key -> (short name, description)
+BUBBLE_CLASSIC = "classic"
+BUBBLE_VARIANTS = {
+    BUBBLE_CLASSIC: ("Bubble Sort", "Classic: always n passes"),
+    "early-exit": ("Bubble (exit)", "Early exit: stop after a pass with no swaps"),
+    "last-swap": ("Bubble (bound)", "Last-swap bound: next pass ends at the last swap"),
+    "cocktail": ("Cocktail Shaker", "Cocktail shaker: alternate forward/backward passes"),
+}
+
+
+def bubble_sort_comparison(arr, variant=BUBBLE_CLASSIC):
+    """
+    Implement bubble sort for performance comparison with insertion sort.
+    
+    Algorithm:
+    - Compare adjacent elements
+    - Swap if they are in wrong order
+    - Repeat until array is sorted
+    
+    Variants (see BUBBLE_VARIANTS):
+    - "classic": always runs all n passes
+    - "early-exit": stops after the first pass without a swap, O(n) on
+      sorted input
+    - "last-swap": everything after the last swap of a pass is already in
+      place, so the next pass stops there
+    - "cocktail": bidirectional passes with both ends bounded by their last
+      swap, which also moves small elements near the end ("turtles") quickly
+    
+    Complexity: O(n²) time, O(1) space (O(n) best case for adaptive variants)
+    
+    Args:
+        arr (list): Input array of integers
+        variant (str): Key in BUBBLE_VARIANTS
+    
+    Returns:
+        tuple: (sorted_array, comparisons, moves) where moves counts swaps
+    
+    Raises:
+        ValueError: If the variant is unknown
+    """
+    if variant not in BUBBLE_VARIANTS:
+        raise ValueError(f"unknown bubble sort variant '{variant}'")
+
+    a = list(arr)  # Work on a copy (also of typed buffers)
+    n = len(a)
+    comparisons = 0
+    moves = 0
+    
+    if variant == BUBBLE_CLASSIC:
+        # Bubble sort implementation
+        for i in range(n):
+            for j in range(0, n - i - 1):
+                comparisons += 1
+                if a[j] > a[j + 1]:
+                    # Swap adjacent elements
+                    a[j], a[j + 1] = a[j + 1], a[j]
+                    moves += 1
+
+    elif variant == "early-exit":
+        for i in range(n):
+            swapped = False
+            for j in range(0, n - i - 1):
+                comparisons += 1
+                if a[j] > a[j + 1]:
+                    a[j], a[j + 1] = a[j + 1], a[j]
+                    moves += 1
+                    swapped = True
+            if not swapped:
+                break
+
+    elif variant == "last-swap":
+        bound = n - 1
+        while bound > 0:
+            last_swap = 0
+            for j in range(bound):
+                comparisons += 1
+                if a[j] > a[j + 1]:
+                    a[j], a[j + 1] = a[j + 1], a[j]
+                    moves += 1
+                    last_swap = j
+            bound = last_swap
+
+    else:  # cocktail
+        lo, hi = 0, n - 1
+        while lo < hi:
+            # Forward pass: largest remaining element sinks to hi
+            last_swap = lo
+            for j in range(lo, hi):
+                comparisons += 1
+                if a[j] > a[j + 1]:
+                    a[j], a[j + 1] = a[j + 1], a[j]
+                    moves += 1
+                    last_swap = j
+            hi = last_swap
+
+            # Backward pass: smallest remaining element rises to lo
+            last_swap = hi
+            for j in range(hi - 1, lo - 1, -1):
+                comparisons += 1
+                if a[j] > a[j + 1]:
+                    a[j], a[j + 1] = a[j + 1], a[j]
+                    moves += 1
+                    last_swap = j + 1
+            lo = last_swap
+    
+    return a, comparisons, moves
+
+
+# Introsort tuning: partitions this small finish with insertion sort, and
+# partitions at least this large pick their pivot with Tukey's ninther
+QUICK_SORT_INSERTION_CUTOFF = 16
+QUICK_SORT_NINTHER_THRESHOLD = 128
+
+
+def quick_sort_comparison(arr):
+    """
+    Implement quicksort for performance comparison with insertion sort.
+    
+    This is an in-place introsort, the way production quicksorts are built:
+    - Pivot is the median of three (or Tukey's ninther for large partitions)
+    - Hoare partitioning swaps elements in place, no temporary lists
+    - Partitions of QUICK_SORT_INSERTION_CUTOFF elements or fewer are
+      finished with insertion sort
+    - If recursion gets deeper than 2*log2(n) the partition is heapsorted,
+      which caps the worst case at O(n log n)
+    - An explicit stack (smaller side first) replaces recursion, so
+      adversarial inputs cannot hit Python's recursion limit
+    
+    Complexity: O(n log n) worst case, O(log n) space
+    
+    Args:
+        arr (list): Input array of integers
+    
+    Returns:
+        tuple: (sorted_array, comparisons, moves)
+            - comparisons: element comparisons
+            - moves: element writes (a swap counts as two)
+    """
+    a = list(arr)
+    comparisons = 0
+    moves = 0
+
+    def median_index(i, j, k):
+        """Index of the median of a[i], a[j], a[k]."""
+        nonlocal comparisons
+        comparisons += 1
+        if a[i] < a[j]:
+            comparisons += 1
+            if a[j] < a[k]:
+                return j
+            comparisons += 1
+            return k if a[i] < a[k] else i
+        comparisons += 1
+        if a[i] < a[k]:
+            return i
+        comparisons += 1
+        return k if a[j] < a[k] else j
+
+    def partition(lo, hi):
+        """Hoare partition of a[lo..hi]; returns the split index."""
+        nonlocal comparisons, moves
+        size = hi - lo + 1
+        mid = lo + size // 2
+        if size >= QUICK_SORT_NINTHER_THRESHOLD:
+            d = size // 8
+            p = median_index(
+                median_index(lo, lo + d, lo + 2 * d),
+                median_index(mid - d, mid, mid + d),
+                median_index(hi - 2 * d, hi - d, hi),
+            )
+        else:
+            p = median_index(lo, mid, hi)
+
+        # Park the pivot at lo so the split never leaves an empty side
+        if p != lo:
+            a[lo], a[p] = a[p], a[lo]
+            moves += 2
+        pivot = a[lo]
+
+        i, j = lo - 1, hi + 1
+        while True:
+            i += 1
+            comparisons += 1
+            while a[i] < pivot:
+                i += 1
+                comparisons += 1
+            j -= 1
+            comparisons += 1
+            while a[j] > pivot:
+                j -= 1
+                comparisons += 1
+            if i >= j:
+                return j
+            a[i], a[j] = a[j], a[i]
+            moves += 2
+
+    def insertion(lo, hi):
+        """Finish a small partition a[lo..hi] with insertion sort."""
+        nonlocal comparisons, moves
+        for i in range(lo + 1, hi + 1):
+            key = a[i]
+            j = i - 1
+            while j >= lo:
+                comparisons += 1
+                if a[j] > key:
+                    a[j + 1] = a[j]
+                    moves += 1
+                    j -= 1
+                else:
+                    break
+            if j + 1 != i:
+                a[j + 1] = key
+                moves += 1
+
+    def heapsort(lo, hi):
+        """Heapsort a[lo..hi] in place (depth-limit fallback)."""
+        nonlocal comparisons, moves
+        size = hi - lo + 1
+
+        def sift_down(root, end):
+            nonlocal comparisons, moves
+            while 2 * root + 1 < end:
+                child = 2 * root + 1
+                if child + 1 < end:
+                    comparisons += 1
+                    if a[lo + child] < a[lo + child + 1]:
+                        child += 1
+                comparisons += 1
+                if a[lo + root] < a[lo + child]:
+                    a[lo + root], a[lo + child] = a[lo + child], a[lo + root]
+                    moves += 2
+                    root = child
+                else:
+                    return
+
+        for start in range(size // 2 - 1, -1, -1):
+            sift_down(start, size)
+        for end in range(size - 1, 0, -1):
+            a[lo], a[lo + end] = a[lo + end], a[lo]
+            moves += 2
+            sift_down(0, end)
+
+    stack = [(0, len(a) - 1, 2 * max(len(a), 1).bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while hi - lo + 1 > QUICK_SORT_INSERTION_CUTOFF:
+            if depth == 0:
+                heapsort(lo, hi)
+                break
+            depth -= 1
+            split = partition(lo, hi)
+            # Defer the larger side, keep looping on the smaller one
+            if split - lo < hi - split:
+                stack.append((split + 1, hi, depth))
+                hi = split
+            else:
+                stack.append((lo, split, depth))
+                lo = split + 1
+        else:
+            insertion(lo, hi)
+
+    return a, comparisons, moves
+
+
+# Comparison runs (bubble/quick) go to worker processes for inputs at least
+# this long; smaller ones are cheaper to run inline than to ship to a worker
+COMPARISON_PARALLEL_MIN_SIZE = 2_000
+# Worker slots a request checks out of the shared WorkerPool
+COMPARISON_WORKERS = 2
+# Seconds to wait for the comparison runs before reporting them as timed out
+COMPARISON_TIMEOUT = float(os.environ.get("SORTLAB_COMPARISON_TIMEOUT", 60))
+
+COMPARISON_ALGORITHMS = {
+    "bubble": bubble_sort_comparison,
+    "quick": quick_sort_comparison,
+}
+
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _run_comparison_worker(name, shm_name, length, values, options):
+    """
+    Pool task: run one comparison algorithm on the shared input array.
+    
+    The array is read from shared memory when ``shm_name`` is given (the
+    parent wrote it once as int64); otherwise ``values`` holds the pickled list.
+    ``options`` are passed to the algorithm as keyword arguments.
+    
+    Returns:
+        tuple: (comparisons, moves)
+    """
+    if shm_name is not None:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            with shm.buf[:length * 8].cast("q") as view:
+                values = view.tolist()
+        finally:
+            shm.close()
+    _, comparisons, moves = COMPARISON_ALGORITHMS[name](values, **options)
+    return comparisons, moves
+
+
+class PendingComparisons:
+    """
+    Handle for the bubble/quick sort runs started by start_comparisons.
+    
+    Small inputs are run inline when the results are collected; larger ones
+    are already running on worker slots checked out of the shared WorkerPool,
+    sharing one int64 copy of the input through shared memory. Slots come
+    back warm for the next request; a timeout or cancellation kills only the
+    slots still running this request's sorts.
+    """
+
+    def __init__(self, arr, bubble_variant=BUBBLE_CLASSIC, pool=None):
+        self.arr = arr
+        self.bubble_variant = bubble_variant
+        self.options = {"bubble": {"variant": bubble_variant}, "quick": {}}
+        self.futures = {}
+        self.pool = worker_pool if pool is None else pool
+        self.slots = {}
+        self.shm = None
+        self.timed_out = False
+
+        if len(arr) < COMPARISON_PARALLEL_MIN_SIZE:
+            return
+
+        shm_name = None
+        values = arr
+        if all(type(x) is int and INT64_MIN <= x <= INT64_MAX for x in arr):
+            # One int64 copy in shared memory instead of one pickle per worker
+            self.shm = shared_memory.SharedMemory(create=True, size=len(arr) * 8)
+            self.shm.buf[:len(arr) * 8] = array("q", arr).tobytes()
+            shm_name = self.shm.name
+            values = None
+
+        slots = [self.pool.acquire() for _ in range(COMPARISON_WORKERS)]
+        for index, name in enumerate(COMPARISON_ALGORITHMS):
+            slot = slots[index % len(slots)]
+            self.slots[name] = slot
+            self.futures[name] = slot.submit(
+                _run_comparison_worker, name, shm_name, len(arr), values, self.options[name]
+            )
+
+    def results(self, timeout=COMPARISON_TIMEOUT):
+        """
+        Wait for every comparison run.
+        
+        Args:
+            timeout (float): Seconds to wait for the pooled runs in total
+        
+        Returns:
+            dict: Algorithm name -> (comparisons, moves), or (None, None) for a
+                run that did not finish within the timeout (or whose worker died)
+        """
+        if not self.futures:
+            results = {}
+            for name, algorithm in COMPARISON_ALGORITHMS.items():
+                _, comparisons, moves = algorithm(self.arr, **self.options[name])
+                results[name] = (comparisons, moves)
+            return results
+
+        try:
+            done, not_done = wait(self.futures.values(), timeout=timeout)
+            results = {}
+            for name, future in self.futures.items():
+                try:
+                    results[name] = future.result() if future in done else (None, None)
+                except BrokenProcessPool:
+                    # The worker died (killed or out of memory): report it like a timeout
+                    results[name] = (None, None)
+                    self.timed_out = True
+            if not_done:
+                self.timed_out = True
+            return results
+        finally:
+            self._release()
+
+    def cancel(self):
+        """
+        Abandon the runs (e.g. when the request was cancelled): this request's
+        slots still busy are killed and the shared input freed.
+        """
+        if any(not future.done() for future in self.futures.values()):
+            self.timed_out = True
+        self._release()
+        self.futures = {}
+
+    def _release(self):
+        """Hand the slots back (killing busy or broken ones) and free the shared input."""
+        for slot in {id(slot): slot for slot in self.slots.values()}.values():
+            self.pool.finish(slot, [self.futures[name]
+                                    for name, owner in self.slots.items() if owner is slot])
+        self.slots = {}
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+def start_comparisons(arr, bubble_variant=BUBBLE_CLASSIC, pool=None):
+    """
+    Start the bubble sort and quicksort comparison runs for an input array.
+    
+    Call this before running the main engine so the comparisons overlap with
+    it, then collect them with PendingComparisons.results().
+    
+    Args:
+        arr (list): Input array of integers
+        bubble_variant (str): Key in BUBBLE_VARIANTS
+        pool (WorkerPool): Worker slots to run on (the shared worker_pool
+            when omitted)
+    
+    Returns:
+        PendingComparisons: Handle for the running comparisons
+    """
+    return PendingComparisons(arr, bubble_variant, pool)
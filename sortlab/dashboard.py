@@ -0,0 +1,187 @@
+"""
+HTML performance dashboard: precompiled templates, one shared stylesheet and
+a downsampled SVG bar chart of the input array.
+"""
+
+from functools import lru_cache
+from html import escape
+from string import Template
+
+# Maximum bars in the array chart; longer arrays are downsampled to this many bins
+DASHBOARD_BAR_BINS = 200
+
+# Every style the dashboard uses, sent once per payload instead of per cell
+DASHBOARD_CSS = """<style>
+.sl-dash{font-family:Arial,sans-serif;background:linear-gradient(135deg,#667eea 0%,#764ba2 100%);padding:25px;border-radius:15px;color:#fff;overflow-x:auto;box-shadow:0 8px 25px rgba(0,0,0,.15)}
+.sl-dash h3{margin-top:0;font-size:1.8em;font-weight:600;text-shadow:1px 1px 2px rgba(0,0,0,.2)}
+.sl-dash h4{margin:20px 0 10px;font-size:1.3em}
+.sl-table{width:100%;border-collapse:collapse;background:rgba(255,255,255,.15);backdrop-filter:blur(10px);border-radius:10px;overflow:hidden}
+.sl-table th{padding:15px;text-align:center;font-size:1.1em}
+.sl-table th:first-child{text-align:left}
+.sl-head{background:rgba(255,255,255,.25);font-weight:bold;border-bottom:2px solid rgba(255,255,255,.3)}
+.sl-row{border-bottom:1px solid rgba(255,255,255,.15)}
+.sl-row:last-child{border-bottom:none}
+.sl-table td{padding:15px;text-align:center;font-weight:600;font-size:1.1em}
+.sl-table td.sl-label{text-align:left;font-weight:500;font-size:1em}
+.sl-best{background:rgba(255,255,255,.2);border-radius:5px}
+.sl-gold{font-size:1.2em;color:#ffd700}
+.sl-panel{background:rgba(255,255,255,.15);padding:15px;border-radius:10px;margin-top:10px;backdrop-filter:blur(5px)}
+.sl-panel p{font-size:1.05em}
+.sl-panel p:last-child{margin-bottom:0}
+.sl-bars{width:100%;height:120px;display:block;background:rgba(255,255,255,.1);border-radius:8px}
+.sl-bars path{fill:#ffd700;fill-opacity:.85}
+.sl-caption{font-size:.9em;opacity:.85;margin:6px 0 0}
+</style>"""
+
+_DASHBOARD_TEMPLATE = Template(
+    '<div class="sl-dash"><h3>ALGORITHM PERFORMANCE DASHBOARD</h3>'
+    '<table class="sl-table">$head$rows</table><br>'
+    '<h4>Algorithm Rankings:</h4>'
+    '<div class="sl-panel">$rankings'
+    '<p>Array Size: <strong class="sl-gold">$size</strong> elements</p></div>'
+    '$chart</div>'
+)
+_ROW_TEMPLATE = Template('<tr class="sl-row"><td class="sl-label"><b>$label</b></td>$cells</tr>')
+_CHART_TEMPLATE = Template(
+    '<h4>Input Array:</h4>'
+    '<svg class="sl-bars" viewBox="0 0 $width 100" preserveAspectRatio="none" role="img">'
+    '<path d="$path"/></svg><p class="sl-caption">$caption</p>'
+)
+
+
+def _known(value):
+    """Rank a timed-out (None) counter after every real one."""
+    return float("inf") if value is None else value
+
+
+def _count_text(value, missing="timed out"):
+    """Format a counter for display, showing timed-out (or uncounted) runs as such."""
+    return missing if value is None else str(value)
+
+
+@lru_cache(maxsize=64)
+def _table_head(engine_name, bubble_name, show_comparisons):
+    """Header row for one column layout (static, so built once per layout)."""
+    columns = [engine_name] + ([bubble_name, "Quick"] if show_comparisons else []) + ["Best"]
+    return ('<tr class="sl-head"><th>Metric</th>'
+            + "".join(f"<th>{escape(name)}</th>" for name in columns) + "</tr>")
+
+
+def _cells(*values):
+    return "".join(f"<td>{value}</td>" for value in values)
+
+
+def render_array_bars(values, bins=DASHBOARD_BAR_BINS):
+    """
+    Draw an array as an SVG bar chart with at most ``bins`` bars.
+
+    Arrays longer than ``bins`` are split into equal bins and each bar spans
+    the bin's minimum to maximum (clamped to the zero baseline), so the
+    payload stays the same size however long the array is. All bars are one
+    ``<path>``.
+
+    Args:
+        values (list): Array to draw
+        bins (int): Maximum number of bars
+
+    Returns:
+        str: SVG markup with a caption, or "" for an empty array
+    """
+    n = len(values)
+    if n == 0:
+        return ""
+    if n <= bins:
+        ranges = [(v, v) for v in values]
+    else:
+        ranges = []
+        for k in range(bins):
+            chunk = values[k * n // bins:(k + 1) * n // bins]
+            ranges.append((min(chunk), max(chunk)))
+
+    low = min(0, min(lo for lo, _ in ranges))
+    high = max(0, max(hi for _, hi in ranges))
+    scale = 100 / ((high - low) or 1)
+
+    def y(value):
+        return f"{round((high - value) * scale, 1):g}"
+
+    path = "".join(
+        f"M{x} {y(max(hi, 0))}h1V{y(min(lo, 0))}h-1z" for x, (lo, hi) in enumerate(ranges)
+    )
+    if n <= bins:
+        caption = f"{n:,} values"
+    else:
+        caption = f"{n:,} values in {bins} bins (each bar spans the bin's min to max)"
+    return _CHART_TEMPLATE.substitute(width=len(ranges), path=path, caption=caption)
+
+
+def render_dashboard(arr, comparisons, moves, accesses, engine_name, show_comparisons=False,
+                     bubble_name="Bubble Sort", bubble_comps=None, bubble_moves=None,
+                     quick_comps=None, quick_moves=None, chart=True):
+    """
+    Render the performance dashboard.
+
+    Args:
+        arr (list): Input array (its size is shown and, with ``chart``, drawn)
+        comparisons (int): Insertion sort comparisons (None when not counted)
+        moves (int): Insertion sort moves (or None)
+        accesses (int): Insertion sort array accesses (or None)
+        engine_name (str): Column title for the selected engine, also named
+            in the "Best" column and the rankings when it wins
+        show_comparisons (bool): Include the bubble and quick columns
+        bubble_name (str): Column title for the bubble sort variant
+        bubble_comps, bubble_moves, quick_comps, quick_moves (int): Comparison
+            counters (None when timed out)
+        chart (bool): Append the SVG bar chart of ``arr``
+
+    Returns:
+        str: Dashboard HTML including its stylesheet
+    """
+    total = None if None in (comparisons, moves, accesses) else comparisons + moves + accesses
+    engine_label = escape(engine_name)
+    if show_comparisons:
+        best_comparisons = (
+            engine_label if _known(comparisons) <= min(_known(bubble_comps), _known(quick_comps))
+            else "Quick" if _known(quick_comps) <= _known(bubble_comps) else "Bubble"
+        )
+        best_moves = "Best" if _known(moves) <= min(_known(bubble_moves), _known(quick_moves)) else ""
+        comparison_rows = (
+            (_count_text(bubble_comps), _count_text(quick_comps)),
+            (_count_text(bubble_moves), _count_text(quick_moves)),
+            (_count_text(None if bubble_comps is None else bubble_comps + bubble_moves),
+             _count_text(None if quick_comps is None else quick_comps + quick_moves)),
+        )
+        rankings = ""
+        if comparisons is not None and comparisons <= min(_known(bubble_comps), _known(quick_comps)):
+            rankings += f"<p><strong>{engine_label} wins on comparisons</strong></p>"
+        if _known(quick_comps) + _known(quick_moves) <= _known(comparisons) + _known(moves):
+            rankings += "<p><strong>Quick Sort is most efficient overall</strong></p>"
+    else:
+        best_comparisons, best_moves = engine_label, "Best"
+        comparison_rows = ((), (), ())
+        rankings = "<p>Comparisons disabled for single-algorithm mode.</p>"
+
+    rows = (
+        _ROW_TEMPLATE.substitute(
+            label="Comparisons",
+            cells=_cells(_count_text(comparisons, "not counted"), *comparison_rows[0])
+                  + f'<td class="sl-best">{best_comparisons}</td>',
+        )
+        + _ROW_TEMPLATE.substitute(
+            label="Array Moves",
+            cells=_cells(_count_text(moves, "not counted"), *comparison_rows[1])
+                  + f'<td class="sl-best">{best_moves}</td>',
+        )
+        + _ROW_TEMPLATE.substitute(
+            label="Total Operations",
+            cells=f'<td><strong class="sl-gold">{_count_text(total, "not counted")}</strong></td>'
+                  + _cells(*comparison_rows[2], "✓"),
+        )
+    )
+    return DASHBOARD_CSS + _DASHBOARD_TEMPLATE.substitute(
+        head=_table_head(engine_name, bubble_name, bool(show_comparisons)),
+        rows=rows,
+        rankings=rankings,
+        size=len(arr),
+        chart=render_array_bars(arr) if chart else "",
+    )
@@ -0,0 +1,809 @@
+"""
+Insertion sort engines (linear, binary, block, Shell) that yield step records,
+plus the metrics-only paths used when no trace is needed.
+"""
+
+from array import array
+from functools import lru_cache, partial
+
+from .admission import DEADLINE_CHECK_INTERVAL
+from .parsing import np
+from .presortedness import HYBRID_INSERTION, HYBRID_RUN_MERGE, analyze_presortedness, find_runs
+from .steps import (
+    STEP_BLOCK_INSERT,
+    STEP_INITIAL,
+    STEP_INSERT,
+    STEP_MERGE,
+    STEP_REVERSE,
+    STEP_SHIFT,
+    StepLog,
+)
+from .typed import numpy_inversions, prefix_minimum_count, to_typed
+from .variants import COUNTERS, compile_variant
+
+
+def iter_insertion_sort(arr):
+    """
+    Run insertion sort lazily, yielding a record for every step as it happens.
+    
+    This is the engine behind insertion_sort_with_steps. Because it is a
+    generator, callers can start displaying steps before the sort finishes
+    and never need to hold more than one step at a time.
+    
+    Args:
+        arr (list): Input array of integers to sort
+    
+    Yields:
+        tuple: (kind, i, j, comparisons, moves, accesses, changes, array)
+            - kind: One of the STEP_* constants
+            - changes: (index, value) pairs written by this step
+            - array: The live working array (valid only until the next step)
+            The remaining fields match StepLog.append.
+    """
+    a = arr[:]  # Create a copy to avoid modifying original
+    comparisons = 0
+    moves = 0
+    array_accesses = 0
+
+    # Record initial state
+    yield (STEP_INITIAL, 0, 0, comparisons, moves, array_accesses, (), a)
+
+    # Main insertion sort loop
+    for i in range(1, len(a)):
+        key = a[i]  # Current element to insert
+        j = i - 1   # Start comparing from position before key
+        array_accesses += 1
+
+        # Shift elements greater than key to the right
+        while j >= 0:
+            comparisons += 1  # Count each comparison
+            array_accesses += 1
+            
+            if a[j] > key:
+                # Shift element right
+                a[j + 1] = a[j]
+                moves += 1
+                array_accesses += 1
+                
+                # Record this shift step (only the written cell is stored)
+                yield (STEP_SHIFT, i, j, comparisons, moves, array_accesses,
+                       ((j + 1, a[j + 1]),), a)
+                j -= 1
+            else:
+                # Found correct position, stop shifting
+                break
+
+        # Insert key in correct position
+        a[j + 1] = key
+        moves += 1
+        array_accesses += 1
+        
+        # Record insertion step
+        yield (STEP_INSERT, i, j + 1, comparisons, moves, array_accesses,
+               ((j + 1, key),), a)
+
+
+def insertion_sort_with_steps(arr):
+    """
+    Implement insertion sort algorithm with complete step-by-step tracking.
+    
+    Algorithm:
+    - Start from index 1 (first element is trivially sorted)
+    - For each element (key), compare with sorted portion
+    - Shift larger elements right to make space
+    - Insert key in correct position
+    
+    Complexity:
+    - Time: O(n) best case, O(n²) average/worst case
+    - Space: O(1) - sorts in place (the step log grows with the step count)
+    
+    Args:
+        arr (list): Input array of integers to sort
+    
+    Returns:
+        tuple: (sorted_array, steps_list, comparisons, moves, accesses)
+            - sorted_array: The sorted version of input array
+            - steps_list: StepLog recording each step (indexable like a list
+              of step dictionaries)
+            - comparisons: Total number of element comparisons
+            - moves: Total number of array writes
+            - accesses: Total number of array read/write operations
+    """
+    return sort_with_steps(arr, ENGINE_LINEAR)
+
+
+def count_inversions(arr):
+    """
+    Sort a copy of the array with bottom-up merge sort, counting inversions.
+    
+    An inversion is a pair i < j with arr[i] > arr[j]. Equal elements are
+    never counted, matching the strict ``a[j] > key`` test of insertion sort.
+    
+    Complexity: O(n log n) time, O(n) extra space
+    
+    Args:
+        arr (list): Input array of integers (an array.array is kept typed,
+            so the working buffers cost 8 bytes per element)
+    
+    Returns:
+        tuple: (sorted_array, inversions)
+    """
+    a = array(arr.typecode, arr) if isinstance(arr, array) else list(arr)
+    n = len(a)
+    buf = a[:]
+    inversions = 0
+    width = 1
+
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+
+            # Runs already in order (or a lone left run): copy through
+            if mid >= hi or a[mid - 1] <= a[mid]:
+                buf[lo:hi] = a[lo:hi]
+                continue
+
+            i, j, k = lo, mid, lo
+            while i < mid and j < hi:
+                if a[j] < a[i]:
+                    # a[j] jumps ahead of every element left in the left run
+                    buf[k] = a[j]
+                    inversions += mid - i
+                    j += 1
+                else:
+                    buf[k] = a[i]
+                    i += 1
+                k += 1
+            buf[k:k + mid - i] = a[i:mid]
+            k += mid - i
+            buf[k:hi] = a[j:hi]
+
+        a, buf = buf, a
+        width *= 2
+
+    return a, inversions
+
+
+def insertion_sort_metrics(arr):
+    """
+    Compute insertion sort's counters in O(n log n) without running it.
+    
+    For each i >= 1 insertion sort shifts every earlier element greater than
+    a[i], so total shifts equal the inversion count. Each pass makes one
+    comparison per shift, plus one final comparison that breaks the loop
+    unless the key is smaller than everything before it (a new strict prefix
+    minimum). From that:
+    
+    - comparisons = inversions + (n - 1) - new_minimums
+    - moves       = inversions + (n - 1)           (shifts + one insert per pass)
+    - accesses    = 2 * (n - 1) + comparisons + inversions
+    
+    The results are identical to insertion_sort_with_steps.
+    
+    Args:
+        arr (list): Input array of integers
+    
+    Returns:
+        tuple: (sorted_array, comparisons, moves, accesses)
+    """
+    sorted_arr, inversions = count_inversions(arr)
+    passes = max(len(arr) - 1, 0)
+
+    # Passes whose key is smaller than every earlier element never hit the break
+    new_minimums = 0
+    if arr:
+        smallest = arr[0]
+        for x in arr[1:]:
+            if x < smallest:
+                smallest = x
+                new_minimums += 1
+
+    comparisons = inversions + passes - new_minimums
+    moves = inversions + passes
+    accesses = 2 * passes + comparisons + inversions
+    return sorted_arr, comparisons, moves, accesses
+
+
+def iter_binary_insertion_sort(arr):
+    """
+    Binary insertion sort: find each key's position by binary search.
+    
+    The search needs only O(log i) comparisons per key instead of O(i), so
+    total comparisons drop to O(n log n). Elements are still shifted one at a
+    time, so moves (and the steps recorded) match linear insertion sort.
+    The search stops at the first element greater than the key, keeping the
+    sort stable.
+    
+    Args:
+        arr (list): Input array of integers to sort
+    
+    Yields:
+        tuple: Step records in the same format as iter_insertion_sort
+    """
+    a = arr[:]
+    comparisons = 0
+    moves = 0
+    array_accesses = 0
+
+    yield (STEP_INITIAL, 0, 0, comparisons, moves, array_accesses, (), a)
+
+    for i in range(1, len(a)):
+        key = a[i]
+        array_accesses += 1
+
+        # Binary search for the first position holding an element > key
+        lo, hi = 0, i
+        while lo < hi:
+            mid = (lo + hi) // 2
+            comparisons += 1
+            array_accesses += 1
+            if a[mid] > key:
+                hi = mid
+            else:
+                lo = mid + 1
+
+        # Shift the larger elements right one at a time (read + write each)
+        for j in range(i - 1, lo - 1, -1):
+            a[j + 1] = a[j]
+            moves += 1
+            array_accesses += 2
+            yield (STEP_SHIFT, i, j, comparisons, moves, array_accesses,
+                   ((j + 1, a[j + 1]),), a)
+
+        a[lo] = key
+        moves += 1
+        array_accesses += 1
+        yield (STEP_INSERT, i, lo, comparisons, moves, array_accesses, ((lo, key),), a)
+
+
+def iter_block_insertion_sort(arr):
+    """
+    Block-move insertion sort: binary search plus one slice assignment.
+    
+    Comparisons are the same as binary insertion sort, but all larger
+    elements are moved with a single ``a[lo+1:i+1] = a[lo:i]`` (a C-level
+    memmove), so each key produces exactly one recorded step. Moves still
+    count every element written.
+    
+    Args:
+        arr (list): Input array of integers to sort
+    
+    Yields:
+        tuple: Step records in the same format as iter_insertion_sort
+    """
+    a = arr[:]
+    comparisons = 0
+    moves = 0
+    array_accesses = 0
+
+    yield (STEP_INITIAL, 0, 0, comparisons, moves, array_accesses, (), a)
+
+    for i in range(1, len(a)):
+        key = a[i]
+        array_accesses += 1
+
+        lo, hi = 0, i
+        while lo < hi:
+            mid = (lo + hi) // 2
+            comparisons += 1
+            array_accesses += 1
+            if a[mid] > key:
+                hi = mid
+            else:
+                lo = mid + 1
+
+        # Move the whole block a[lo:i] right by one, then drop the key in
+        a[lo + 1:i + 1] = a[lo:i]
+        a[lo] = key
+        moves += i - lo + 1
+        array_accesses += 2 * (i - lo) + 1
+        yield (STEP_BLOCK_INSERT, i, lo, comparisons, moves, array_accesses,
+               tuple(zip(range(lo, i + 1), a[lo:i + 1])), a)
+
+
+# Shell sort gap sequences (see shell_gaps)
+SHELL_GAP_SEQUENCES = ("shell", "knuth", "ciura")
+CIURA_GAPS = (1, 4, 10, 23, 57, 132, 301, 701, 1750)
+
+
+def shell_gaps(n, sequence="ciura"):
+    """
+    Build a decreasing Shell sort gap sequence for an array of length n.
+    
+    Sequences:
+    - "shell": n/2, n/4, ..., 1 (Shell's original)
+    - "knuth": 1, 4, 13, 40, ... up to n/3 (h = 3h + 1)
+    - "ciura": 1, 4, 10, 23, 57, 132, 301, 701, 1750, then x2.25
+    
+    Args:
+        n (int): Array length
+        sequence (str or list): Sequence name, or an explicit list of gaps
+    
+    Returns:
+        list: Gaps in decreasing order, always ending with 1
+    
+    Raises:
+        ValueError: If the sequence name is unknown
+    """
+    if not isinstance(sequence, str):
+        gaps = {int(g) for g in sequence if 0 < int(g) < max(n, 2)}
+    elif sequence == "shell":
+        gaps = set()
+        gap = n // 2
+        while gap > 0:
+            gaps.add(gap)
+            gap //= 2
+    elif sequence == "knuth":
+        gaps = {1}
+        gap = 4
+        while gap <= n // 3:
+            gaps.add(gap)
+            gap = 3 * gap + 1
+    elif sequence == "ciura":
+        gaps = {g for g in CIURA_GAPS if g < n}
+        gap = CIURA_GAPS[-1]
+        while gap < n:
+            gaps.add(gap)
+            gap = int(gap * 2.25)
+        gaps = {g for g in gaps if g < n}
+    else:
+        raise ValueError(f"unknown gap sequence '{sequence}'")
+
+    gaps.add(1)
+    return sorted(gaps, reverse=True)
+
+
+def iter_shell_sort(arr, gaps="ciura"):
+    """
+    Shell sort: gapped insertion sort passes over shrinking gaps.
+    
+    Each pass is an insertion sort over elements ``gap`` apart, so the final
+    gap-1 pass runs on nearly sorted data. Not stable.
+    
+    Args:
+        arr (list): Input array of integers to sort
+        gaps (str or list): Gap sequence name (see shell_gaps) or explicit gaps
+    
+    Yields:
+        tuple: Step records in the same format as iter_insertion_sort. ``i``
+            is the position of the key and ``j`` the element compared with.
+    """
+    a = arr[:]
+    n = len(a)
+    comparisons = 0
+    moves = 0
+    array_accesses = 0
+
+    yield (STEP_INITIAL, 0, 0, comparisons, moves, array_accesses, (), a)
+
+    for gap in shell_gaps(n, gaps):
+        for i in range(gap, n):
+            key = a[i]
+            j = i - gap
+            array_accesses += 1
+
+            while j >= 0:
+                comparisons += 1
+                array_accesses += 1
+                if a[j] > key:
+                    a[j + gap] = a[j]
+                    moves += 1
+                    array_accesses += 1
+                    yield (STEP_SHIFT, i, j, comparisons, moves, array_accesses,
+                           ((j + gap, a[j + gap]),), a)
+                    j -= gap
+                else:
+                    break
+
+            a[j + gap] = key
+            moves += 1
+            array_accesses += 1
+            yield (STEP_INSERT, i, j + gap, comparisons, moves, array_accesses,
+                   ((j + gap, key),), a)
+
+
+def iter_typed_insertion_sort(arr):
+    """
+    Linear insertion sort on an 8-byte-per-element typed buffer.
+    
+    The input is converted once with to_typed (array('q') for integers,
+    array('d') for floats; NumPy input is copied into the matching array so
+    each step indexes plain Python numbers) and sorted in that buffer, so no
+    boxed list copy of the array is kept. Steps and counters match
+    iter_insertion_sort.
+    
+    Args:
+        arr (sequence): Input numbers (list, array.array or NumPy array)
+    
+    Yields:
+        tuple: Step records in the same format as iter_insertion_sort
+    """
+    a = to_typed(arr)
+    if not isinstance(a, array):
+        a = array("d" if a.dtype.kind == "f" else "q", a.tobytes())
+    return iter_insertion_sort(a)
+
+
+def typed_insertion_metrics(arr):
+    """
+    insertion_sort_metrics for large typed inputs, without boxing every value.
+    
+    With NumPy the inversion count is vectorized (numpy_inversions) and the
+    sorted output is an int64/float64 array; without it the merge count runs
+    on array('q')/array('d') buffers. Counters are identical to
+    insertion_sort_metrics.
+    
+    Args:
+        arr (sequence): Input numbers (list, array.array or NumPy array)
+    
+    Returns:
+        tuple: (sorted_buffer, comparisons, moves, accesses)
+    """
+    a = to_typed(arr)
+    if np is not None:
+        a = np.asarray(a)
+        inversions = numpy_inversions(a)
+        sorted_arr = np.sort(a, kind="stable")
+    else:
+        sorted_arr, inversions = count_inversions(a)
+    passes = max(len(a) - 1, 0)
+    new_minimums = prefix_minimum_count(a)
+
+    comparisons = inversions + passes - new_minimums
+    moves = inversions + passes
+    accesses = 2 * passes + comparisons + inversions
+    return sorted_arr, comparisons, moves, accesses
+
+
+# Runs shorter than this are extended with insertion sort before merging
+HYBRID_MIN_RUN = 32
+# Shifts per element the insertion strategy may spend before the hybrid engine
+# switches to run-merge (the inversion estimate behind that choice is sampled
+# for large inputs and can be far too low)
+HYBRID_SHIFT_BUDGET = 2
+
+
+def iter_hybrid_sort(arr, min_run=HYBRID_MIN_RUN):
+    """
+    Adaptive hybrid sort driven by a presortedness pre-pass.
+    
+    The array is profiled with analyze_presortedness (its n - 1 scan
+    comparisons are charged to the initial step; the sampled inversion
+    estimate is not counted) and sorted with the strategy it selects:
+    
+    - HYBRID_NONE: already sorted, nothing more to do
+    - HYBRID_INSERTION: linear insertion sort, O(n + inversions). Above
+      INVERSION_SAMPLE_SIZE elements the inversions behind this choice are
+      only estimated, so the shifts are capped at HYBRID_SHIFT_BUDGET per
+      element; past that the array is rescanned and sorted by run-merge,
+      keeping the worst case O(n log n)
+    - HYBRID_RUN_MERGE: in the style of Timsort, reverse each descending
+      run, insertion-sort groups of consecutive runs up to ``min_run``
+      elements, and merge the resulting runs from a stack that keeps
+      Timsort's length invariants. Each merge first trims the elements
+      already in place with binary searches, so partly sorted input costs
+      O(n log runs) rather than O(n log n).
+    
+    All three are stable. Every reversal and merge is one recorded step.
+    
+    Args:
+        arr (list): Input array of integers to sort
+        min_run (int): Shortest run kept as-is before merging
+    
+    Yields:
+        tuple: Step records in the same format as iter_insertion_sort
+    """
+    a = arr[:]
+    n = len(a)
+    strategy = analyze_presortedness(a)["strategy"]
+    comparisons = max(n - 1, 0)
+    moves = 0
+    array_accesses = n
+
+    yield (STEP_INITIAL, 0, 0, comparisons, moves, array_accesses, (), a)
+
+    def insert_range(lo, start, stop, max_shifts=None):
+        # Linear insertion of a[start:stop] into the sorted a[lo:start]; returns
+        # where it stopped, early once more than max_shifts shifts were made
+        nonlocal comparisons, moves, array_accesses
+        first_move = moves
+        for i in range(start, stop):
+            key = a[i]
+            j = i - 1
+            array_accesses += 1
+            while j >= lo:
+                comparisons += 1
+                array_accesses += 1
+                if a[j] > key:
+                    a[j + 1] = a[j]
+                    moves += 1
+                    array_accesses += 1
+                    yield (STEP_SHIFT, i, j, comparisons, moves, array_accesses,
+                           ((j + 1, a[j + 1]),), a)
+                    j -= 1
+                else:
+                    break
+            a[j + 1] = key
+            moves += 1
+            array_accesses += 1
+            yield (STEP_INSERT, i, j + 1, comparisons, moves, array_accesses,
+                   ((j + 1, key),), a)
+            # Moves are the shifts plus one insert per key
+            if max_shifts is not None and moves - first_move - (i + 1 - start) > max_shifts:
+                return i + 1
+        return stop
+
+    def search(lo, hi, value, right):
+        # Counted binary search: first index in a[lo:hi] with a[k] > value
+        # (right=True) or a[k] >= value (right=False)
+        nonlocal comparisons, array_accesses
+        while lo < hi:
+            mid = (lo + hi) // 2
+            comparisons += 1
+            array_accesses += 1
+            if a[mid] > value or (not right and a[mid] == value):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def merge(lo, mid, hi):
+        # Stable merge of the sorted runs a[lo:mid] and a[mid:hi]
+        nonlocal comparisons, moves, array_accesses
+        comparisons += 1
+        array_accesses += 2
+        if a[mid - 1] <= a[mid]:
+            return
+        # Left elements <= a[mid] and right elements >= a[mid - 1] stay put
+        lo = search(lo, mid, a[mid], right=True)
+        hi = search(mid, hi, a[mid - 1], right=False)
+        left = a[lo:mid]
+        array_accesses += len(left)
+        i, j, k = 0, mid, lo
+        while i < len(left) and j < hi:
+            comparisons += 1
+            array_accesses += 1
+            if a[j] < left[i]:
+                a[k] = a[j]
+                j += 1
+            else:
+                a[k] = left[i]
+                i += 1
+            k += 1
+        # Leftover right elements are already in place; leftover left ones are not
+        a[k:j] = left[i:]
+        moves += j - lo
+        array_accesses += j - lo
+        yield (STEP_MERGE, hi - 1, lo, comparisons, moves, array_accesses,
+               tuple(zip(range(lo, j), a[lo:j])), a)
+
+    if strategy == HYBRID_INSERTION:
+        if (yield from insert_range(0, 1, n, HYBRID_SHIFT_BUDGET * n)) == n:
+            return
+        # Over budget: find the runs again (another counted scan) and merge them
+        comparisons += n - 1
+        array_accesses += n
+    elif strategy != HYBRID_RUN_MERGE:
+        return
+
+    stack = []  # (start, length) of sorted runs waiting to be merged
+    runs = find_runs(a)
+    r = 0
+    while r < len(runs):
+        start, stop, descending = runs[r]
+        r += 1
+        if descending:
+            a[start:stop] = a[start:stop][::-1]
+            moves += stop - start
+            array_accesses += 2 * (stop - start)
+            yield (STEP_REVERSE, stop - 1, start, comparisons, moves, array_accesses,
+                   tuple(zip(range(start, stop), a[start:stop])), a)
+        # Pull following runs into a short run until it reaches min_run
+        end = stop
+        while end - start < min_run and r < len(runs):
+            end = min(runs[r][1], start + min_run)
+            if runs[r][1] > end:
+                runs[r] = (end, runs[r][1], runs[r][2])
+            else:
+                r += 1
+        if end > stop:
+            yield from insert_range(start, stop, end)
+        stack.append((start, end - start))
+
+        # Timsort's merge_collapse: keep run lengths growing like Fibonacci
+        while len(stack) > 1:
+            k = len(stack) - 2
+            lengths = [length for _, length in stack]
+            if ((k > 0 and lengths[k - 1] <= lengths[k] + lengths[k + 1])
+                    or (k > 1 and lengths[k - 2] <= lengths[k - 1] + lengths[k])):
+                if lengths[k - 1] < lengths[k + 1]:
+                    k -= 1
+            elif lengths[k] > lengths[k + 1]:
+                break
+            (lo, left_len), (mid, right_len) = stack[k], stack[k + 1]
+            yield from merge(lo, mid, mid + right_len)
+            stack[k:k + 2] = [(lo, left_len + right_len)]
+
+    while len(stack) > 1:
+        (lo, left_len), (mid, right_len) = stack[-2], stack[-1]
+        yield from merge(lo, mid, mid + right_len)
+        stack[-2:] = [(lo, left_len + right_len)]
+
+
+# Selectable sort engines: key -> (label, short name, step generator)
+ENGINE_LINEAR = "linear"
+ENGINE_TYPED = "typed"
+ENGINE_HYBRID = "hybrid"
+SORT_ENGINES = {
+    ENGINE_LINEAR: ("Insertion Sort (linear scan)", "Insertion Sort", iter_insertion_sort),
+    "binary": ("Binary Insertion Sort", "Binary Insert", iter_binary_insertion_sort),
+    "block": ("Block-Move Insertion Sort", "Block Insert", iter_block_insertion_sort),
+    "shell": ("Shell Sort (Shell gaps n/2^k)", "Shell (Shell)", partial(iter_shell_sort, gaps="shell")),
+    "shell-knuth": ("Shell Sort (Knuth gaps 3h+1)", "Shell (Knuth)", partial(iter_shell_sort, gaps="knuth")),
+    "shell-ciura": ("Shell Sort (Ciura gaps)", "Shell (Ciura)", partial(iter_shell_sort, gaps="ciura")),
+    ENGINE_TYPED: ("Insertion Sort (typed int64/float64 buffer)", "Insertion (typed)",
+                   iter_typed_insertion_sort),
+    ENGINE_HYBRID: ("Adaptive Hybrid (natural runs + insertion + merge)", "Hybrid (runs)",
+                    iter_hybrid_sort),
+}
+
+
+def _copy(arr):
+    """Working copy for a variant (slicing a NumPy array would give a view)."""
+    return arr.copy() if np is not None and isinstance(arr, np.ndarray) else arr[:]
+
+
+def _typed_copy(arr):
+    """Working copy in an array('q')/array('d') buffer, as iter_typed_insertion_sort uses."""
+    a = to_typed(arr)
+    if not isinstance(a, array):
+        return array("d" if a.dtype.kind == "f" else "q", a.tobytes())
+    return a[:] if a is arr else a
+
+
+# Engine key -> (variant template, bindings) for compile_sort
+_HYBRID_BINDINGS = {
+    "copy": _copy,
+    "analyze_presortedness": analyze_presortedness,
+    "find_runs": find_runs,
+    "HYBRID_INSERTION": HYBRID_INSERTION,
+    "HYBRID_RUN_MERGE": HYBRID_RUN_MERGE,
+    "HYBRID_SHIFT_BUDGET": HYBRID_SHIFT_BUDGET,
+    "min_run": HYBRID_MIN_RUN,
+}
+ENGINE_VARIANTS = {
+    ENGINE_LINEAR: ("insertion", {"copy": _copy}),
+    "binary": ("binary", {"copy": _copy}),
+    "block": ("binary", {"copy": _copy}),
+    "shell": ("shell", {"copy": _copy, "gaps": partial(shell_gaps, sequence="shell")}),
+    "shell-knuth": ("shell", {"copy": _copy, "gaps": partial(shell_gaps, sequence="knuth")}),
+    "shell-ciura": ("shell", {"copy": _copy, "gaps": partial(shell_gaps, sequence="ciura")}),
+    ENGINE_TYPED: ("insertion", {"copy": _typed_copy}),
+    ENGINE_HYBRID: ("hybrid", _HYBRID_BINDINGS),
+}
+
+
+def get_engine(engine):
+    """
+    Look up a sort engine by key.
+    
+    Args:
+        engine (str): Key in SORT_ENGINES
+    
+    Returns:
+        tuple: (label, short_name, step_generator)
+    
+    Raises:
+        ValueError: If the engine is unknown
+    """
+    try:
+        return SORT_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"unknown sort engine '{engine}'")
+
+
+def compile_sort(engine, counters=COUNTERS):
+    """
+    The engine as a plain function that counts only ``counters``.
+
+    Variants are compiled once per engine and counter set (see
+    sortlab.variants). With no counters the result is the uninstrumented
+    sort; its counters come back as None.
+
+    Args:
+        engine (str): Key in SORT_ENGINES
+        counters (iterable): Names from COUNTERS to count
+
+    Returns:
+        callable: ``sort(arr, deadline)`` returning (sorted_array,
+            comparisons, moves, accesses)
+
+    Raises:
+        ValueError: If the engine or a counter name is unknown
+    """
+    get_engine(engine)
+    return _compile_sort(engine, frozenset(counters))
+
+
+@lru_cache(maxsize=None)
+def _compile_sort(engine, counters):
+    template, bindings = ENGINE_VARIANTS[engine]
+    return compile_variant(template, counters, **bindings)
+
+
+def sort_with_steps(arr, engine=ENGINE_LINEAR, deadline=None, on_step=None):
+    """
+    Run any engine from SORT_ENGINES, recording every step in a StepLog.
+    
+    Args:
+        arr (list): Input array of integers to sort
+        engine (str): Key in SORT_ENGINES
+        deadline (Deadline): Optional time budget, checked every
+            DEADLINE_CHECK_INTERVAL steps
+        on_step (callable): Optional hook called with every step record
+            (see Instrumentation.observe_sort)
+    
+    Returns:
+        tuple: (sorted_array, steps_list, comparisons, moves, accesses), the
+            same shape as insertion_sort_with_steps
+    
+    Raises:
+        BudgetExceeded: If ``deadline`` passes before the sort finishes
+    """
+    _, _, iter_steps = get_engine(engine)
+    steps = StepLog(arr)
+    for record in iter_steps(arr):
+        steps.append(*record)
+        if on_step is not None:
+            on_step(record)
+        if deadline is not None and len(steps) % DEADLINE_CHECK_INTERVAL == 0:
+            deadline.check()
+
+    _, _, _, comparisons, moves, accesses, _, a = record
+    return a, steps, comparisons, moves, accesses
+
+
+def sort_metrics(arr, engine=ENGINE_LINEAR, deadline=None, on_step=None, counters=COUNTERS):
+    """
+    Compute an engine's counters without keeping any steps.
+    
+    With every counter on, linear insertion sort uses the O(n log n) closed
+    form in insertion_sort_metrics (typed_insertion_metrics for the typed
+    engine, which returns a typed sorted buffer). Otherwise the engine runs
+    as the compile_sort variant that counts only ``counters``, so leaving a
+    counter out removes its work from the loop and no counters at all runs
+    the bare sort. With ``on_step`` the step engine runs instead (counting
+    everything), since the variants have no steps to observe.
+    
+    Args:
+        arr (list): Input array of integers to sort
+        engine (str): Key in SORT_ENGINES
+        deadline (Deadline): Optional time budget (the closed forms are
+            O(n log n) and not interrupted)
+        on_step (callable): Optional hook called with every step record
+        counters (iterable): Names from COUNTERS to count; the others are
+            returned as None
+    
+    Returns:
+        tuple: (sorted_array, comparisons, moves, accesses)
+    
+    Raises:
+        BudgetExceeded: If ``deadline`` passes before the sort finishes
+        ValueError: If the engine or a counter name is unknown
+    """
+    if on_step is None:
+        counters = frozenset(counters)
+        if engine == ENGINE_LINEAR and len(counters) == len(COUNTERS):
+            return insertion_sort_metrics(arr)
+        if engine == ENGINE_TYPED and len(counters) == len(COUNTERS):
+            return typed_insertion_metrics(arr)
+        return compile_sort(engine, counters)(arr, deadline)
+
+    _, _, iter_steps = get_engine(engine)
+    for count, record in enumerate(iter_steps(arr), 1):
+        on_step(record)
+        if deadline is not None and count % DEADLINE_CHECK_INTERVAL == 0:
+            deadline.check()
+    _, _, _, comparisons, moves, accesses, _, a = record
+    return a[:], comparisons, moves, accesses
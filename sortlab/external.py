@@ -0,0 +1,328 @@
+"""
+External (out-of-core) sort for integer files larger than memory.
+
+The input is streamed in chunks of ``chunk_elements`` values. Each chunk is
+sorted in memory with a lab engine and spilled to a temporary file as a
+sorted run of raw int64 values. The runs are then k-way merged through a
+heap, at most ``fan_in`` at a time, over as many passes as needed. Memory
+stays bounded by one chunk during run formation and by ``fan_in + 1`` read
+buffers during the merge, whatever the input size.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+
+from .engines import ENGINE_HYBRID, ENGINE_LINEAR, sort_metrics
+from .parsing import RAW_INT64_EXTENSIONS, np, parse_list
+from .variants import COUNTERS
+
+# Values sorted in memory per run (about 100 bytes each while a chunk is sorted)
+EXTERNAL_CHUNK_ELEMENTS = 1_000_000
+# Most runs merged at once; more runs take extra merge passes
+EXTERNAL_MAX_FAN_IN = 64
+# Chunks up to this size are sorted with linear insertion sort
+EXTERNAL_INSERTION_MAX = 64
+# Smallest per-run read buffer during a merge, in values
+EXTERNAL_MIN_BUFFER = 1024
+
+# Characters that separate values in text input (see parse_list)
+_SEPARATORS = frozenset(" \t\r\n\v\f,")
+
+
+def _to_int64(values):
+    """Pack a chunk as array('q'), rejecting values outside int64."""
+    try:
+        return array("q", values)
+    except OverflowError:
+        raise ValueError("integer does not fit in int64") from None
+
+
+def iter_chunks(path, chunk_elements=EXTERNAL_CHUNK_ELEMENTS, io=None):
+    """
+    Stream an integer file as lists of at most ``chunk_elements`` values.
+
+    Raw .bin/.raw/.i64 files are read as little-endian int64, .npy files
+    through a NumPy memory map, and anything else as text separated by
+    commas and/or whitespace (a value split across two reads is carried
+    over to the next one).
+
+    Args:
+        path (str): Input file
+        chunk_elements (int): Largest chunk to yield
+        io (dict): Optional counters; ``input_bytes`` is increased by the
+            bytes read
+
+    Yields:
+        list: The next chunk of values, in file order
+
+    Raises:
+        ValueError: If the file does not hold integers
+    """
+    io = {} if io is None else io
+    io.setdefault("input_bytes", 0)
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext in RAW_INT64_EXTENSIONS:
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(chunk_elements * 8)
+                if not data:
+                    return
+                if len(data) % 8:
+                    raise ValueError("raw int64 file size is not a multiple of 8 bytes")
+                io["input_bytes"] += len(data)
+                chunk = array("q", data)
+                if sys.byteorder == "big":
+                    chunk.byteswap()
+                yield chunk.tolist()
+
+    elif ext == ".npy":
+        if np is None:
+            raise ValueError("NumPy is required to read .npy files")
+        values = np.load(path, mmap_mode="r")
+        if values.dtype.kind not in "iub":
+            raise ValueError(f"array has dtype {values.dtype}, expected integers")
+        values = values.reshape(-1)
+        for start in range(0, len(values), chunk_elements):
+            chunk = values[start:start + chunk_elements]
+            io["input_bytes"] += chunk.nbytes
+            yield chunk.astype(np.int64).tolist()
+
+    else:
+        pending = []
+        carry = ""
+        with open(path, encoding="utf-8") as f:
+            while True:
+                # About 8 characters per value
+                block = f.read(chunk_elements * 8)
+                io["input_bytes"] += len(block)
+                text = carry + block
+                if block:
+                    # Keep a trailing, possibly incomplete value for the next read
+                    cut = len(text)
+                    while cut and text[cut - 1] not in _SEPARATORS:
+                        cut -= 1
+                    text, carry = text[:cut], text[cut:]
+                pending.extend(parse_list(text))
+                while len(pending) >= chunk_elements:
+                    yield pending[:chunk_elements]
+                    del pending[:chunk_elements]
+                if not block:
+                    break
+        if pending:
+            yield pending
+
+
+def _read_run(path, buffer_elements, io):
+    """Yield the values of a run file, reading ``buffer_elements`` at a time."""
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(buffer_elements * 8)
+            if not data:
+                return
+            io["merge_bytes_read"] += len(data)
+            values = array("q", data)
+            if sys.byteorder == "big":
+                values.byteswap()
+            yield from values
+
+
+def _sift_down(heap, pos, size):
+    """Restore the heap below ``pos``; returns the number of comparisons made."""
+    item = heap[pos]
+    comparisons = 0
+    child = 2 * pos + 1
+    while child < size:
+        right = child + 1
+        if right < size:
+            comparisons += 1
+            if heap[right] < heap[child]:
+                child = right
+        comparisons += 1
+        if heap[child] < item:
+            heap[pos] = heap[child]
+            pos = child
+            child = 2 * pos + 1
+        else:
+            break
+    heap[pos] = item
+    return comparisons
+
+
+def _merge_runs(paths, out, buffer_elements, counters, io):
+    """
+    k-way merge sorted run files into ``out`` (None to discard) through a binary heap.
+
+    Heap entries are (value, run index, reader); the run index breaks ties
+    so equal values leave in run order and the readers are never compared.
+    Every value comparison is counted; each output value is one move (one
+    read plus one write access).
+    """
+    heap = []
+    for index, path in enumerate(paths):
+        reader = _read_run(path, buffer_elements, io)
+        for value in reader:
+            heap.append((value, index, reader))
+            break
+    comparisons = 0
+    for pos in reversed(range(len(heap) // 2)):
+        comparisons += _sift_down(heap, pos, len(heap))
+
+    block = array("q")
+    written = 0
+    while heap:
+        value, index, reader = heap[0]
+        block.append(value)
+        if len(block) >= buffer_elements:
+            written += _write_block(out, block)
+            block = array("q")
+        for value in reader:
+            heap[0] = (value, index, reader)
+            break
+        else:
+            last = heap.pop()
+            if not heap:
+                break
+            heap[0] = last
+        comparisons += _sift_down(heap, 0, len(heap))
+    if block:
+        written += _write_block(out, block)
+
+    counters["comparisons"] += comparisons
+    counters["moves"] += written
+    counters["accesses"] += 2 * written
+    if out is not None:
+        io["merge_bytes_written"] += written * 8
+
+
+def _write_block(out, block):
+    """Append an array('q') block to a binary file as little-endian int64; returns its length."""
+    if out is None:
+        return len(block)
+    if sys.byteorder == "big":
+        block = array("q", block)
+        block.byteswap()
+    block.tofile(out)
+    return len(block)
+
+
+def external_sort(path, output=None, chunk_elements=EXTERNAL_CHUNK_ELEMENTS,
+                  fan_in=EXTERNAL_MAX_FAN_IN, engine=ENGINE_HYBRID, tmp_dir=None,
+                  counters=COUNTERS):
+    """
+    Sort an integer file of any size with bounded memory.
+
+    1. Run formation: each chunk is sorted with ``engine`` (linear insertion
+       sort for chunks of at most EXTERNAL_INSERTION_MAX values) and written
+       to a temporary run file. The chunks run through sort_metrics without
+       a step hook, so no step records are built: only the compiled variant
+       counting ``counters`` (or the closed form), and with no counters the
+       bare sort.
+    2. Merge passes: while more than ``fan_in`` runs remain, groups of
+       ``fan_in`` runs are merged into longer runs; the last pass merges the
+       rest into ``output``.
+
+    Args:
+        path (str): Input file (.bin/.raw/.i64 int64, .npy, or text)
+        output (str): Where to write the sorted values as raw little-endian
+            int64 (None to only compute the statistics)
+        chunk_elements (int): Values sorted in memory per run
+        fan_in (int): Most runs merged at once (at least 2)
+        engine (str): Key in SORT_ENGINES for the chunk sorts
+        tmp_dir (str): Directory for the run files (default: system temp)
+        counters (iterable): Names from COUNTERS to count in the chunk sorts;
+            the others are reported as None (the merge always counts)
+
+    Returns:
+        dict: n, runs, merge_passes, chunk_elements, fan_in, engine, output,
+            ``chunk_sort`` and ``merge`` counters (comparisons, moves,
+            accesses), their ``total`` (None where a chunk counter is
+            off), and ``io`` byte counts
+
+    Raises:
+        ValueError: If the input does not hold int64 integers, or the
+            parameters are out of range
+    """
+    if chunk_elements < 1:
+        raise ValueError("chunk_elements must be at least 1")
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+
+    counters = frozenset(counters)
+    chunk_counters = {name: 0 if name in counters else None for name in COUNTERS}
+    merge_counters = {"comparisons": 0, "moves": 0, "accesses": 0}
+    io = {"input_bytes": 0, "spill_bytes_written": 0, "merge_bytes_read": 0,
+          "merge_bytes_written": 0}
+    buffer_elements = max(EXTERNAL_MIN_BUFFER, chunk_elements // (fan_in + 1))
+    n = 0
+    initial_runs = 0
+    merge_passes = 0
+
+    with tempfile.TemporaryDirectory(prefix="sortlab-external-", dir=tmp_dir) as workdir:
+        runs = []
+        for chunk in iter_chunks(path, chunk_elements, io):
+            chunk_engine = ENGINE_LINEAR if len(chunk) <= EXTERNAL_INSERTION_MAX else engine
+            sorted_chunk, *counts = sort_metrics(chunk, chunk_engine, counters=counters)
+            for name, count in zip(COUNTERS, counts):
+                if count is not None:
+                    chunk_counters[name] += count
+
+            run_path = os.path.join(workdir, f"run-0-{len(runs)}.i64")
+            with open(run_path, "wb") as f:
+                io["spill_bytes_written"] += 8 * _write_block(f, _to_int64(sorted_chunk))
+            runs.append(run_path)
+            n += len(chunk)
+        initial_runs = len(runs)
+
+        # Intermediate passes until one final merge can take every run
+        while len(runs) > fan_in:
+            merge_passes += 1
+            merged = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                run_path = os.path.join(workdir, f"run-{merge_passes}-{len(merged)}.i64")
+                with open(run_path, "wb") as f:
+                    _merge_runs(group, f, buffer_elements, merge_counters, io)
+                for old in group:
+                    os.remove(old)
+                merged.append(run_path)
+            runs = merged
+
+        if len(runs) > 1:
+            merge_passes += 1
+            if output:
+                with open(output, "wb") as f:
+                    _merge_runs(runs, f, buffer_elements, merge_counters, io)
+            else:
+                _merge_runs(runs, None, buffer_elements, merge_counters, io)
+        elif output:
+            # A single run (or none) is already the sorted output
+            if runs:
+                shutil.move(runs[0], output)
+            else:
+                open(output, "wb").close()
+
+    return {
+        "n": n,
+        "runs": initial_runs,
+        "merge_passes": merge_passes,
+        "chunk_elements": chunk_elements,
+        "fan_in": fan_in,
+        "engine": engine,
+        "output": output,
+        "chunk_sort": chunk_counters,
+        "merge": merge_counters,
+        "total": {key: None if chunk_counters[key] is None
+                  else chunk_counters[key] + merge_counters[key] for key in chunk_counters},
+        "io": {
+            **io,
+            "bytes_read": io["input_bytes"] + io["merge_bytes_read"],
+            "bytes_written": io["spill_bytes_written"] + io["merge_bytes_written"],
+        },
+    }
@@ -0,0 +1,530 @@
+"""
+Lab orchestration: validate the input, run the selected engine, and build the
+summary, trace, dashboard and JSON outputs. Nothing here depends on Gradio.
+"""
+
+import json
+import time
+
+from .admission import DEADLINE_CHECK_INTERVAL
+from .cache import input_fingerprint, result_cache
+from .comparisons import BUBBLE_CLASSIC, BUBBLE_VARIANTS, COMPARISON_TIMEOUT, start_comparisons
+from .dashboard import render_dashboard
+from .engines import ENGINE_LINEAR, get_engine, sort_metrics, sort_with_steps
+from .parsing import load_array_file, parse_list
+from .presortedness import analyze_presortedness, format_presortedness
+from .probes import Instrumentation
+from .steps import StepLog
+from .typed import dtype_name, is_typed
+from .trace import (
+    TRACE_STREAM_INTERVAL,
+    TRACE_STREAM_MAX_CELLS,
+    TRACE_STREAM_WINDOW,
+    format_trace_header,
+    format_trace_tail,
+)
+
+# run_lab modes: full step recording, or counters only (no trace)
+MODE_TRACE = "trace"
+MODE_METRICS = "metrics"
+METRICS_ONLY_TRACE = "Step trace skipped (metrics-only mode)."
+NO_TRACE_TEXT = "Step trace recorded but not rendered (trace_text=False)."
+
+
+class InputError(ValueError):
+    """Raised when the lab input cannot be analyzed; the message is shown to the user."""
+
+
+def validate_input(text, upload=None, dtype=int):
+    """
+    Parse and validate the raw textbox value or an uploaded file.
+    
+    Args:
+        text (str): Comma-separated integers from user input
+        upload (str): Optional path of an uploaded file; takes precedence
+            over ``text`` when given
+        dtype: ``int`` (default), ``float`` or ``"auto"`` (see parse_list and
+            load_array_file)
+    
+    Returns:
+        list: The parsed array (never empty)
+    
+    Raises:
+        InputError: If the input is empty or cannot be parsed
+    """
+    # Gradio may hand us a tempfile wrapper instead of a path
+    upload = getattr(upload, "name", upload)
+
+    # Input validation
+    if not upload and not (text or "").strip():
+        raise InputError("Please enter at least one number")
+
+    try:
+        arr = load_array_file(upload, dtype) if upload else parse_list(text, dtype)
+    except (ValueError, OSError) as e:
+        raise InputError(f"Invalid input: {str(e)}")
+
+    if len(arr) == 0:
+        raise InputError("Please enter at least one number")
+
+    return arr
+
+
+def _count_text(value):
+    """Format a counter for the summary; counters a probe run left off show as such."""
+    return "not counted" if value is None else f"{value:,}"
+
+
+def _total(*counters):
+    """Sum of the counters, or None if any was not counted."""
+    return None if None in counters else sum(counters)
+
+
+def _values_text(values):
+    """Format an array for the summary; typed buffers read like the list they hold."""
+    if not is_typed(values):
+        return str(values)
+    if _is_float_buffer(values):
+        return "[" + ", ".join(map(float.__repr__, values)) + "]"
+    return "[" + ", ".join(map(str, values)) + "]"
+
+
+def _values_json(values):
+    """JSON text of an array (list or typed buffer), as json.dumps would write it."""
+    if not is_typed(values):
+        return json.dumps(values)
+    text = _values_text(values)
+    # float.__repr__ writes infinities the way Python reads them, json as Infinity
+    return text.replace("inf", "Infinity") if _is_float_buffer(values) else text
+
+
+def _is_float_buffer(values):
+    """True for an array('d') / float NumPy buffer."""
+    return dtype_name(values) == "float64"
+
+
+def build_report(arr, sorted_arr, steps, comparisons, moves, accesses, show_comparisons=True,
+                 engine=ENGINE_LINEAR, pending=None, deadline=None):
+    """
+    Build the summary text, HTML dashboard and JSON export for a finished run.
+    
+    Args:
+        arr (list): Original input array
+        sorted_arr (list): Sorted output array
+        steps (StepLog): Steps recorded by insertion_sort_with_steps, or None
+            in metrics-only mode
+        comparisons (int): Insertion sort comparisons (None when not counted,
+            see the counter probes)
+        moves (int): Insertion sort moves (or None)
+        accesses (int): Insertion sort array accesses (or None)
+        show_comparisons (bool): Also run bubble sort and quicksort
+        engine (str): Key in SORT_ENGINES that produced the counters
+        pending (PendingComparisons): Comparison runs already started with
+            start_comparisons; started here when omitted
+        deadline (Deadline): Optional request time budget; comparisons still
+            running when it passes are reported as timed out
+    
+    Returns:
+        tuple: (summary, html_dashboard, json_data)
+    """
+    engine_label, engine_name, _ = get_engine(engine)
+
+    # O(n) pre-pass: how sorted the input already was
+    profile = analyze_presortedness(arr)
+
+    # Optionally execute alternative algorithms for comparison
+    bubble_comps = bubble_moves = quick_comps = quick_moves = None
+    if show_comparisons:
+        if pending is None:
+            pending = start_comparisons(arr)
+        timeout = COMPARISON_TIMEOUT
+        if deadline is not None and deadline.remaining() is not None:
+            timeout = min(timeout, deadline.remaining())
+        results = pending.results(timeout)
+        bubble_comps, bubble_moves = results["bubble"]
+        quick_comps, quick_moves = results["quick"]
+        bubble_variant = pending.bubble_variant
+    else:
+        bubble_variant = BUBBLE_CLASSIC
+    bubble_name = BUBBLE_VARIANTS[bubble_variant][0]
+
+    # Build comprehensive analysis summary
+    summary_lines = [
+        "=" * 70,
+        "INSERTION SORT ANALYSIS",
+        "=" * 70,
+        f"Sorted {len(arr)} elements successfully",
+        f"Engine: {engine_label}",
+        "",
+        "RESULTS",
+        f"  Input:  {_values_text(arr)}",
+        f"  Output: {_values_text(sorted_arr)}",
+        "",
+        "PERFORMANCE METRICS",
+        f"  • Comparisons:     {_count_text(comparisons)}",
+        f"  • Array Moves:     {_count_text(moves)}",
+        f"  • Total Accesses:  {_count_text(accesses)}",
+        f"  • Total Operations: {_count_text(_total(comparisons, moves, accesses))}",
+        "",
+        *format_presortedness(profile),
+        "",
+                *(["ALGORITHM COMPARISON",
+                     f"  ┌─ {engine_name:<16}→ {_count_text(comparisons)} comparisons, "
+                     f"{_count_text(moves)} moves",
+                     (f"  ├─ {bubble_name:<16}→ {bubble_comps} comparisons, {bubble_moves} moves"
+                      if bubble_comps is not None else f"  ├─ {bubble_name:<16}→ timed out"),
+                     (f"  └─ Quick Sort      → {quick_comps} comparisons, {quick_moves} moves"
+                      if quick_comps is not None else "  └─ Quick Sort      → timed out")]
+                    if show_comparisons else ["ALGORITHM COMPARISON (disabled)"]),
+        "",
+        "EFFICIENCY INSIGHTS",
+        *(
+            [
+                *([f"  • Insertion vs Bubble: {bubble_comps/max(comparisons,1):.2f}x comparisons"]
+                  if bubble_comps is not None and comparisons is not None else []),
+                *([f"  • Insertion vs Quick:  {quick_comps/max(comparisons,1):.2f}x comparisons"]
+                  if quick_comps is not None and comparisons is not None else []),
+            ] if show_comparisons else []
+        ),
+        f"  • Best Case: O(n) when array is sorted",
+        f"  • Worst Case: O(n²) when array is reverse sorted",
+        f"  • Average Case: O(n²)",
+        "",
+        "KEY CHARACTERISTICS",
+        f"  • Adaptive: Performs well on nearly-sorted data",
+        f"  • Stable: Preserves relative order of equal elements",
+        f"  • In-place: Requires O(1) extra space",
+        f"  • Online: Can sort data as it receives it",
+        "=" * 70
+    ]
+    summary = "\n".join(summary_lines)
+
+    # Render the HTML performance dashboard
+    html_viz = render_dashboard(
+        arr, comparisons, moves, accesses, engine_name, show_comparisons, bubble_name,
+        bubble_comps, bubble_moves, quick_comps, quick_moves
+    )
+
+    # Prepare structured data for export/analysis; the arrays are spliced in
+    # as text so typed buffers are never boxed into lists
+    json_data = json.dumps({
+        "engine": engine,
+        "insertion": {
+            "comparisons": comparisons,
+            "moves": moves,
+            "accesses": accesses
+        },
+        "trace": steps.summary() if steps is not None else None,
+        "presortedness": profile,
+        **({
+            "bubble": {"comparisons": bubble_comps, "moves": bubble_moves, "variant": bubble_variant},
+            "quick": {"comparisons": quick_comps, "moves": quick_moves}
+        } if show_comparisons else {})
+    })
+    json_data = (f'{{"original": {_values_json(arr)}, "sorted": {_values_json(sorted_arr)}, '
+                 + json_data[1:])
+
+    return summary, html_viz, json_data
+
+
+def run_lab(text, show_comparisons=True, upload=None, mode=MODE_TRACE, engine=ENGINE_LINEAR,
+            bubble_variant=BUBBLE_CLASSIC, probes=(), limits=None, trace_text=True, dtype=int,
+            on_steps=None):
+    """
+    Main orchestration function that coordinates the entire sorting analysis.
+    
+    This function:
+    1. Validates user input
+    2. Executes insertion sort with tracking
+    3. Runs bubble sort and quicksort for comparison
+    4. Calculates efficiency metrics
+    5. Formats comprehensive output for display
+    
+    Args:
+        text (str): Comma-separated integers from user input
+        show_comparisons (bool): Also run bubble sort and quicksort
+        upload (str): Optional path of an uploaded .csv/.txt/.npy/.bin file
+        mode (str): MODE_TRACE to record every step, or MODE_METRICS to only
+            compute the counters with sort_metrics (no trace). The trace text
+            holds the newest TRACE_STREAM_WINDOW steps (fewer for wide
+            arrays, see TRACE_STREAM_MAX_CELLS); render_trace_page pages
+            through the rest of the StepLog
+        engine (str): Key in SORT_ENGINES selecting the sort variant
+        bubble_variant (str): Key in BUBBLE_VARIANTS for the comparison row
+        probes (iterable or Instrumentation): Instrumentation probes to
+            enable (names from sortlab.probes.PROBES), or an Instrumentation
+            to collect into (e.g. to write its collapsed stacks afterwards).
+            Their stats are added to the JSON; instrumented runs are never
+            cached.
+        limits (RequestLimits): Optional admission limits (the web app
+            passes APP_LIMITS). Inputs over the size limits are downgraded to
+            metrics-only and/or no comparisons, with a notice in the summary
+            and under "admission" in the JSON, and the run is cancelled once
+            the time budget is spent.
+        trace_text (bool): Render the step trace text. Callers that only
+            use the JSON (like the CLI) pass False; the steps are still
+            recorded and summarized under "trace", and the trace output is
+            NO_TRACE_TEXT.
+        dtype: ``int`` (default), ``float`` or ``"auto"`` to also accept
+            floats in the text or upload (see validate_input)
+        on_steps (callable): Called with the StepLog of a trace-mode run as
+            soon as the sort finishes (e.g. to archive it with write_trace);
+            such runs bypass the result cache
+    
+    Returns:
+        tuple: (summary, trace, html_dashboard, json_data, status)
+            All formatted for Gradio output components
+    
+    Raises:
+        InputError: If the input is empty or cannot be parsed, or a probe
+            name is unknown
+        BudgetExceeded: If ``limits`` has a time budget and it runs out
+    """
+    deadline = limits.deadline() if limits is not None else None
+    if probes or on_steps is not None:
+        if isinstance(probes, Instrumentation):
+            instrumentation = probes
+        else:
+            try:
+                instrumentation = Instrumentation(probes)
+            except ValueError as e:
+                raise InputError(str(e))
+        with instrumentation.section("parse"):
+            arr = validate_input(text, upload, dtype)
+        mode, show_comparisons, notice = _admit(arr, mode, show_comparisons, limits)
+        return run_lab_uncached(arr, show_comparisons, mode, engine, bubble_variant, instrumentation,
+                                 deadline, notice, trace_text, on_steps)
+
+    arr = validate_input(text, upload, dtype)
+    mode, show_comparisons, notice = _admit(arr, mode, show_comparisons, limits)
+    return _run_lab_cached(arr, show_comparisons, mode, engine, bubble_variant, deadline, notice,
+                           trace_text)
+
+
+def _run_lab_cached(arr, show_comparisons, mode, engine, bubble_variant, deadline=None, notice=None,
+                    trace_text=True):
+    """run_lab for an already validated and admitted array, through the result cache."""
+    cache_key = input_fingerprint(arr, "run_lab", bool(show_comparisons), mode, engine, bubble_variant,
+                                  notice, bool(trace_text))
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = run_lab_uncached(arr, show_comparisons, mode, engine, bubble_variant, None, deadline,
+                               notice, trace_text)
+    if result[4] == "Analysis Complete":
+        result_cache.put(cache_key, result)
+    return result
+
+
+def _admit(arr, mode, show_comparisons, limits):
+    """Apply the admission limits; returns (mode, show_comparisons, notice)."""
+    if limits is None:
+        return mode, show_comparisons, None
+    trace, show_comparisons, notice = limits.admit(len(arr), mode == MODE_TRACE, show_comparisons)
+    if mode == MODE_TRACE and not trace:
+        mode = MODE_METRICS
+    return mode, show_comparisons, notice
+
+
+def run_lab_uncached(arr, show_comparisons, mode, engine, bubble_variant, instrumentation=None,
+                      deadline=None, notice=None, trace_text=True, on_steps=None):
+    """
+    Do the actual work of run_lab for an already validated array.
+    
+    No parsing, admission or result cache: callers that hold parsed arrays
+    (like run_batch) use it directly.
+    
+    Args:
+        arr (list): Parsed, non-empty input array
+        show_comparisons (bool): Also run bubble sort and quicksort
+        mode (str): MODE_TRACE or MODE_METRICS
+        engine (str): Key in SORT_ENGINES
+        bubble_variant (str): Key in BUBBLE_VARIANTS
+        instrumentation (Instrumentation): Probes to collect into (none when
+            omitted)
+        deadline (Deadline): Optional time budget
+        notice (str): Admission notice to show above the summary
+        trace_text (bool): Render the trace text (see run_lab)
+        on_steps (callable): Receives the trace-mode StepLog (see run_lab)
+    
+    Returns:
+        tuple: (summary, trace, html_dashboard, json_data, status)
+    
+    Raises:
+        BudgetExceeded: If ``deadline`` runs out
+    """
+    if instrumentation is None:
+        instrumentation = Instrumentation()
+
+    # Kick off bubble/quick first so they run alongside the main engine
+    pending = start_comparisons(arr, bubble_variant) if show_comparisons else None
+    try:
+        return _run_lab_phases(arr, show_comparisons, mode, engine, instrumentation, deadline, notice,
+                               pending, trace_text, on_steps)
+    finally:
+        # A cancelled run must not leave workers busy or shared memory behind
+        if pending is not None:
+            pending.cancel()
+
+
+def _run_lab_phases(arr, show_comparisons, mode, engine, instrumentation, deadline, notice, pending,
+                    trace_text=True, on_steps=None):
+    """The sort, trace and report phases of run_lab_uncached."""
+    if mode == MODE_METRICS:
+        with instrumentation.section("sort"), instrumentation.observe_sort() as on_step:
+            sorted_arr, comparisons, moves, accesses = sort_metrics(arr, engine, deadline, on_step,
+                                                                    instrumentation.counters())
+        with instrumentation.section("report"):
+            summary, html_viz, json_data = build_report(
+                arr, sorted_arr, None, comparisons, moves, accesses, show_comparisons, engine, pending,
+                deadline
+            )
+        summary, json_data = _attach_notice(summary, json_data, notice)
+        json_data = _attach_instrumentation(json_data, instrumentation)
+        return summary, METRICS_ONLY_TRACE, html_viz, json_data, _finished_status(pending)
+
+    # Execute the selected engine with full tracking
+    with instrumentation.section("sort"), instrumentation.observe_sort() as on_step:
+        sorted_arr, steps, comparisons, moves, accesses = sort_with_steps(arr, engine, deadline,
+                                                                          on_step)
+    if on_steps is not None:
+        on_steps(steps)
+
+    # Render only the newest steps; the StepLog stays compact and the paged
+    # viewer (render_trace_page) reaches any earlier step
+    if trace_text:
+        with instrumentation.section("trace"):
+            steps_text = format_trace_tail(steps, _trace_window(arr), deadline)
+    else:
+        steps_text = NO_TRACE_TEXT
+
+    with instrumentation.section("report"):
+        summary, html_viz, json_data = build_report(
+            arr, sorted_arr, steps, comparisons, moves, accesses, show_comparisons, engine, pending,
+            deadline
+        )
+    summary, json_data = _attach_notice(summary, json_data, notice)
+    json_data = _attach_instrumentation(json_data, instrumentation)
+
+    return summary, steps_text, html_viz, json_data, _finished_status(pending)
+
+
+def _trace_window(arr):
+    """Steps in the trace text: TRACE_STREAM_WINDOW, fewer for wide arrays."""
+    return max(1, min(TRACE_STREAM_WINDOW, TRACE_STREAM_MAX_CELLS // max(len(arr), 1)))
+
+
+def _attach_notice(summary, json_data, notice):
+    """Put an admission downgrade notice above the summary and into the JSON."""
+    if notice is None:
+        return summary, json_data
+    data = json.loads(json_data)
+    data["admission"] = notice
+    return f"NOTE: {notice}\n\n{summary}", json.dumps(data)
+
+
+def _attach_instrumentation(json_data, instrumentation):
+    """Add the probe stats to the JSON export (after every section has closed)."""
+    if not instrumentation:
+        return json_data
+    data = json.loads(json_data)
+    data["instrumentation"] = instrumentation.to_dict()
+    return json.dumps(data)
+
+
+def _finished_status(pending):
+    """Status text for a finished run; partial (timed-out) results are not cached."""
+    if pending is not None and pending.timed_out:
+        return "Analysis Complete (comparisons timed out)"
+    return "Analysis Complete"
+
+
+def run_lab_stream(text, show_comparisons=True, upload=None, mode=MODE_TRACE,
+                   engine=ENGINE_LINEAR, bubble_variant=BUBBLE_CLASSIC, limits=None, dtype=int):
+    """
+    Streaming version of run_lab for Gradio generator outputs.
+    
+    Yields partial results while insertion sort is still running: the trace
+    textbox shows the header immediately, then a rolling window of the most
+    recent steps every TRACE_STREAM_INTERVAL seconds. Formatting happens only
+    at those flushes, so the sort loop itself is not slowed down by rendering
+    and the text sent to the browser never exceeds TRACE_STREAM_WINDOW steps
+    (fewer for wide arrays, see TRACE_STREAM_MAX_CELLS).
+    
+    Args:
+        text (str): Comma-separated integers from user input
+        show_comparisons (bool): Also run bubble sort and quicksort
+        upload (str): Optional path of an uploaded .csv/.txt/.npy/.bin file
+        mode (str): MODE_TRACE or MODE_METRICS (see run_lab)
+        engine (str): Key in SORT_ENGINES selecting the sort variant
+        bubble_variant (str): Key in BUBBLE_VARIANTS for the comparison row
+        limits (RequestLimits): Optional admission limits (see run_lab)
+        dtype: ``int`` (default), ``float`` or ``"auto"`` (see run_lab)
+    
+    Yields:
+        tuple: (summary, trace, html_dashboard, json_data, status, steps)
+            ``steps`` is the StepLog kept in session state for the paged
+            trace viewer (None until the sort has finished)
+    
+    Raises:
+        InputError: If the input is empty or cannot be parsed (before the
+            first yield)
+        BudgetExceeded: If ``limits`` has a time budget and it runs out
+    """
+    if mode == MODE_METRICS:
+        yield (*run_lab(text, show_comparisons, upload, mode, engine, bubble_variant, limits=limits,
+                        dtype=dtype), None)
+        return
+
+    deadline = limits.deadline() if limits is not None else None
+    arr = validate_input(text, upload, dtype)
+    mode, show_comparisons, notice = _admit(arr, mode, show_comparisons, limits)
+    if mode == MODE_METRICS:
+        # Too large to trace: the metrics-only run (its notice explains why)
+        yield (*_run_lab_cached(arr, show_comparisons, mode, engine, bubble_variant, deadline, notice),
+               None)
+        return
+
+    cache_key = input_fingerprint(arr, "stream", bool(show_comparisons), mode, engine, bubble_variant,
+                                  notice)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    pending = start_comparisons(arr, bubble_variant) if show_comparisons else None
+    try:
+        steps = StepLog(arr)
+        window = _trace_window(arr)
+        yield "", "\n".join(format_trace_header()), "", "", "Sorting...", None
+
+        last_flush = time.perf_counter()
+        _, _, iter_steps = get_engine(engine)
+        for record in iter_steps(arr):
+            steps.append(*record)
+            if deadline is not None and len(steps) % DEADLINE_CHECK_INTERVAL == 0:
+                deadline.check()
+
+            # Check the clock only every 256 steps to keep the loop cheap
+            if len(steps) & 0xFF == 0:
+                if time.perf_counter() - last_flush >= TRACE_STREAM_INTERVAL:
+                    yield ("", format_trace_tail(steps, window, deadline), "", "",
+                           f"Sorting... {len(steps):,} steps", None)
+                    last_flush = time.perf_counter()
+
+        _, _, _, comparisons, moves, accesses, _, sorted_arr = record
+        summary, html_viz, json_data = build_report(
+            arr, sorted_arr, steps, comparisons, moves, accesses, show_comparisons, engine, pending,
+            deadline
+        )
+        summary, json_data = _attach_notice(summary, json_data, notice)
+        result = (summary, format_trace_tail(steps, window, deadline), html_viz, json_data,
+                  _finished_status(pending), steps)
+        if pending is None or not pending.timed_out:
+            result_cache.put(cache_key, result)
+        yield result
+    finally:
+        # Also runs when the client disconnects and Gradio closes the generator
+        if pending is not None:
+            pending.cancel()
@@ -0,0 +1,149 @@
+"""
+Input parsing for the Insertion Sort Lab: textbox values and uploaded files.
+"""
+
+import mmap
+import os
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only needed for .npy uploads
+    np = None
+
+
+def parse_list(text, dtype=int):
+    """
+    Parse numbers from user input string.
+    
+    Values may be separated by commas, spaces, tabs or newlines (or any mix of
+    them). The whole input is split and converted in bulk by C-level
+    ``str.split``/``map(int, ...)``; only when that fails do we walk the tokens
+    one by one to report which value is bad.
+    
+    Args:
+        text (str): Delimited string of numbers (e.g., "5, 2, 9, 1")
+        dtype: ``int`` (default), ``float``, or ``"auto"`` for integers when
+            every value is one and floats otherwise
+    
+    Returns:
+        list: List of parsed numbers
+    
+    Raises:
+        ValueError: If any value cannot be converted
+    
+    Example:
+        >>> parse_list("5, 2, 9")
+        [5, 2, 9]
+        >>> parse_list("5 2\n9")
+        [5, 2, 9]
+        >>> parse_list("1.5 2", dtype="auto")
+        [1.5, 2.0]
+    """
+    if dtype not in (int, float, "auto"):
+        raise ValueError(f"unsupported dtype {dtype!r} (expected int, float or 'auto')")
+    tokens = text.replace(",", " ").split()
+    
+    if dtype is not float:
+        try:
+            return list(map(int, tokens))
+        except ValueError:
+            if dtype is int:
+                _raise_bad_token(tokens, int, "integer")
+    
+    try:
+        values = list(map(float, tokens))
+    except ValueError:
+        _raise_bad_token(tokens, float, "number")
+    # NaN is unordered, so no sort (or counter) would be meaningful
+    if any(v != v for v in values):
+        raise ValueError("'nan' is not a valid number")
+    return values
+
+
+def _raise_bad_token(tokens, convert, kind):
+    """Slow path: find the offending token for a precise error message."""
+    for p in tokens:
+        try:
+            convert(p)
+        except ValueError:
+            raise ValueError(f"'{p}' is not a valid {kind}")
+    raise ValueError(f"input is not a valid list of {kind}s")
+
+
+# File extensions read as raw little-endian int64 / float64 data
+RAW_INT64_EXTENSIONS = (".bin", ".raw", ".i64")
+RAW_FLOAT64_EXTENSIONS = (".f64",)
+
+
+def load_array_file(path, dtype=int):
+    """
+    Load numbers from an uploaded file.
+    
+    Supported formats:
+    - .npy: NumPy array of integers, or of floats unless ``dtype`` is int
+      (memory-mapped, requires NumPy)
+    - .bin / .raw / .i64: raw little-endian int64 values (memory-mapped)
+    - .f64: raw little-endian float64 values (not with ``dtype=int``)
+    - anything else (.csv, .txt, ...): text parsed by parse_list with ``dtype``
+    
+    Args:
+        path (str): Path of the file to read
+        dtype: ``int`` (default), ``float`` or ``"auto"`` (see parse_list);
+            binary integer files are converted to floats only for ``float``
+    
+    Returns:
+        list: List of parsed numbers
+    
+    Raises:
+        ValueError: If the file contents are not valid numbers of ``dtype``
+    """
+    if dtype not in (int, float, "auto"):
+        raise ValueError(f"unsupported dtype {dtype!r} (expected int, float or 'auto')")
+    ext = os.path.splitext(path)[1].lower()
+    
+    if ext == ".npy":
+        if np is None:
+            raise ValueError("NumPy is required to read .npy files")
+        data = np.load(path, mmap_mode="r")
+        if data.dtype.kind == "f" and dtype is not int:
+            values = data.ravel().tolist()
+        elif data.dtype.kind not in "iub":
+            expected = "integers" if dtype is int else "numbers"
+            raise ValueError(f".npy file has dtype {data.dtype}, expected {expected}")
+        else:
+            values = data.ravel().tolist()
+    elif ext in RAW_INT64_EXTENSIONS or ext in RAW_FLOAT64_EXTENSIONS:
+        floats = ext in RAW_FLOAT64_EXTENSIONS
+        if floats and dtype is int:
+            raise ValueError(f"{ext} files hold float64 values; load them with dtype float or 'auto'")
+        values = _read_raw(path, "d" if floats else "q")
+    else:
+        with open(path, encoding="utf-8") as f:
+            return parse_list(f.read(), dtype)
+    
+    if dtype is float:
+        values = list(map(float, values))
+    # NaN is unordered, so no sort (or counter) would be meaningful
+    if dtype is not int and any(v != v for v in values):
+        raise ValueError("'nan' is not a valid number")
+    return values
+
+
+def _read_raw(path, typecode):
+    """Read a raw little-endian int64 ('q') or float64 ('d') file into a list (memory-mapped)."""
+    size = os.path.getsize(path)
+    if size % 8:
+        kind = "float64" if typecode == "d" else "int64"
+        raise ValueError(f"raw {kind} file size {size} is not a multiple of 8 bytes")
+    if size == 0:
+        return []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if sys.byteorder == "little":
+            with memoryview(mm) as view, view.cast(typecode) as values:
+                return values.tolist()
+        values = array(typecode)
+        values.frombytes(mm)
+        values.byteswap()
+        return values.tolist()
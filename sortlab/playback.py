@@ -0,0 +1,265 @@
+"""
+Animated step playback: the StepLog is sent to the browser once as a compact
+delta stream and replayed there by a small canvas player.
+
+Stream layout (all integers LEB128 varints, see sortlab.varint; values,
+index deltas and the initial array are zigzag-signed):
+
+    n, initial[0..n-1], step_count,
+    then per step: kind, i, comparisons delta, moves delta, change_count,
+                   change_count x (index delta, source[, value])
+
+The index delta is taken from the previous change's index, so a run of
+shifts costs one byte each. ``source`` r > 0 means the value is copied from
+index - r of the array as it was before the step (every shift and block move
+copies a neighbour), and 0 means a literal value follows.
+
+The stream is zlib-compressed and base64-encoded into a data attribute of
+the player element; PLAYER_SCRIPT (added to the page head) inflates it with
+the browser's DecompressionStream and rebuilds frames locally, keeping a
+keyframe every max(512, n) steps so seeking stays cheap.
+"""
+
+import base64
+import zlib
+from html import escape
+
+from .varint import write_svarint, write_uvarint
+
+# Longest animation sent to the browser; longer traces are cut at this step
+PLAYBACK_MAX_STEPS = 250_000
+
+
+def encode_playback(steps, max_steps=PLAYBACK_MAX_STEPS):
+    """
+    Encode a StepLog as the compressed playback stream.
+
+    Args:
+        steps (StepLog): Recorded steps
+        max_steps (int): Maximum number of steps to include
+
+    Returns:
+        dict: ``data`` (compressed bytes), ``steps`` (steps included),
+            ``truncated`` (bool) and ``raw_bytes`` (size before compression)
+    """
+    count = min(len(steps), max_steps)
+    out = bytearray()
+    write_uvarint(out, len(steps.initial))
+    for value in steps.initial:
+        write_svarint(out, value)
+    write_uvarint(out, count)
+
+    # Mirror of the client's array, to find values that copy a neighbour
+    a = list(steps.initial)
+    comparisons = moves = last_index = 0
+    for kind, i, j, step_comparisons, step_moves, _, changes in steps.deltas(0, count):
+        write_uvarint(out, kind)
+        write_uvarint(out, i)
+        write_uvarint(out, step_comparisons - comparisons)
+        write_uvarint(out, step_moves - moves)
+        comparisons, moves = step_comparisons, step_moves
+        write_uvarint(out, len(changes))
+        for index, value in changes:
+            write_svarint(out, index - last_index)
+            last_index = index
+            # Shifts copy from index - 1 (linear/binary/block) or from j (Shell gaps)
+            if index > 0 and a[index - 1] == value:
+                write_uvarint(out, 1)
+            elif 0 <= j < index and a[j] == value:
+                write_uvarint(out, index - j)
+            else:
+                write_uvarint(out, 0)
+                write_svarint(out, value)
+        for index, value in changes:
+            a[index] = value
+
+    return {
+        "data": zlib.compress(bytes(out), 6),
+        "steps": count,
+        "truncated": count < len(steps),
+        "raw_bytes": len(out),
+    }
+
+
+def render_player(steps, max_steps=PLAYBACK_MAX_STEPS):
+    """
+    Build the HTML for an animated playback of ``steps``.
+
+    The markup only carries the encoded stream; PLAYER_SCRIPT must be on the
+    page (app.py passes it as the Blocks ``head``) to bring it to life.
+
+    Args:
+        steps (StepLog): Recorded steps (None or empty gives "")
+        max_steps (int): Maximum number of steps to include
+
+    Returns:
+        str: Player HTML
+    """
+    if not steps:
+        return ""
+    encoded = encode_playback(steps, max_steps)
+    payload = base64.b64encode(encoded["data"]).decode("ascii")
+    note = (f"First {encoded['steps']:,} of {len(steps):,} steps"
+            if encoded["truncated"] else f"{encoded['steps']:,} steps")
+    return (
+        f'<div class="sl-player" data-playback="{payload}">'
+        '<canvas class="sl-player-canvas"></canvas>'
+        '<div class="sl-player-controls">'
+        '<button type="button" data-act="play">▶ Play</button>'
+        f'<input type="range" min="0" max="{max(encoded["steps"] - 1, 0)}" value="0" step="1">'
+        '<select title="Steps per frame">'
+        + "".join(f'<option value="{v}"{" selected" if v == 1 else ""}>{v}×</option>'
+                  for v in (1, 5, 25, 100, 500))
+        + '</select>'
+        '<span class="sl-player-label"></span></div>'
+        f'<p class="sl-player-note">{escape(note)}, {len(encoded["data"]):,} bytes transferred</p>'
+        '</div>'
+    )
+
+
+PLAYER_SCRIPT = """<style>
+.sl-player{font-family:Arial,sans-serif;padding:12px;border-radius:12px;background:#1e293b;color:#fff}
+.sl-player-canvas{width:100%;height:220px;display:block;background:#0f172a;border-radius:8px}
+.sl-player-controls{display:flex;gap:10px;align-items:center;margin-top:10px}
+.sl-player-controls input[type=range]{flex:1}
+.sl-player-controls button,.sl-player-controls select{background:#334155;color:#fff;border:0;border-radius:6px;padding:6px 10px;cursor:pointer}
+.sl-player-label{font-variant-numeric:tabular-nums;min-width:22em;font-size:.9em}
+.sl-player-note{font-size:.8em;opacity:.7;margin:6px 0 0}
+</style>
+<script>
+(() => {
+  function decode(buf) {
+    let pos = 0;
+    // Varints are read with arithmetic, not bit ops, so values up to 2^53 survive
+    const uv = () => {
+      let result = 0, mul = 1, b;
+      do { b = buf[pos++]; result += (b & 0x7f) * mul; mul *= 128; } while (b & 0x80);
+      return result;
+    };
+    const sv = () => { const u = uv(); return u % 2 ? -(u + 1) / 2 : u / 2; };
+    const n = uv();
+    const initial = new Float64Array(n);
+    for (let k = 0; k < n; k++) initial[k] = sv();
+    const count = uv();
+    const kinds = new Uint8Array(count), outer = new Float64Array(count);
+    const comps = new Float64Array(count), moves = new Float64Array(count);
+    const offsets = new Uint32Array(count + 1), idx = [], vals = [];
+    // Working copy so copied values ("source" r > 0) resolve to literals here
+    const work = Float64Array.from(initial);
+    let c = 0, m = 0, last = 0;
+    for (let s = 0; s < count; s++) {
+      kinds[s] = uv(); outer[s] = uv(); c += uv(); m += uv();
+      comps[s] = c; moves[s] = m;
+      const start = idx.length;
+      for (let t = uv(); t > 0; t--) {
+        last += sv();
+        const source = uv();
+        idx.push(last);
+        vals.push(source ? work[last - source] : sv());
+      }
+      for (let p = start; p < idx.length; p++) work[idx[p]] = vals[p];
+      offsets[s + 1] = idx.length;
+    }
+    return {n, initial, count, outer, comps, moves, offsets,
+            idx: Uint32Array.from(idx), vals: Float64Array.from(vals)};
+  }
+
+  async function inflate(b64) {
+    const bin = atob(b64), bytes = new Uint8Array(bin.length);
+    for (let k = 0; k < bin.length; k++) bytes[k] = bin.charCodeAt(k);
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("deflate"));
+    return new Uint8Array(await new Response(stream).arrayBuffer());
+  }
+
+  async function setup(el) {
+    el.dataset.ready = "1";
+    const canvas = el.querySelector("canvas"), label = el.querySelector(".sl-player-label");
+    const slider = el.querySelector("input[type=range]"), button = el.querySelector("button");
+    const speed = el.querySelector("select");
+    let t;
+    try {
+      t = decode(await inflate(el.dataset.playback));
+    } catch (err) {
+      label.textContent = "Playback unavailable in this browser (" + err + ")";
+      return;
+    }
+    const {n, initial, count, outer, comps, moves, offsets, idx, vals} = t;
+    let lo = 0, hi = 0;
+    for (const v of initial) { if (v < lo) lo = v; if (v > hi) hi = v; }
+    const range = (hi - lo) || 1;
+
+    // Keyframes every `interval` steps, built once up front
+    const interval = Math.max(512, n), keyframes = [];
+    const arr = Float64Array.from(initial);
+    const apply = s => { for (let p = offsets[s]; p < offsets[s + 1]; p++) arr[idx[p]] = vals[p]; };
+    apply(0);
+    keyframes.push(Float64Array.from(arr));
+    for (let s = 1; s < count; s++) {
+      apply(s);
+      if (s % interval === 0) keyframes.push(Float64Array.from(arr));
+    }
+    let current = 0;
+    arr.set(keyframes[0]);
+
+    function seek(target) {
+      target = Math.max(0, Math.min(count - 1, target));
+      if (target < current || target - current > interval) {
+        const base = Math.floor(target / interval);
+        arr.set(keyframes[base]);
+        current = base * interval;
+      }
+      while (current < target) apply(++current);
+      draw();
+    }
+
+    function draw() {
+      const dpr = window.devicePixelRatio || 1;
+      const w = canvas.clientWidth * dpr, h = canvas.clientHeight * dpr;
+      if (canvas.width !== w || canvas.height !== h) { canvas.width = w; canvas.height = h; }
+      const ctx = canvas.getContext("2d");
+      ctx.clearRect(0, 0, w, h);
+      const bw = w / n, zero = h * hi / range;
+      const changed = new Set(idx.subarray(offsets[current], offsets[current + 1]));
+      for (let k = 0; k < n; k++) {
+        const top = h * (hi - Math.max(arr[k], 0)) / range;
+        const bottom = h * (hi - Math.min(arr[k], 0)) / range;
+        ctx.fillStyle = changed.has(k) ? "#f43f5e" : k <= outer[current] ? "#fbbf24" : "#64748b";
+        ctx.fillRect(k * bw, top, Math.max(bw - (bw > 3 ? 1 : 0), 0.5), Math.max(bottom - top, 1));
+      }
+      ctx.fillStyle = "rgba(255,255,255,.3)";
+      ctx.fillRect(0, zero, w, 1);
+      slider.value = current;
+      label.textContent = "Step " + current.toLocaleString() + " / " + (count - 1).toLocaleString() +
+        "  ·  i=" + outer[current] + "  ·  " + comps[current].toLocaleString() + " comps  ·  " +
+        moves[current].toLocaleString() + " moves";
+    }
+
+    let playing = false;
+    function frame() {
+      if (!playing || !el.isConnected) return;
+      seek(current + Number(speed.value));
+      if (current >= count - 1) { playing = false; button.textContent = "▶ Play"; return; }
+      requestAnimationFrame(frame);
+    }
+    button.addEventListener("click", () => {
+      playing = !playing;
+      button.textContent = playing ? "❚❚ Pause" : "▶ Play";
+      if (playing) {
+        if (current >= count - 1) seek(0);
+        requestAnimationFrame(frame);
+      }
+    });
+    slider.addEventListener("input", () => {
+      playing = false;
+      button.textContent = "▶ Play";
+      seek(Number(slider.value));
+    });
+    draw();
+  }
+
+  // Gradio swaps the HTML output in place, so pick up players as they appear
+  new MutationObserver(() => {
+    document.querySelectorAll(".sl-player:not([data-ready])").forEach(setup);
+  }).observe(document.documentElement, {childList: true, subtree: true});
+})();
+</script>"""
@@ -0,0 +1,173 @@
+"""
+Presortedness: how close an input already is to sorted, measured in one O(n)
+pass before sorting, and the hybrid engine strategy that profile selects.
+"""
+
+from bisect import bisect_right, insort
+from itertools import groupby, islice
+from operator import gt
+
+# Inputs up to this size get an exact inversion count; larger ones a sampled estimate
+INVERSION_SAMPLE_SIZE = 2048
+
+# Hybrid engine strategies (see choose_hybrid_strategy)
+HYBRID_NONE = "none"
+HYBRID_INSERTION = "insertion"
+HYBRID_RUN_MERGE = "run-merge"
+
+
+def find_runs(arr):
+    """
+    Split an array into Timsort-style natural runs.
+
+    Scanning left to right, each run is either non-decreasing or strictly
+    decreasing (strict, so reversing it keeps equal elements in order) and
+    as long as possible. The comparisons run in C over the whole array; the
+    Python-level work is per run, not per element.
+
+    Args:
+        arr (list): Input array
+
+    Returns:
+        list: (start, stop, descending) tuples covering the array in order
+    """
+    n = len(arr)
+    if n < 2:
+        return [(0, n, False)] if n else []
+
+    # Pair p is (arr[p], arr[p + 1]); group the pairs into maximal blocks of
+    # descents and non-descents and remember where each block ends
+    block_ends, block_desc = [], []
+    end = 0
+    for descending, block in groupby(map(gt, arr, islice(arr, 1, None))):
+        end += len(list(block))
+        block_ends.append(end)
+        block_desc.append(descending)
+
+    runs = []
+    start = block = 0
+    while start < n - 1:
+        while block_ends[block] <= start:
+            block += 1
+        # The run takes the rest of the block its first pair falls in
+        stop = block_ends[block] + 1
+        runs.append((start, stop, block_desc[block]))
+        start = stop
+    if start == n - 1:
+        runs.append((start, n, False))
+    return runs
+
+
+def _count_inversions_small(values):
+    """Exact inversion count by insertion into a sorted list (for small inputs)."""
+    seen = []
+    inversions = 0
+    for count, x in enumerate(values):
+        inversions += count - bisect_right(seen, x)
+        insort(seen, x)
+    return inversions
+
+
+def analyze_presortedness(arr, sample_size=INVERSION_SAMPLE_SIZE):
+    """
+    Profile how sorted an array already is.
+
+    Everything except the inversion count is exact and comes from one scan.
+    For arrays longer than ``sample_size`` the inversions are estimated from
+    an evenly spaced sample scaled up to all pairs. The estimate is never
+    below the exact lower bounds from the scan (every descent is an
+    inversion, and so is every pair inside a decreasing run), so nearly
+    sorted inputs whose disorder the sample misses still register.
+
+    Args:
+        arr (list): Input array
+        sample_size (int): Largest input counted exactly, and the sample size
+            beyond it
+
+    Returns:
+        dict: n, ascending_runs, descending_runs, runs, longest_run,
+            longest_sorted_prefix, descents, estimated_inversions,
+            inversions_exact, sortedness (1.0 = sorted, 0.0 = reversed) and
+            the hybrid strategy the profile selects
+    """
+    n = len(arr)
+    runs = find_runs(arr)
+    descending = [stop - start for start, stop, desc in runs if desc]
+    descents = sum(map(gt, arr, islice(arr, 1, None)))
+
+    if n <= sample_size:
+        inversions = _count_inversions_small(arr)
+        exact = True
+    else:
+        step = n / sample_size
+        sample = [arr[int(k * step)] for k in range(sample_size)]
+        scale = n * (n - 1) / (sample_size * (sample_size - 1))
+        inversions = max(
+            round(_count_inversions_small(sample) * scale),
+            sum(length * (length - 1) // 2 for length in descending),
+            descents,
+        )
+        exact = False
+
+    pairs = n * (n - 1) // 2
+    profile = {
+        "n": n,
+        "ascending_runs": len(runs) - len(descending),
+        "descending_runs": len(descending),
+        "runs": len(runs),
+        "longest_run": max((stop - start for start, stop, _ in runs), default=0),
+        "longest_sorted_prefix": runs[0][1] if runs and not runs[0][2] else min(n, 1),
+        "descents": descents,
+        "estimated_inversions": min(inversions, pairs),
+        "inversions_exact": exact,
+        "sortedness": round(1 - min(inversions, pairs) / pairs, 4) if pairs else 1.0,
+    }
+    profile["strategy"] = choose_hybrid_strategy(profile)
+    return profile
+
+
+def choose_hybrid_strategy(profile):
+    """
+    Pick how the hybrid engine sorts an input with this profile.
+
+    - HYBRID_NONE: already sorted, the scan is all the work
+    - HYBRID_INSERTION: at most about one inversion per element, where
+      insertion sort's O(n + inversions) is linear (for sampled estimates
+      the engine caps the shifts and falls back to run-merge, see
+      iter_hybrid_sort)
+    - HYBRID_RUN_MERGE: reverse decreasing runs, insertion-sort short runs
+      and merge them (O(n log runs))
+
+    Args:
+        profile (dict): Result of analyze_presortedness
+
+    Returns:
+        str: One of the HYBRID_* strategies
+    """
+    if profile["longest_sorted_prefix"] == profile["n"]:
+        return HYBRID_NONE
+    if profile["estimated_inversions"] <= profile["n"]:
+        return HYBRID_INSERTION
+    return HYBRID_RUN_MERGE
+
+
+def format_presortedness(profile):
+    """
+    Summary lines describing a presortedness profile.
+
+    Args:
+        profile (dict): Result of analyze_presortedness
+
+    Returns:
+        list: Lines for the analysis summary
+    """
+    estimate = "" if profile["inversions_exact"] else " (estimated)"
+    return [
+        "PRESORTEDNESS",
+        f"  • Sortedness:      {profile['sortedness']:.1%}",
+        f"  • Inversions:      {profile['estimated_inversions']:,}{estimate}",
+        f"  • Natural Runs:    {profile['runs']:,} ({profile['ascending_runs']:,} ascending, "
+        f"{profile['descending_runs']:,} descending; longest {profile['longest_run']:,})",
+        f"  • Sorted Prefix:   {profile['longest_sorted_prefix']:,} of {profile['n']:,}",
+        f"  • Hybrid Strategy: {profile['strategy']}",
+    ]
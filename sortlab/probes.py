@@ -0,0 +1,211 @@
+"""
+Opt-in instrumentation: pick which probes run, pay nothing for the others.
+
+Loop probes act on the run of the selected engine that produces the report,
+so they share its deadline. The counter probes (comparisons, moves,
+accesses) pick what a metrics-only run counts: it runs the compiled variant
+of the engine with just those counter updates in its loops (see
+sortlab.variants), and sort_metrics(counters=()) runs it with none. The
+"timestamps" probe hooks every step of the step engine instead. The
+"sections" probe times named phases with time.perf_counter, and "profile"
+runs them under cProfile; both can be written as a collapsed-stack file for
+flamegraph.pl / speedscope.
+"""
+
+import cProfile
+import pstats
+import time
+from array import array
+from contextlib import contextmanager, nullcontext
+
+from .variants import COUNTERS
+
+# Probes that live inside the sort loop
+LOOP_PROBES = COUNTERS + ("timestamps",)
+# Every probe a caller may enable
+PROBES = LOOP_PROBES + ("sections", "profile")
+
+
+def raw_insertion_sort(arr):
+    """
+    Linear insertion sort with no instrumentation at all (the baseline the
+    benchmarks compare the counting engines against).
+
+    Args:
+        arr (list): Input array
+
+    Returns:
+        list: Sorted copy of ``arr``
+    """
+    a = arr[:]
+    for i in range(1, len(a)):
+        key = a[i]
+        j = i - 1
+        while j >= 0 and a[j] > key:
+            a[j + 1] = a[j]
+            j -= 1
+        a[j + 1] = key
+    return a
+
+
+class Instrumentation:
+    """
+    Collects the stats of the probes a caller enabled.
+
+    Args:
+        probes (iterable): Names from PROBES
+
+    Raises:
+        ValueError: For an unknown probe name
+    """
+
+    def __init__(self, probes=()):
+        probes = frozenset(probes)
+        unknown = probes.difference(PROBES)
+        if unknown:
+            raise ValueError(f"unknown probe(s) {', '.join(sorted(unknown))} "
+                             f"(expected {', '.join(PROBES)})")
+        self.probes = probes
+        self.loop_probes = probes.intersection(LOOP_PROBES)
+        self.counter_probes = probes.intersection(COUNTERS)
+        self.timestamps = array("d")
+        self.sort_seconds = None
+        # "a;b" section path -> [calls, seconds]
+        self.sections = {}
+        self._stack = []
+        self._profile = cProfile.Profile() if "profile" in probes else None
+
+    def __bool__(self):
+        return bool(self.probes)
+
+    def section(self, name):
+        """
+        Context manager timing a named phase (nested sections form a stack).
+
+        A no-op unless the "sections" or "profile" probe is active; with
+        "profile" the phase also runs under cProfile.
+        """
+        if "sections" not in self.probes and self._profile is None:
+            return nullcontext()
+        return self._timed_section(name)
+
+    @contextmanager
+    def _timed_section(self, name):
+        self._stack.append(name)
+        path = ";".join(self._stack)
+        profiling = self._profile is not None and len(self._stack) == 1
+        if profiling:
+            self._profile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiling:
+                self._profile.disable()
+            self._stack.pop()
+            entry = self.sections.setdefault(path, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+
+    @contextmanager
+    def observe_sort(self):
+        """
+        Time the engine's sort and collect per-step timestamps.
+
+        Yields:
+            callable: Per-step hook to pass as ``on_step`` to sort_with_steps
+                or sort_metrics, or None unless the "timestamps" probe is on
+                (so the sort keeps its uninstrumented path)
+        """
+        clock = time.perf_counter
+        raw = array("d")
+        hook = None
+        if "timestamps" in self.loop_probes:
+            hook = lambda record: raw.append(clock())  # noqa: E731
+        start = clock()
+        try:
+            yield hook
+        finally:
+            self.sort_seconds = clock() - start
+            # Timestamps are stored relative to the start of the sort
+            self.timestamps = array("d", (t - start for t in raw))
+
+    def counters(self):
+        """
+        Counters a metrics-only run should count.
+
+        Returns:
+            tuple: The enabled counter probes, or every counter when none is
+                enabled (the report shows all three by default)
+        """
+        return tuple(c for c in COUNTERS if c in self.counter_probes) or COUNTERS
+
+    def _profile_rows(self):
+        """(function label, calls, self seconds, cumulative seconds) from cProfile."""
+        if self._profile is None:
+            return []
+        stats = pstats.Stats(self._profile)
+        rows = []
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            label = f"{func} ({filename.rsplit('/', 1)[-1]}:{line})" if line else func
+            rows.append((label, calls, tottime, cumtime))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def to_dict(self, top_functions=20):
+        """Return the collected stats (for the JSON export)."""
+        data = {"probes": sorted(self.probes)}
+        if self.sort_seconds is not None:
+            data["sort_seconds"] = self.sort_seconds
+        if self.counter_probes:
+            data["counters"] = [c for c in COUNTERS if c in self.counter_probes]
+        if "timestamps" in self.probes:
+            gaps = [b - a for a, b in zip(self.timestamps, self.timestamps[1:])]
+            data["timestamps"] = {
+                "steps": len(self.timestamps),
+                "first": self.timestamps[0] if self.timestamps else None,
+                "last": self.timestamps[-1] if self.timestamps else None,
+                "max_gap": max(gaps) if gaps else None,
+            }
+        if self.sections:
+            data["sections"] = {path: {"calls": calls, "seconds": seconds}
+                                for path, (calls, seconds) in self.sections.items()}
+        if self._profile is not None:
+            data["profile"] = [
+                {"function": label, "calls": calls, "self_seconds": tottime,
+                 "cumulative_seconds": cumtime}
+                for label, calls, tottime, cumtime in self._profile_rows()[:top_functions]
+            ]
+        return data
+
+    def collapsed_stacks(self):
+        """
+        Render the section (and profile) timings as collapsed stacks.
+
+        Each line is ``frame;frame;... microseconds`` with self time only, the
+        format read by flamegraph.pl, speedscope and inferno. Profiled
+        functions appear under a "cProfile" frame with their self time.
+
+        Returns:
+            str: One stack per line
+        """
+        lines = []
+        for path, (_, seconds) in self.sections.items():
+            # Self time: subtract the time of direct child sections
+            depth = path.count(";") + 1
+            children = sum(s for p, (_, s) in self.sections.items()
+                           if p.startswith(path + ";") and p.count(";") + 1 == depth + 1)
+            self_us = int(round((seconds - children) * 1e6))
+            if self_us > 0:
+                lines.append(f"{path} {self_us}")
+        for label, _, tottime, _ in self._profile_rows():
+            self_us = int(round(tottime * 1e6))
+            if self_us > 0:
+                lines.append(f"cProfile;{label.replace(';', ',')} {self_us}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def write_collapsed(self, path):
+        """Write collapsed_stacks() to ``path``."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed_stacks())
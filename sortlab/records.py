@@ -0,0 +1,322 @@
+"""
+Record sorting: order CSV rows or JSON objects by fields or a key function
+with any lab engine.
+
+Keys are computed once, up front, and never again (decorate-sort-undecorate).
+The distinct keys are ranked, and each record is decorated with the single
+integer ``rank * n + original_index``, kept in a compact array('q') parallel to
+the records. The engines then sort plain integers:
+
+- every engine, the typed one and the bubble/quick comparison rows work
+  unchanged, and their counters count key comparisons
+- equal keys are ordered by original position, so the result is stable even
+  for Shell sort
+- descending order flips the ranks instead of reversing the output, which
+  would reverse the order of equal keys
+
+Records are never rewritten: a CSV cell like "02134" is written back as
+"02134". Only the field keys read numbers out of text, and they order values
+of different types by a (type rank, value) pair: numbers, then text, then
+other JSON values, then blanks.
+"""
+
+import csv
+import io
+import json
+import math
+import os
+from array import array
+
+from .batch import JSONL_EXTENSIONS
+from .engines import ENGINE_LINEAR, sort_metrics, sort_with_steps
+
+# Extensions understood by load_records (anything else is read as CSV)
+RECORD_EXTENSIONS = (".csv", ".json") + JSONL_EXTENSIONS
+
+
+# Type ranks of field keys: numbers sort before text, blanks last
+_KEY_NUMBER, _KEY_TEXT, _KEY_OTHER, _KEY_BLANK = range(4)
+
+
+def _number(text):
+    """Read text as an int or float, or return None when it is not a number."""
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return None if math.isnan(value) else value
+
+
+def _field_key(value):
+    """
+    Sort key of one field value: a (type rank, value) pair, so numbers, text
+    and blanks of a mixed column still have a total order.
+    """
+    if value is None:
+        return (_KEY_BLANK, "")
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return (_KEY_BLANK, "")
+        number = _number(text)
+        return (_KEY_TEXT, text) if number is None else (_KEY_NUMBER, number)
+    if isinstance(value, (int, float)) and not (isinstance(value, float) and math.isnan(value)):
+        return (_KEY_NUMBER, value)
+    return (_KEY_OTHER, _freeze(value))
+
+
+def parse_records(text, fmt=None):
+    """
+    Parse records from text.
+
+    Args:
+        text (str): A JSON array, JSON lines, or CSV with a header row
+        fmt (str): "json", "jsonl" or "csv"; detected from the first
+            character when omitted ("[" is JSON, "{" is JSON lines)
+
+    Returns:
+        list: Dicts for CSV rows (every cell kept as text) and JSON objects;
+            JSON arrays stay lists
+
+    Raises:
+        ValueError: If the text cannot be parsed, a CSV row has more cells
+            than the header, or it holds no records
+    """
+    if fmt is None:
+        fmt = {"[": "json", "{": "jsonl"}.get(text.lstrip()[:1], "csv")
+    if fmt == "json":
+        records = json.loads(text)
+        if not isinstance(records, list):
+            raise ValueError("a JSON records file must hold an array")
+    elif fmt == "jsonl":
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        rows = csv.DictReader(io.StringIO(text))
+        records = []
+        for row in rows:
+            # DictReader files surplus cells under the key None
+            if None in row:
+                raise ValueError(f"CSV line {rows.line_num} has {len(rows.fieldnames) + len(row[None])} "
+                                 f"cells but the header names {len(rows.fieldnames)}")
+            records.append({name: value or "" for name, value in row.items()})
+    if not records:
+        raise ValueError("no records found")
+    return records
+
+
+def load_records(path):
+    """
+    Read the records of a .csv, .json or .jsonl/.ndjson file (see parse_records).
+
+    Raises:
+        ValueError: If the file cannot be parsed or holds no records
+    """
+    # Gradio may hand us a tempfile wrapper instead of a path
+    path = getattr(path, "name", path)
+    ext = os.path.splitext(path)[1].lower()
+    fmt = "jsonl" if ext in JSONL_EXTENSIONS else "json" if ext == ".json" else "csv"
+    with open(path, encoding="utf-8", newline="") as f:
+        return parse_records(f.read(), fmt)
+
+
+def write_records(records, path):
+    """
+    Write records as CSV (for a .csv path) or as JSON lines.
+
+    Returns:
+        str: ``path``
+    """
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if os.path.splitext(path)[1].lower() == ".csv":
+            fields = list(dict.fromkeys(name for record in records for name in record))
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+    return path
+
+
+def parse_key_spec(spec):
+    """
+    Parse a key specification like ``"city,-age"``.
+
+    Fields are separated by commas; a leading "-" sorts that field in
+    descending order. Names stay text: dict records look them up as keys
+    (so a CSV column named "2024" works), and list records read a numeric
+    name as an index (see _field_values).
+
+    Returns:
+        list: (field name, descending) pairs
+
+    Raises:
+        ValueError: If the specification names no field
+    """
+    fields = []
+    for name in spec.split(","):
+        name = name.strip()
+        descending = name.startswith("-")
+        name = name[1:].strip() if descending else name
+        if not name:
+            continue
+        fields.append((name, descending))
+    if not fields:
+        raise ValueError(f"no sort field in key '{spec}'")
+    return fields
+
+
+def _freeze(value):
+    """Make JSON values hashable (lists become tuples)."""
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def _field(record, field):
+    """
+    Look up ``field`` in one record: the key itself in a dict (then its text
+    form, for int fields from the Python API), an integer index in a list.
+    """
+    if isinstance(record, dict):
+        if field in record:
+            return record[field]
+        return record[str(field)]
+    if isinstance(record, (list, tuple)):
+        if isinstance(field, str):
+            if not field.isdigit():
+                raise KeyError(field)
+            field = int(field)
+        return record[field]
+    return record[field]
+
+
+def _field_values(records, field):
+    """Key every record's ``field`` (see _field_key), naming the first record that lacks it."""
+    values = []
+    for index, record in enumerate(records):
+        try:
+            values.append(_field_key(_field(record, field)))
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(f"record {index} has no field {field!r}") from None
+    return values
+
+
+def _ranks(keys, what="sort keys"):
+    """
+    Dense ranks of ``keys``: equal keys share a rank and ranks follow key order.
+
+    Returns:
+        tuple: (ranks, number of distinct keys)
+
+    Raises:
+        ValueError: If the keys cannot be hashed or compared with each other
+    """
+    try:
+        order = {key: rank for rank, key in enumerate(sorted(set(keys)))}
+    except TypeError as e:
+        raise ValueError(f"{what} cannot be ordered ({e})") from None
+    return [order[key] for key in keys], len(order)
+
+
+def decorate(records, key=None, fields=(), reverse=False):
+    """
+    Compute every record's sort key once and encode it as one integer.
+
+    With ``fields``, each field is ranked separately (descending fields get
+    their ranks flipped) and the rank tuples are ranked again; numeric text
+    compares as numbers and mixed types order as numbers, text, other
+    values, blanks. A ``key``
+    function is called exactly once per record. With neither, the records
+    themselves are the keys.
+
+    Args:
+        records (sequence): Records (or plain values) to sort
+        key (callable): Optional key function
+        fields (iterable): (field, descending) pairs from parse_key_spec,
+            used when ``key`` is None
+        reverse (bool): Sort the whole key in descending order (equal keys
+            still keep their original order)
+
+    Returns:
+        array: ``rank * n + index`` per record, as array('q'); sorting it
+            ascending sorts the records stably by key
+
+    Raises:
+        ValueError: If a field is missing or the keys cannot be ordered
+    """
+    n = len(records)
+    fields = list(fields)
+    if key is not None:
+        ranks, distinct = _ranks([_freeze(key(record)) for record in records])
+    elif fields:
+        columns = []
+        for field, descending in fields:
+            column, distinct = _ranks(_field_values(records, field), f"values of field {field!r}")
+            columns.append([distinct - 1 - r for r in column] if descending else column)
+        if len(columns) == 1:
+            ranks = columns[0]
+        else:
+            ranks, distinct = _ranks(list(zip(*columns)))
+    else:
+        ranks, distinct = _ranks([_freeze(record) for record in records])
+
+    if reverse:
+        ranks = [distinct - 1 - r for r in ranks]
+    try:
+        return array("q", [rank * n + index for index, rank in enumerate(ranks)])
+    except OverflowError:
+        raise ValueError("too many records to encode their keys in int64") from None
+
+
+def undecorate(records, decorated):
+    """Return the records in the order of (sorted) decorated keys from decorate."""
+    n = len(records)
+    return [records[code % n] for code in decorated]
+
+
+def sort_records(records, key=None, fields=(), reverse=False, engine=ENGINE_LINEAR, deadline=None):
+    """
+    Sort records by key with any engine, counting only the engine's work.
+
+    Ranking the distinct keys happens once, before the sort, and is not
+    counted; the comparisons, moves and accesses are those of the engine
+    sorting the decorated keys, one comparison per key comparison.
+
+    Args:
+        records (sequence): Records to sort
+        key, fields, reverse: See decorate
+        engine (str): Key in SORT_ENGINES
+        deadline (Deadline): Optional time budget (see sort_metrics)
+
+    Returns:
+        tuple: (sorted_records, comparisons, moves, accesses)
+
+    Raises:
+        ValueError: If a field is missing or the keys cannot be ordered
+    """
+    decorated = decorate(records, key, fields, reverse)
+    sorted_keys, comparisons, moves, accesses = sort_metrics(decorated, engine, deadline)
+    return undecorate(records, sorted_keys), comparisons, moves, accesses
+
+
+def sort_records_with_steps(records, key=None, fields=(), reverse=False, engine=ENGINE_LINEAR,
+                            deadline=None):
+    """
+    Like sort_records, but also record the engine's steps.
+
+    The StepLog holds the decorated keys (``rank * n + index``, see
+    decorate); undecorate maps any step's array back to records.
+
+    Returns:
+        tuple: (sorted_records, steps, comparisons, moves, accesses)
+    """
+    decorated = decorate(records, key, fields, reverse).tolist()
+    sorted_keys, steps, comparisons, moves, accesses = sort_with_steps(decorated, engine, deadline)
+    return undecorate(records, sorted_keys), steps, comparisons, moves, accesses
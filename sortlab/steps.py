@@ -0,0 +1,257 @@
+"""
+Step records: the compact StepLog that stores a sort's execution trace and the
+plain-English description of each step.
+"""
+
+from array import array
+
+# Step kinds recorded in a StepLog
+STEP_INITIAL = 0
+STEP_SHIFT = 1
+STEP_INSERT = 2
+STEP_BLOCK_INSERT = 3
+STEP_REVERSE = 4
+STEP_MERGE = 5
+
+# Default spacing between full-array keyframes in a StepLog
+DEFAULT_KEYFRAME_INTERVAL = 64
+
+
+class StepLog:
+    """
+    Compact, delta-encoded record of every step of a sorting run.
+
+    Instead of storing a full copy of the array for each step, the log keeps
+    parallel arrays holding the step kind, indices and counters, plus only the
+    (index, value) pairs that changed at each step. A full copy of the array
+    (a keyframe) is stored every ``keyframe_interval`` steps so any single step
+    can be rebuilt by replaying at most ``keyframe_interval`` deltas.
+
+    The log behaves like a read-only sequence of step dictionaries with the
+    same keys the lab has always used ("array", "i", "j", "comparisons",
+    "moves", "accesses", "description", "active_indices").
+
+    Args:
+        initial (list): Array state before any step was taken
+        keyframe_interval (int): Steps between keyframes. Defaults to the
+            larger of DEFAULT_KEYFRAME_INTERVAL and len(initial), which keeps
+            keyframe memory proportional to the number of steps.
+
+    Example:
+        >>> _, steps, _, _, _ = insertion_sort_with_steps([3, 1])
+        >>> steps[1]["array"]
+        [3, 3]
+    """
+
+    __slots__ = (
+        "initial", "keyframe_interval",
+        "_kinds", "_i", "_j", "_comparisons", "_moves", "_accesses",
+        "_offsets", "_indices", "_values", "_keyframes",
+    )
+
+    def __init__(self, initial, keyframe_interval=None):
+        self.initial = list(initial)
+        if keyframe_interval is None:
+            keyframe_interval = max(DEFAULT_KEYFRAME_INTERVAL, len(self.initial))
+        self.keyframe_interval = keyframe_interval
+
+        # One entry per step
+        self._kinds = array("b")
+        self._i = array("q")
+        self._j = array("q")
+        self._comparisons = array("q")
+        self._moves = array("q")
+        self._accesses = array("q")
+
+        # Changes of step k live in _indices/_values[_offsets[k]:_offsets[k+1]]
+        self._offsets = array("q", [0])
+        self._indices = array("q")
+        self._values = []
+
+        # Array state after steps 0, K, 2K, ...
+        self._keyframes = []
+
+    def append(self, kind, i, j, comparisons, moves, accesses, changes, current):
+        """
+        Record one step.
+
+        Args:
+            kind (int): One of the STEP_* constants
+            i (int): Outer loop index
+            j (int): Inner loop index
+            comparisons (int): Cumulative comparisons after this step
+            moves (int): Cumulative moves after this step
+            accesses (int): Cumulative array accesses after this step
+            changes (list): (index, value) pairs written by this step
+            current (list): Array state after this step (copied only when a
+                keyframe is due)
+        """
+        if len(self._kinds) % self.keyframe_interval == 0:
+            self._keyframes.append(list(current))
+
+        self._kinds.append(kind)
+        self._i.append(i)
+        self._j.append(j)
+        self._comparisons.append(comparisons)
+        self._moves.append(moves)
+        self._accesses.append(accesses)
+
+        for index, value in changes:
+            self._indices.append(index)
+            self._values.append(value)
+        self._offsets.append(len(self._indices))
+
+    def __len__(self):
+        return len(self._kinds)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, stride = idx.indices(len(self))
+            if stride != 1:
+                return [self[k] for k in range(start, stop, stride)]
+            return list(self.iter_range(start, stop))
+
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("step index out of range")
+        return self._step_dict(idx, self.array_at(idx))
+
+    def __iter__(self):
+        return self.iter_range(0, len(self))
+
+    def array_at(self, idx):
+        """
+        Rebuild the array as it was right after step ``idx``.
+
+        Starts from the nearest keyframe at or before ``idx`` and replays the
+        remaining deltas, so the cost is O(n + keyframe_interval).
+        """
+        base = (idx // self.keyframe_interval) * self.keyframe_interval
+        a = self._keyframes[idx // self.keyframe_interval][:]
+        for k in range(base + 1, idx + 1):
+            self._apply(a, k)
+        return a
+
+    def iter_range(self, start, stop):
+        """
+        Yield step dictionaries for steps ``start`` up to ``stop`` (exclusive).
+
+        Only one seek is paid at ``start``; later steps are produced by
+        replaying one delta at a time.
+        """
+        stop = min(stop, len(self))
+        if start >= stop:
+            return
+        a = self.array_at(start)
+        yield self._step_dict(start, a)
+        for k in range(start + 1, stop):
+            self._apply(a, k)
+            yield self._step_dict(k, a)
+
+    def first_step_for(self, i):
+        """
+        Return the index of the first step recorded with outer index ``i``.
+
+        Raises:
+            ValueError: If no step was recorded with that outer index
+        """
+        return self._i.index(i)
+
+    def changes(self, idx):
+        """Return the (index, value) pairs written by step ``idx``."""
+        lo, hi = self._offsets[idx], self._offsets[idx + 1]
+        return list(zip(self._indices[lo:hi], self._values[lo:hi]))
+
+    def deltas(self, start=0, stop=None):
+        """
+        Yield the raw step records without rebuilding any array.
+
+        Args:
+            start (int): First step
+            stop (int): Stop before this step (default: end of the log)
+
+        Yields:
+            tuple: (kind, i, j, comparisons, moves, accesses, changes) with
+                the same meaning as the arguments of append
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        for k in range(start, stop):
+            yield (self._kinds[k], self._i[k], self._j[k], self._comparisons[k],
+                   self._moves[k], self._accesses[k], self.changes(k))
+
+    def nbytes(self):
+        """Approximate memory held by the log's arrays and keyframes, in bytes."""
+        fixed = sum(
+            col.itemsize * len(col)
+            for col in (self._kinds, self._i, self._j, self._comparisons,
+                        self._moves, self._accesses, self._offsets, self._indices)
+        )
+        # 8 bytes per list slot; small ints are shared by the interpreter
+        slots = len(self._values) + sum(len(kf) for kf in self._keyframes)
+        return fixed + 8 * slots
+
+    def summary(self):
+        """Return a small dict describing the size of the log (for JSON export)."""
+        return {
+            "steps": len(self),
+            "deltas": len(self._indices),
+            "keyframes": len(self._keyframes),
+            "keyframe_interval": self.keyframe_interval,
+            "approx_bytes": self.nbytes(),
+        }
+
+    def _apply(self, a, k):
+        for p in range(self._offsets[k], self._offsets[k + 1]):
+            a[self._indices[p]] = self._values[p]
+
+    def _step_dict(self, k, a):
+        j = self._j[k]
+        description, active = describe_step(self._kinds[k], j, self.changes(k))
+        return {
+            "array": a[:],
+            "i": self._i[k],
+            "j": j,
+            "comparisons": self._comparisons[k],
+            "moves": self._moves[k],
+            "accesses": self._accesses[k],
+            "description": description,
+            "active_indices": active,
+        }
+
+
+def describe_step(kind, j, changes):
+    """
+    Build the human-readable description and highlighted indices of a step.
+    
+    Args:
+        kind (int): One of the STEP_* constants
+        j (int): Inner loop index recorded with the step
+        changes (sequence): (index, value) pairs written by the step
+    
+    Returns:
+        tuple: (description, active_indices)
+    """
+    if kind == STEP_SHIFT:
+        index, value = changes[0]
+        gap = index - j
+        if gap != 1:
+            return f"Shift {value} right by {gap}", [j, index]
+        return f"Shift {value} right", [j, index]
+    if kind == STEP_INSERT:
+        index, value = changes[0]
+        return f"Insert {value} at position {index}", [index]
+    if kind == STEP_BLOCK_INSERT:
+        index, value = changes[0]
+        moved = len(changes) - 1
+        return (f"Insert {value} at position {index}, block-shifting {moved} elements right",
+                [idx for idx, _ in changes])
+    if kind == STEP_REVERSE:
+        first, last = changes[0][0], changes[-1][0]
+        return (f"Reverse descending run at positions {first}-{last}",
+                [idx for idx, _ in changes])
+    if kind == STEP_MERGE:
+        first, last = changes[0][0], changes[-1][0]
+        return (f"Merge runs, rewriting positions {first}-{last}",
+                [idx for idx, _ in changes])
+    return "Initial array", []
@@ -0,0 +1,173 @@
+"""
+Text rendering of StepLog traces: full, tail (for streaming) and paged views.
+"""
+
+# Streaming trace: newest steps kept in the textbox, array cells allowed across
+# those steps (keeps wide arrays from blowing up the payload), and seconds
+# between updates
+TRACE_STREAM_WINDOW = 500
+TRACE_STREAM_MAX_CELLS = 20_000
+TRACE_STREAM_INTERVAL = 0.25
+
+# Paged trace viewer: default number of steps per page
+TRACE_PAGE_SIZE = 100
+
+
+def format_trace_header():
+    """
+    Build the banner lines that open the step-by-step execution trace.
+    
+    Returns:
+        list: Lines of the trace header
+    """
+    return [
+        "+" + "-" * 68 + "+",
+        "| " + "STEP-BY-STEP EXECUTION TRACE".center(66) + " |",
+        "+" + "-" * 68 + "+",
+    ]
+
+
+def format_trace_step(idx, step):
+    """
+    Format a single recorded step as a block of trace lines.
+    
+    Args:
+        idx (int): Step number shown in the block title
+        step (dict): Step dictionary as produced by StepLog
+    
+    Returns:
+        list: Lines of the formatted step block
+    """
+    # Format array with visual separators
+    array_visual = " -> ".join(f"[{x}]" for x in step['array'])
+    return [
+        f"\n+-- STEP {idx:02d} " + "-" * 56,
+        f"| Action: {step['description']}",
+        f"| Array:  {array_visual}",
+        f"| Indices: i={step['i']}, j={step['j']}",
+        f"| Stats:  {step['comparisons']} comps | {step['moves']} moves | {step['accesses']} accesses",
+        f"+" + "-" * 68,
+    ]
+
+
+def format_trace_range(steps, start, stop, deadline=None):
+    """
+    Format the step blocks for steps ``start`` up to ``stop`` (exclusive).
+    
+    Steps are rebuilt one at a time from the StepLog deltas, so only the
+    output text (not a copy of the array per step) is held in memory.
+    
+    Args:
+        steps (StepLog): Steps recorded by insertion_sort_with_steps
+        start (int): First step to format
+        stop (int): Step to stop before
+        deadline (Deadline): Optional time budget, checked before every
+            step (each one formats the whole array)
+    
+    Returns:
+        list: Lines of the formatted step blocks
+    
+    Raises:
+        BudgetExceeded: If ``deadline`` passes while formatting
+    """
+    trace_lines = []
+    for idx, step in enumerate(steps.iter_range(start, stop), start):
+        if deadline is not None:
+            deadline.check()
+        trace_lines.extend(format_trace_step(idx, step))
+    return trace_lines
+
+
+def format_trace(steps, deadline=None):
+    """
+    Render a full step-by-step execution trace.
+    
+    Its size is O(steps x n); run_lab renders format_trace_tail instead.
+    
+    Args:
+        steps (StepLog): Steps recorded by insertion_sort_with_steps
+        deadline (Deadline): Optional time budget (see format_trace_range)
+    
+    Returns:
+        str: The formatted trace
+    """
+    trace_lines = format_trace_header()
+    trace_lines.extend(format_trace_range(steps, 0, len(steps), deadline))
+    return "\n".join(trace_lines)
+
+
+def format_trace_tail(steps, window=TRACE_STREAM_WINDOW, deadline=None):
+    """
+    Render the trace header followed by only the newest ``window`` steps.
+    
+    Used while streaming so the textbox payload stays bounded no matter how
+    many steps the sort has produced so far.
+    
+    Args:
+        steps (StepLog): Steps recorded so far
+        window (int): Maximum number of step blocks to include
+        deadline (Deadline): Optional time budget (see format_trace_range)
+    
+    Returns:
+        str: The formatted (possibly truncated) trace
+    """
+    start = max(0, len(steps) - window)
+    trace_lines = format_trace_header()
+    if start:
+        trace_lines.append(f"| ... {start:,} earlier steps omitted, showing the latest {window:,}")
+    trace_lines.extend(format_trace_range(steps, start, len(steps), deadline))
+    return "\n".join(trace_lines)
+
+
+def render_trace_page(steps, start=0, page_size=TRACE_PAGE_SIZE):
+    """
+    Render one page of the execution trace.
+    
+    Only the requested window is rebuilt from the StepLog (one keyframe seek
+    plus ``page_size`` deltas), so the cost depends on the page size rather
+    than the length of the trace.
+    
+    Args:
+        steps (StepLog): Steps kept for the current session (may be None)
+        start (int): First step on the page, clamped to the trace
+        page_size (int): Number of steps per page
+    
+    Returns:
+        tuple: (trace_text, start) with the clamped start step
+    """
+    if not steps:
+        return "", 0
+
+    total = len(steps)
+    page_size = max(1, int(page_size))
+    start = min(max(0, int(start)), total - 1)
+    stop = min(total, start + page_size)
+
+    trace_lines = format_trace_header()
+    trace_lines.append(f"| Showing steps {start:,}-{stop - 1:,} of {total:,}")
+    trace_lines.extend(format_trace_range(steps, start, stop))
+    return "\n".join(trace_lines), start
+
+
+def render_trace_page_for_i(steps, i, page_size=TRACE_PAGE_SIZE):
+    """
+    Render the trace page that starts at the first step of outer pass ``i``.
+    
+    Args:
+        steps (StepLog): Steps kept for the current session (may be None)
+        i (int): Outer loop index to jump to
+        page_size (int): Number of steps per page
+    
+    Returns:
+        tuple: (trace_text, start)
+    
+    Raises:
+        ValueError: If no step belongs to outer pass ``i``
+    """
+    if not steps:
+        return "", 0
+    try:
+        start = steps.first_step_for(int(i))
+    except ValueError:
+        raise ValueError(f"No step has i={int(i)}")
+    return render_trace_page(steps, start, page_size)
@@ -0,0 +1,398 @@
+"""
+Compact binary trace files: archive a StepLog and replay it later without
+re-running the sort.
+
+File layout (little-endian; "varint" means the LEB128 varints of
+sortlab.varint, signed ones zigzag-encoded):
+
+    header   b"SLTRACE\\0", u16 version, u8 codec, u64 n, u64 steps,
+             u32 block_steps, u32 metadata length + metadata JSON,
+             u64 length + compressed initial array (n signed varints)
+    blocks   one compressed block per ``block_steps`` steps; each holds the
+             array as it was before its first step (a keyframe; block 0 uses
+             the initial array instead) followed by one record per step:
+                 kind, i, j, comparisons/moves/accesses deltas,
+                 change count, then (index delta, value) per change
+             Counter and index deltas restart at every block.
+    index    u64 offset and u64 length of every block
+    trailer  u64 index offset, u32 block count, b"SLTREND\\0"
+
+Because every block is self-contained, TraceFile memory-maps the file and
+decodes only the block holding the requested step.
+"""
+
+import json
+import mmap
+import struct
+import zlib
+
+from .steps import StepLog, describe_step
+from .varint import read_svarint, read_uvarint, write_svarint, write_uvarint
+
+try:
+    import lzma
+except ImportError:  # Python built without liblzma
+    lzma = None
+
+TRACEFILE_EXTENSION = ".sltrace"
+TRACEFILE_VERSION = 1
+# Compression codecs, by name and by the id stored in the header
+TRACEFILE_CODECS = ("none", "zlib", "lzma")
+# Minimum steps per block; blocks also hold at least n steps so keyframes stay
+# a bounded fraction of the file
+TRACEFILE_BLOCK_STEPS = 4096
+
+_MAGIC = b"SLTRACE\0"
+_END_MAGIC = b"SLTREND\0"
+_HEADER = struct.Struct("<8sHBQQI")
+_LENGTH32 = struct.Struct("<I")
+_LENGTH64 = struct.Struct("<Q")
+_INDEX_ENTRY = struct.Struct("<QQ")
+_TRAILER = struct.Struct("<QI8s")
+# What decoding a damaged file can raise; TraceFile turns these into ValueError
+_DECODE_ERRORS = (ValueError, IndexError, EOFError, struct.error, zlib.error) + (
+    (lzma.LZMAError,) if lzma is not None else ())
+
+
+def _require_codec(codec):
+    if codec == "lzma" and lzma is None:
+        raise ValueError("the lzma codec is not available in this Python")
+
+
+def _compress(data, codec):
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    if codec == "lzma":
+        return lzma.compress(data)
+    return data
+
+
+def _decompress(data, codec):
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "lzma":
+        return lzma.decompress(data)
+    return bytes(data)
+
+
+def _pack_values(values):
+    out = bytearray()
+    for value in values:
+        write_svarint(out, value)
+    return out
+
+
+def write_trace(steps, path, codec="zlib", block_steps=None, metadata=None):
+    """
+    Write a StepLog to a binary trace file.
+
+    Args:
+        steps (StepLog): Recorded steps
+        path (str): Output file (conventionally ``*.sltrace``)
+        codec (str): "zlib" (default), "lzma" or "none"
+        block_steps (int): Steps per independently compressed block
+            (default: the larger of TRACEFILE_BLOCK_STEPS and n)
+        metadata (dict): Extra JSON-serializable fields to store (engine, ...)
+
+    Returns:
+        int: Bytes written
+
+    Raises:
+        ValueError: For an unknown or unavailable codec or an array of
+            non-integers
+    """
+    if codec not in TRACEFILE_CODECS:
+        raise ValueError(f"unknown trace codec '{codec}' (expected one of {', '.join(TRACEFILE_CODECS)})")
+    _require_codec(codec)
+    initial = steps.initial
+    if not all(isinstance(v, int) for v in initial):
+        raise ValueError("binary traces can only hold integer arrays")
+    n, count = len(initial), len(steps)
+    if block_steps is None:
+        block_steps = max(TRACEFILE_BLOCK_STEPS, n)
+    meta = json.dumps(dict(metadata or {}), separators=(",", ":")).encode()
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, TRACEFILE_VERSION, TRACEFILE_CODECS.index(codec), n, count,
+                             block_steps))
+        f.write(_LENGTH32.pack(len(meta)) + meta)
+        packed = _compress(bytes(_pack_values(initial)), codec)
+        f.write(_LENGTH64.pack(len(packed)) + packed)
+
+        index = []
+        a = list(initial)
+        for start in range(0, count, block_steps):
+            out = _pack_values(a) if start else bytearray()
+            comparisons = moves = accesses = 0
+            for kind, i, j, step_comparisons, step_moves, step_accesses, changes in steps.deltas(
+                    start, start + block_steps):
+                write_uvarint(out, kind)
+                write_uvarint(out, i)
+                write_svarint(out, j)
+                write_svarint(out, step_comparisons - comparisons)
+                write_svarint(out, step_moves - moves)
+                write_svarint(out, step_accesses - accesses)
+                comparisons, moves, accesses = step_comparisons, step_moves, step_accesses
+                write_uvarint(out, len(changes))
+                last = 0
+                for index_, value in changes:
+                    write_svarint(out, index_ - last)
+                    write_svarint(out, value)
+                    last = index_
+                    a[index_] = value
+            block = _compress(bytes(out), codec)
+            index.append((f.tell(), len(block)))
+            f.write(block)
+
+        index_offset = f.tell()
+        for offset, length in index:
+            f.write(_INDEX_ENTRY.pack(offset, length))
+        f.write(_TRAILER.pack(index_offset, len(index), _END_MAGIC))
+        return f.tell()
+
+
+class TraceFile:
+    """
+    Read-only, memory-mapped view of a binary trace file.
+
+    Behaves like a StepLog for reading: ``len``, indexing and slicing give
+    the same step dictionaries, and array_at / iter_range / deltas /
+    first_step_for work the same way, so the paged viewer, the playback and
+    write_trace take a TraceFile wherever they take a StepLog. Only the block holding a requested step is decompressed (the
+    most recent one is kept decoded), so seeking in a large archive costs
+    one block, not the whole file.
+
+    Args:
+        path (str): Trace file written by write_trace
+
+    Raises:
+        ValueError: If the file is not a valid trace file (reading a damaged
+            block later raises ValueError too)
+
+    Example:
+        >>> with TraceFile("run.sltrace") as trace:
+        ...     trace[12345]["array"]
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                raise ValueError(f"{path} is not a sortlab trace file") from None
+        try:
+            self._read_header()
+        except _DECODE_ERRORS as e:
+            self._mm.close()
+            raise ValueError(f"{path} is not a valid sortlab trace file ({e})") from None
+        self._cached_block = None
+
+    def _read_header(self):
+        mm = self._mm
+        magic, version, codec, self.n, self._count, self.block_steps = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC:
+            raise ValueError("bad magic")
+        if version != TRACEFILE_VERSION:
+            raise ValueError(f"unsupported version {version}")
+        if codec >= len(TRACEFILE_CODECS):
+            raise ValueError(f"unknown codec id {codec}")
+        self.codec = TRACEFILE_CODECS[codec]
+        _require_codec(self.codec)
+        if not self.block_steps:
+            raise ValueError("block size of 0 steps")
+        pos = _HEADER.size
+        (meta_length,) = _LENGTH32.unpack_from(mm, pos)
+        pos += _LENGTH32.size
+        self.metadata = json.loads(bytes(mm[pos:pos + meta_length]))
+        pos += meta_length
+        (initial_length,) = _LENGTH64.unpack_from(mm, pos)
+        pos += _LENGTH64.size
+        data = _decompress(mm[pos:pos + initial_length], self.codec)
+        self.initial, _ = self._unpack_values(data, 0, self.n)
+
+        index_offset, blocks, end = _TRAILER.unpack_from(mm, len(mm) - _TRAILER.size)
+        if end != _END_MAGIC:
+            raise ValueError("missing trailer (truncated file?)")
+        if blocks != -(-self._count // self.block_steps):
+            raise ValueError(f"{blocks} blocks indexed for {self._count} steps")
+        self._index = [_INDEX_ENTRY.unpack_from(mm, index_offset + k * _INDEX_ENTRY.size)
+                       for k in range(blocks)]
+
+    @staticmethod
+    def _unpack_values(data, pos, n):
+        values = []
+        for _ in range(n):
+            value, pos = read_svarint(data, pos)
+            values.append(value)
+        return values, pos
+
+    def close(self):
+        """Release the memory map."""
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _block(self, b):
+        """
+        Decode block ``b`` into (keyframe, records), keeping the last one cached.
+
+        Raises:
+            ValueError: If the block is damaged
+        """
+        if self._cached_block is not None and self._cached_block[0] == b:
+            return self._cached_block[1]
+        try:
+            block = self._decode_block(b)
+        except _DECODE_ERRORS as e:
+            raise ValueError(f"{self.path}: corrupt trace block {b} ({e})") from None
+        self._cached_block = (b, block)
+        return block
+
+    def _decode_block(self, b):
+        offset, length = self._index[b]
+        data = _decompress(self._mm[offset:offset + length], self.codec)
+        if b:
+            keyframe, pos = self._unpack_values(data, 0, self.n)
+        else:
+            keyframe, pos = list(self.initial), 0
+
+        records = []
+        comparisons = moves = accesses = 0
+        for _ in range(min(self.block_steps, self._count - b * self.block_steps)):
+            kind, pos = read_uvarint(data, pos)
+            i, pos = read_uvarint(data, pos)
+            j, pos = read_svarint(data, pos)
+            delta, pos = read_svarint(data, pos)
+            comparisons += delta
+            delta, pos = read_svarint(data, pos)
+            moves += delta
+            delta, pos = read_svarint(data, pos)
+            accesses += delta
+            change_count, pos = read_uvarint(data, pos)
+            changes = []
+            index = 0
+            for _ in range(change_count):
+                delta, pos = read_svarint(data, pos)
+                index += delta
+                if not 0 <= index < self.n:
+                    raise ValueError(f"change index {index} outside the array")
+                value, pos = read_svarint(data, pos)
+                changes.append((index, value))
+            records.append((kind, i, j, comparisons, moves, accesses, tuple(changes)))
+        return keyframe, records
+
+    def deltas(self, start=0, stop=None):
+        """Yield raw step records, as StepLog.deltas does."""
+        stop = self._count if stop is None else min(stop, self._count)
+        k = start
+        while k < stop:
+            b = k // self.block_steps
+            _, records = self._block(b)
+            base = b * self.block_steps
+            for record in records[k - base:stop - base]:
+                yield record
+            k = min(stop, base + self.block_steps)
+
+    def array_at(self, idx):
+        """Rebuild the array right after step ``idx`` from its block's keyframe."""
+        b = idx // self.block_steps
+        keyframe, records = self._block(b)
+        a = keyframe[:]
+        for record in records[:idx - b * self.block_steps + 1]:
+            for index, value in record[6]:
+                a[index] = value
+        return a
+
+    def iter_range(self, start, stop):
+        """Yield step dictionaries for steps ``start`` up to ``stop`` (exclusive)."""
+        stop = min(stop, self._count)
+        if start >= stop:
+            return
+        a = self.array_at(start)
+        k = start
+        for record in self.deltas(start, stop):
+            if k > start:
+                for index, value in record[6]:
+                    a[index] = value
+            yield self._step_dict(record, a)
+            k += 1
+
+    def __iter__(self):
+        return self.iter_range(0, self._count)
+
+    def first_step_for(self, i):
+        """
+        Return the index of the first step recorded with outer index ``i``.
+
+        Blocks are decoded in order until the step is found.
+
+        Raises:
+            ValueError: If no step was recorded with that outer index
+        """
+        for k, record in enumerate(self.deltas()):
+            if record[1] == i:
+                return k
+        raise ValueError(f"no step with i={i}")
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, stride = idx.indices(len(self))
+            if stride != 1:
+                return [self[k] for k in range(start, stop, stride)]
+            return list(self.iter_range(start, stop))
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("step index out of range")
+        b = idx // self.block_steps
+        _, records = self._block(b)
+        return self._step_dict(records[idx - b * self.block_steps], self.array_at(idx))
+
+    @staticmethod
+    def _step_dict(record, a):
+        kind, i, j, comparisons, moves, accesses, changes = record
+        description, active = describe_step(kind, j, changes)
+        return {
+            "array": a[:],
+            "i": i,
+            "j": j,
+            "comparisons": comparisons,
+            "moves": moves,
+            "accesses": accesses,
+            "description": description,
+            "active_indices": active,
+        }
+
+    def to_steplog(self):
+        """
+        Decode the whole trace back into an in-memory StepLog (for the paged
+        viewer and the animated playback).
+        """
+        steps = StepLog(self.initial)
+        a = list(self.initial)
+        for kind, i, j, comparisons, moves, accesses, changes in self.deltas():
+            for index, value in changes:
+                a[index] = value
+            steps.append(kind, i, j, comparisons, moves, accesses, changes, a)
+        return steps
+
+
+def load_trace(path):
+    """
+    Load a binary trace file fully into a StepLog.
+
+    Use TraceFile directly to seek in large files without decoding them.
+
+    Returns:
+        tuple: (steps, metadata)
+    """
+    with TraceFile(path) as trace:
+        return trace.to_steplog(), trace.metadata
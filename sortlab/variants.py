@@ -0,0 +1,308 @@
+"""
+Straight-line sort variants compiled with only the counters a caller asks for.
+
+The step engines in sortlab.engines count every comparison, move and access
+and yield a record per step, which is what a trace needs but more than a
+metrics run does. Each template below is the same algorithm as a plain
+function, with every counter update on its own line tagged ``#:<counter>``.
+compile_variant drops the lines of the counters that are off before
+compiling, so a variant with no counters is the bare sort with no counting
+left in its loops, and one with only "comparisons" pays for nothing else.
+"""
+
+# Counters a variant can be compiled with (the names of the counter probes)
+COUNTERS = ("comparisons", "moves", "accesses")
+# Keys sorted between deadline checks (a clock read per key would dominate)
+DEADLINE_CHECK_KEYS = 64
+
+_TAG = "  #:"
+
+# Linear insertion sort (also the typed engine, on an array('q')/('d') copy)
+_INSERTION = """
+def sort(arr, deadline):
+    a = copy(arr)
+    comparisons = 0  #:comparisons
+    moves = 0  #:moves
+    accesses = 0  #:accesses
+    for i in range(1, len(a)):
+        if deadline is not None and not i % DEADLINE_CHECK_KEYS:
+            deadline.check()
+        key = a[i]
+        j = i - 1
+        accesses += 1  #:accesses
+        while j >= 0:
+            comparisons += 1  #:comparisons
+            accesses += 1  #:accesses
+            if a[j] > key:
+                a[j + 1] = a[j]
+                moves += 1  #:moves
+                accesses += 1  #:accesses
+                j -= 1
+            else:
+                break
+        a[j + 1] = key
+        moves += 1  #:moves
+        accesses += 1  #:accesses
+    return a, comparisons, moves, accesses
+"""
+
+# Binary and block-move insertion sort: their counters are the same, so one
+# variant moves each block with a slice assignment for both
+_BINARY = """
+def sort(arr, deadline):
+    a = copy(arr)
+    comparisons = 0  #:comparisons
+    moves = 0  #:moves
+    accesses = 0  #:accesses
+    for i in range(1, len(a)):
+        if deadline is not None and not i % DEADLINE_CHECK_KEYS:
+            deadline.check()
+        key = a[i]
+        accesses += 1  #:accesses
+        lo, hi = 0, i
+        while lo < hi:
+            mid = (lo + hi) // 2
+            comparisons += 1  #:comparisons
+            accesses += 1  #:accesses
+            if a[mid] > key:
+                hi = mid
+            else:
+                lo = mid + 1
+        a[lo + 1:i + 1] = a[lo:i]
+        a[lo] = key
+        moves += i - lo + 1  #:moves
+        accesses += 2 * (i - lo) + 1  #:accesses
+    return a, comparisons, moves, accesses
+"""
+
+_SHELL = """
+def sort(arr, deadline):
+    a = copy(arr)
+    n = len(a)
+    comparisons = 0  #:comparisons
+    moves = 0  #:moves
+    accesses = 0  #:accesses
+    for gap in gaps(n):
+        for i in range(gap, n):
+            if deadline is not None and not i % DEADLINE_CHECK_KEYS:
+                deadline.check()
+            key = a[i]
+            j = i - gap
+            accesses += 1  #:accesses
+            while j >= 0:
+                comparisons += 1  #:comparisons
+                accesses += 1  #:accesses
+                if a[j] > key:
+                    a[j + gap] = a[j]
+                    moves += 1  #:moves
+                    accesses += 1  #:accesses
+                    j -= gap
+                else:
+                    break
+            a[j + gap] = key
+            moves += 1  #:moves
+            accesses += 1  #:accesses
+    return a, comparisons, moves, accesses
+"""
+
+# The hybrid engine (see iter_hybrid_sort for the algorithm and its counting)
+_HYBRID = """
+def sort(arr, deadline):
+    a = copy(arr)
+    n = len(a)
+    strategy = analyze_presortedness(a)["strategy"]
+    comparisons = max(n - 1, 0)  #:comparisons
+    moves = 0  #:moves
+    accesses = n  #:accesses
+
+    def insert_range(lo, start, stop, max_shifts=None):
+        nonlocal comparisons  #:comparisons
+        nonlocal moves  #:moves
+        nonlocal accesses  #:accesses
+        shifts = 0
+        for i in range(start, stop):
+            if deadline is not None and not i % DEADLINE_CHECK_KEYS:
+                deadline.check()
+            key = a[i]
+            j = i - 1
+            accesses += 1  #:accesses
+            while j >= lo:
+                comparisons += 1  #:comparisons
+                accesses += 1  #:accesses
+                if a[j] > key:
+                    a[j + 1] = a[j]
+                    moves += 1  #:moves
+                    accesses += 1  #:accesses
+                    j -= 1
+                else:
+                    break
+            a[j + 1] = key
+            moves += 1  #:moves
+            accesses += 1  #:accesses
+            shifts += i - j - 1
+            if max_shifts is not None and shifts > max_shifts:
+                return i + 1
+        return stop
+
+    def search(lo, hi, value, right):
+        nonlocal comparisons  #:comparisons
+        nonlocal accesses  #:accesses
+        while lo < hi:
+            mid = (lo + hi) // 2
+            comparisons += 1  #:comparisons
+            accesses += 1  #:accesses
+            if a[mid] > value or (not right and a[mid] == value):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def merge(lo, mid, hi):
+        nonlocal comparisons  #:comparisons
+        nonlocal moves  #:moves
+        nonlocal accesses  #:accesses
+        if deadline is not None:
+            deadline.check()
+        comparisons += 1  #:comparisons
+        accesses += 2  #:accesses
+        if a[mid - 1] <= a[mid]:
+            return
+        lo = search(lo, mid, a[mid], True)
+        hi = search(mid, hi, a[mid - 1], False)
+        left = a[lo:mid]
+        accesses += len(left)  #:accesses
+        i, j, k = 0, mid, lo
+        while i < len(left) and j < hi:
+            comparisons += 1  #:comparisons
+            accesses += 1  #:accesses
+            if a[j] < left[i]:
+                a[k] = a[j]
+                j += 1
+            else:
+                a[k] = left[i]
+                i += 1
+            k += 1
+        a[k:j] = left[i:]
+        moves += j - lo  #:moves
+        accesses += j - lo  #:accesses
+
+    if strategy == HYBRID_INSERTION:
+        if insert_range(0, 1, n, HYBRID_SHIFT_BUDGET * n) == n:
+            return a, comparisons, moves, accesses
+        comparisons += n - 1  #:comparisons
+        accesses += n  #:accesses
+    elif strategy != HYBRID_RUN_MERGE:
+        return a, comparisons, moves, accesses
+
+    stack = []
+    runs = find_runs(a)
+    r = 0
+    while r < len(runs):
+        start, stop, descending = runs[r]
+        r += 1
+        if descending:
+            a[start:stop] = a[start:stop][::-1]
+            moves += stop - start  #:moves
+            accesses += 2 * (stop - start)  #:accesses
+        end = stop
+        while end - start < min_run and r < len(runs):
+            end = min(runs[r][1], start + min_run)
+            if runs[r][1] > end:
+                runs[r] = (end, runs[r][1], runs[r][2])
+            else:
+                r += 1
+        if end > stop:
+            insert_range(start, stop, end)
+        stack.append((start, end - start))
+
+        while len(stack) > 1:
+            k = len(stack) - 2
+            lengths = [length for _, length in stack]
+            if ((k > 0 and lengths[k - 1] <= lengths[k] + lengths[k + 1])
+                    or (k > 1 and lengths[k - 2] <= lengths[k - 1] + lengths[k])):
+                if lengths[k - 1] < lengths[k + 1]:
+                    k -= 1
+            elif lengths[k] > lengths[k + 1]:
+                break
+            (lo, left_len), (mid, right_len) = stack[k], stack[k + 1]
+            merge(lo, mid, mid + right_len)
+            stack[k:k + 2] = [(lo, left_len + right_len)]
+
+    while len(stack) > 1:
+        (lo, left_len), (mid, right_len) = stack[-2], stack[-1]
+        merge(lo, mid, mid + right_len)
+        stack[-2:] = [(lo, left_len + right_len)]
+    return a, comparisons, moves, accesses
+"""
+
+# Template name -> source
+VARIANT_TEMPLATES = {
+    "insertion": _INSERTION,
+    "binary": _BINARY,
+    "shell": _SHELL,
+    "hybrid": _HYBRID,
+}
+
+
+def variant_source(template, counters=()):
+    """
+    Source of a variant with only the lines of ``counters`` left in.
+
+    Args:
+        template (str): Key in VARIANT_TEMPLATES
+        counters (iterable): Names from COUNTERS to keep
+
+    Returns:
+        str: Python source defining ``sort(arr, deadline)``
+
+    Raises:
+        ValueError: For an unknown template or counter name
+    """
+    counters = frozenset(counters)
+    unknown = counters.difference(COUNTERS)
+    if unknown:
+        raise ValueError(f"unknown counter(s) {', '.join(sorted(unknown))} "
+                         f"(expected {', '.join(COUNTERS)})")
+    try:
+        source = VARIANT_TEMPLATES[template]
+    except KeyError:
+        raise ValueError(f"unknown sort variant '{template}'") from None
+
+    lines = []
+    for line in source.splitlines():
+        code, tagged, counter = line.partition(_TAG)
+        if tagged:
+            if counter not in counters:
+                continue
+            line = code
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def compile_variant(template, counters=(), **bindings):
+    """
+    Compile a sort variant counting only ``counters``.
+
+    Counters that are off are never assigned, so the variant returns None
+    for them (they read the module-level None in its namespace).
+
+    Args:
+        template (str): Key in VARIANT_TEMPLATES
+        counters (iterable): Names from COUNTERS to count
+        **bindings: Names the template uses besides builtins: ``copy`` (makes
+            the working array) for all, ``gaps`` for "shell", and the hybrid
+            constants and helpers for "hybrid"
+
+    Returns:
+        callable: ``sort(arr, deadline)`` returning (sorted_array,
+            comparisons, moves, accesses); ``deadline`` may be None
+
+    Raises:
+        ValueError: For an unknown template or counter name
+    """
+    source = variant_source(template, counters)
+    label = ",".join(c for c in COUNTERS if c in counters) or "uninstrumented"
+    namespace = dict(bindings, DEADLINE_CHECK_KEYS=DEADLINE_CHECK_KEYS,
+                     comparisons=None, moves=None, accesses=None)
+    exec(compile(source, f"<sortlab {template} variant: {label}>", "exec"), namespace)
+    return namespace["sort"]
@@ -0,0 +1,76 @@
+"""
+LEB128 variable-length integers, shared by the playback stream and the binary
+trace format.
+
+Unsigned values use 7 bits per byte (high bit set on every byte but the
+last); signed values are zigzag-mapped first (0, -1, 1, -2, ... -> 0, 1, 2,
+3, ...) so small negative numbers stay short too.
+"""
+
+
+def zigzag(value):
+    """Map a signed integer to an unsigned one (0, -1, 1, -2 -> 0, 1, 2, 3)."""
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value):
+    """Inverse of zigzag."""
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def write_uvarint(out, value):
+    """
+    Append an unsigned varint to a bytearray.
+
+    Args:
+        out (bytearray): Destination buffer
+        value (int): Non-negative integer (any size)
+
+    Raises:
+        ValueError: If ``value`` is negative
+    """
+    if value < 0:
+        raise ValueError(f"uvarint cannot encode negative value {value}")
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def write_svarint(out, value):
+    """Append a signed (zigzag) varint to a bytearray."""
+    write_uvarint(out, zigzag(value))
+
+
+def read_uvarint(buf, pos):
+    """
+    Decode an unsigned varint.
+
+    Args:
+        buf (bytes-like): Buffer to read from (bytes, bytearray, memoryview, mmap)
+        pos (int): Offset of the first byte
+
+    Returns:
+        tuple: (value, next_pos)
+
+    Raises:
+        ValueError: If the buffer ends in the middle of a varint
+    """
+    result = 0
+    shift = 0
+    try:
+        while True:
+            byte = buf[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result, pos
+            shift += 7
+    except IndexError:
+        raise ValueError("truncated varint") from None
+
+
+def read_svarint(buf, pos):
+    """Decode a signed (zigzag) varint; returns (value, next_pos)."""
+    value, pos = read_uvarint(buf, pos)
+    return unzigzag(value), pos
@@ -0,0 +1,112 @@
+"""
+Long-lived worker processes shared by every request: comparison runs and
+batch chunks check out single-process executors from one WorkerPool instead
+of starting a process pool per call.
+"""
+
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import RawValue
+
+# Idle single-process executors kept between requests (more are started while
+# every kept one is busy, and shut down again when they come back)
+WORKER_POOL_SIZE = int(os.environ.get("SORTLAB_WORKER_POOL_SIZE", 4))
+
+
+def _record_worker_pid(pid):
+    """Executor initializer: publish the worker's pid so it can be killed later."""
+    pid.value = os.getpid()
+
+
+class WorkerSlot:
+    """
+    One single-process executor and the pid of its worker.
+
+    ProcessPoolExecutor cannot cancel a task that has already started; a slot
+    has exactly one worker, so killing it after a timeout reclaims only that
+    run and leaves every other slot (and request) untouched.
+    """
+
+    def __init__(self):
+        self.pid = RawValue("q", 0)
+        self.executor = ProcessPoolExecutor(
+            max_workers=1, initializer=_record_worker_pid, initargs=(self.pid,)
+        )
+
+    def submit(self, fn, *args):
+        """Queue ``fn(*args)`` on this slot's worker; returns its Future."""
+        return self.executor.submit(fn, *args)
+
+    def kill(self):
+        """Stop the worker (even mid-task) and shut the executor down without waiting."""
+        if self.pid.value:
+            try:
+                os.kill(self.pid.value, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass  # Already gone
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class WorkerPool:
+    """
+    A small pool of WorkerSlots, started lazily and reused across requests.
+
+    Callers acquire slots, submit work, and hand every slot back with
+    finish(), which releases it once its work completed and discards it when
+    it is still busy (timed out or cancelled) or broken. Only discarded slots
+    are replaced, so a timeout never costs other requests their warm workers.
+
+    Args:
+        size (int): Idle slots kept for reuse
+    """
+
+    def __init__(self, size=WORKER_POOL_SIZE):
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Check out an idle slot, starting a new one if none is free."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return WorkerSlot()
+
+    def release(self, slot):
+        """Return a slot whose work has finished."""
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(slot)
+                return
+        slot.executor.shutdown(wait=False)
+
+    def discard(self, slot):
+        """Kill a busy or broken slot; a fresh one is started on a later acquire()."""
+        slot.kill()
+
+    def finish(self, slot, futures):
+        """
+        Hand back a slot once the caller is done with the ``futures`` it submitted.
+
+        The slot is released if all of them completed, and discarded if any is
+        still running (timed out or abandoned) or its worker died.
+        """
+        if all(future.done() and not isinstance(future.exception(), BrokenProcessPool)
+               for future in futures):
+            self.release(slot)
+        else:
+            self.discard(slot)
+
+    def shutdown(self):
+        """Stop every idle slot (busy ones are stopped when they are released)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for slot in idle:
+            slot.executor.shutdown(wait=False)
+
+
+# The pool used by start_comparisons and run_batch
+worker_pool = WorkerPool()
@@ -0,0 +1,58 @@
+"""
+Batch runs skip bad rows and rows past the time budget instead of failing.
+"""
+
+import io
+import json
+
+import pytest
+
+from sortlab import Deadline, InputError, RequestLimits, batch, run_batch, sort_metrics
+from sortlab.cli import main
+
+
+def test_mixed_valid_and_invalid_rows():
+    result = run_batch([[3, 1, 2], "4 x", [], {"id": "ok", "array": "2, 1"}, {"array": 5}, [1.5]])
+
+    assert result.ids == ["0", "ok"]
+    assert [row_id for row_id, _ in result.errors] == ["1", "2", "4", "5"]
+    assert list(result.columns["comparisons"]) == [sort_metrics([3, 1, 2], "linear")[1],
+                                                   sort_metrics([2, 1], "linear")[1]]
+
+
+def test_no_valid_rows():
+    with pytest.raises(InputError, match="4 skipped"):
+        run_batch(["x", [], [True], "1 2 y"])
+
+
+def test_cli_stdin_keeps_going_past_bad_lines(monkeypatch, capsys):
+    lines = '[3, 1, 2]\n{"id": "obj", "array": [2, 1]}\n[1, 2\n\n4 3\nnope\n'
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(lines.encode())))
+
+    assert main(["--batch"]) == 1
+
+    out, err = capsys.readouterr()
+    assert [json.loads(row)["id"] for row in out.splitlines()] == ["1", "obj", "5"]
+    assert "-: 3: invalid JSON" in err
+    assert "-: 6: 'nope' is not a valid integer" in err
+
+
+@pytest.mark.parametrize("reports", [False, True])
+def test_rows_past_the_deadline_are_skipped(reports):
+    result = run_batch([[3, 1, 2], [2, 1], [1]], reports=reports,
+                       limits=RequestLimits(time_budget=0))
+
+    assert len(result) == 0
+    assert [row_id for row_id, _ in result.errors] == ["0", "1", "2"]
+    assert "time budget" in result.errors[0][1]
+
+
+def test_pool_chunks_past_the_deadline_are_skipped():
+    items = [(str(k), list(range(3_000, 0, -1)), True) for k in range(3)]
+    chunks = list(batch._chunks(items, 3_000))
+    result = batch.BatchResult()
+
+    batch._run_chunks_in_pool(chunks, "linear", "classic", Deadline(0), result)
+
+    assert len(result) == 0
+    assert [row_id for row_id, _ in result.errors] == ["0", "1", "2"]
@@ -0,0 +1,23 @@
+"""
+The dashboard names the selected engine wherever it reports that engine winning.
+"""
+
+import pytest
+
+from sortlab import SORT_ENGINES, get_engine, render_dashboard
+
+
+@pytest.mark.parametrize("engine", list(SORT_ENGINES))
+def test_best_column_names_the_selected_engine(engine):
+    name = get_engine(engine)[1]
+
+    single = render_dashboard([3, 1, 2], 2, 2, 8, name, chart=False)
+    assert f'<td class="sl-best">{name}</td>' in single
+
+    compared = render_dashboard([3, 1, 2], 1, 1, 4, name, show_comparisons=True,
+                                bubble_comps=3, bubble_moves=3, quick_comps=2, quick_moves=2,
+                                chart=False)
+    assert f'<td class="sl-best">{name}</td>' in compared
+    assert f"<strong>{name} wins on comparisons</strong>" in compared
+    if name != "Insertion Sort":
+        assert "Insertion" not in compared.replace(name, "")
@@ -0,0 +1,122 @@
+"""
+External sort: merged output is sorted, chunk edges are handled, temp files go away.
+"""
+
+import random
+from array import array
+
+import pytest
+
+from sortlab import ENGINE_LINEAR, EXTERNAL_INSERTION_MAX, engines, external_sort, sort_metrics
+
+
+def _values(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.randint(-10**12, 10**12) for _ in range(n)]
+
+
+def _read_output(path):
+    return array("q", path.read_bytes()).tolist()
+
+
+@pytest.mark.parametrize("n, chunk_elements, fan_in", [
+    (50, 7, 2),      # final partial chunk of 1, several merge passes
+    (48, 12, 4),     # chunks end exactly on the last value, one merge
+    (5, 100, 2),     # a single run is moved into place
+    (300, 100, 64),  # chunks above EXTERNAL_INSERTION_MAX use the engine
+])
+def test_merged_output_is_sorted(tmp_path, n, chunk_elements, fan_in):
+    values = _values(n)
+    source = tmp_path / "input.txt"
+    source.write_text("\n".join(map(str, values)))
+    output = tmp_path / "sorted.i64"
+
+    stats = external_sort(str(source), str(output), chunk_elements, fan_in)
+
+    assert _read_output(output) == sorted(values)
+    assert stats["n"] == n
+    assert stats["runs"] == -(-n // chunk_elements)
+    chunks = [values[k:k + chunk_elements] for k in range(0, n, chunk_elements)]
+    assert stats["chunk_sort"]["comparisons"] == sum(
+        sort_metrics(chunk, ENGINE_LINEAR if len(chunk) <= EXTERNAL_INSERTION_MAX else "hybrid")[1]
+        for chunk in chunks
+    )
+
+
+def test_text_values_split_across_reads(tmp_path):
+    # Reads are chunk_elements * 8 characters, so 13-digit values straddle them
+    values = _values(40, seed=1)
+    source = tmp_path / "input.txt"
+    source.write_text(", ".join(map(str, values)))
+    output = tmp_path / "sorted.i64"
+
+    external_sort(str(source), str(output), chunk_elements=3, fan_in=3)
+
+    assert _read_output(output) == sorted(values)
+
+
+def test_raw_int64_input(tmp_path):
+    values = _values(1000, seed=2)
+    source = tmp_path / "input.i64"
+    source.write_bytes(array("q", values).tobytes())
+    output = tmp_path / "sorted.i64"
+
+    stats = external_sort(str(source), str(output), chunk_elements=128, fan_in=3)
+
+    assert _read_output(output) == sorted(values)
+    assert stats["io"]["input_bytes"] == 8 * len(values)
+
+
+def test_uncounted_chunk_sorts(tmp_path):
+    values = _values(200, seed=3)
+    source = tmp_path / "input.txt"
+    source.write_text(" ".join(map(str, values)))
+    output = tmp_path / "sorted.i64"
+
+    stats = external_sort(str(source), str(output), chunk_elements=90, counters=())
+
+    assert _read_output(output) == sorted(values)
+    assert stats["chunk_sort"] == {"comparisons": None, "moves": None, "accesses": None}
+    assert stats["total"]["comparisons"] is None
+    assert stats["merge"]["moves"] == len(values)
+
+
+def test_temp_files_are_removed(tmp_path):
+    source = tmp_path / "input.txt"
+    source.write_text(" ".join(map(str, _values(100))))
+    work = tmp_path / "work"
+    work.mkdir()
+
+    external_sort(str(source), str(tmp_path / "sorted.i64"), chunk_elements=9, fan_in=2,
+                  tmp_dir=str(work))
+
+    assert list(work.iterdir()) == []
+
+
+def test_temp_files_are_removed_on_error(tmp_path):
+    source = tmp_path / "input.txt"
+    source.write_text(" ".join(map(str, _values(100))) + " oops")
+    work = tmp_path / "work"
+    work.mkdir()
+
+    with pytest.raises(ValueError, match="oops"):
+        external_sort(str(source), None, chunk_elements=9, tmp_dir=str(work))
+
+    assert list(work.iterdir()) == []
+
+
+def test_chunks_never_run_the_step_engines(tmp_path, monkeypatch):
+    get_engine = engines.get_engine
+
+    def no_steps(*args):
+        raise AssertionError("a chunk ran through the step-recording engine")
+
+    monkeypatch.setattr(engines, "get_engine", lambda engine: (*get_engine(engine)[:2], no_steps))
+    values = _values(500, seed=4)
+    source = tmp_path / "input.txt"
+    source.write_text(" ".join(map(str, values)))
+    output = tmp_path / "sorted.i64"
+
+    external_sort(str(source), str(output), chunk_elements=200)
+
+    assert _read_output(output) == sorted(values)
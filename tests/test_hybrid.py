@@ -0,0 +1,65 @@
+"""
+The hybrid engine stays correct and subquadratic when its sampled presortedness
+profile underestimates the disorder.
+"""
+
+import random
+
+import pytest
+
+from sortlab import (
+    HYBRID_INSERTION,
+    HYBRID_SHIFT_BUDGET,
+    INVERSION_SAMPLE_SIZE,
+    analyze_presortedness,
+    sort_metrics,
+    sort_with_steps,
+)
+
+
+def _hidden_disorder(n):
+    """Sorted at the sampled positions; the rest swaps halves the sample never sees."""
+    step = n / INVERSION_SAMPLE_SIZE
+    sampled = {int(k * step) for k in range(INVERSION_SAMPLE_SIZE)}
+    return [p * 10 if p in sampled else (10**9 + p if p < n // 2 else -10**9 + p)
+            for p in range(n)]
+
+
+def test_sampled_underestimate_falls_back_to_run_merge():
+    n = 50_000
+    arr = _hidden_disorder(n)
+    assert analyze_presortedness(arr)["strategy"] == HYBRID_INSERTION
+
+    out, comparisons, moves, _ = sort_metrics(arr, "hybrid")
+
+    assert out == sorted(arr)
+    # Insertion sort would need about (n / 2) ** 2 shifts here
+    assert moves < (HYBRID_SHIFT_BUDGET + 1) * n + 2 * n * n.bit_length()
+    assert comparisons < 4 * n * n.bit_length()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nearly_sorted_inputs(seed):
+    rng = random.Random(seed)
+    n = rng.choice([0, 1, 2, 100, INVERSION_SAMPLE_SIZE + 500])
+    arr = sorted(rng.randint(0, 50) for _ in range(n))
+    for _ in range(rng.randint(0, 5)):
+        if n > 1:
+            i, j = rng.randrange(n), rng.randrange(n)
+            arr[i], arr[j] = arr[j], arr[i]
+
+    out, comparisons, moves, accesses = sort_metrics(arr, "hybrid")
+    traced, steps, *counters = sort_with_steps(arr, "hybrid")
+
+    assert out == traced == sorted(arr)
+    assert counters == [comparisons, moves, accesses]
+
+
+def test_trace_of_fallback_matches_metrics():
+    arr = _hidden_disorder(INVERSION_SAMPLE_SIZE * 3)
+    out, *counters = sort_metrics(arr, "hybrid")
+    traced, steps, *traced_counters = sort_with_steps(arr, "hybrid")
+
+    assert out == traced == sorted(arr)
+    assert traced_counters == counters
+    assert steps.array_at(len(steps) - 1) == out
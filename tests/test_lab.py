@@ -0,0 +1,118 @@
+"""
+run_lab renders only the trace text its caller needs.
+"""
+
+import json
+from array import array
+
+import pytest
+
+from sortlab import (
+    MODE_TRACE,
+    NO_TRACE_TEXT,
+    TRACE_STREAM_MAX_CELLS,
+    TRACE_STREAM_WINDOW,
+    BudgetExceeded,
+    Deadline,
+    InputError,
+    build_report,
+    format_trace_tail,
+    lab,
+    run_lab,
+    sort_with_steps,
+    validate_input,
+)
+from sortlab.cli import analyze
+
+TEXT = ", ".join(str(v) for v in range(60, 0, -1))
+
+
+def _no_trace_text(*args, **kwargs):
+    raise AssertionError("the trace text was rendered")
+
+
+def test_trace_text_off_skips_rendering(monkeypatch):
+    monkeypatch.setattr(lab, "format_trace_tail", _no_trace_text)
+
+    _, trace, _, json_data, _ = run_lab(TEXT, False, None, MODE_TRACE, trace_text=False)
+
+    assert trace == NO_TRACE_TEXT
+    assert json.loads(json_data)["trace"]["steps"] > 0
+
+
+def test_cli_analyze_does_not_render_the_trace(monkeypatch):
+    monkeypatch.setattr(lab, "format_trace_tail", _no_trace_text)
+
+    data = analyze(text=TEXT, mode=MODE_TRACE)
+
+    assert data["sorted"] == sorted(data["original"])
+    assert data["trace"]["steps"] > 0
+
+
+@pytest.mark.parametrize("trace_text", [True, False])
+def test_trace_text_is_part_of_the_cache_key(trace_text):
+    _, trace, _, _, _ = run_lab("3, 1, 2", False, None, MODE_TRACE, trace_text=trace_text)
+
+    assert (trace == NO_TRACE_TEXT) is not trace_text
+
+
+def test_trace_text_shows_only_the_newest_steps():
+    _, trace, _, json_data, _ = run_lab(TEXT, False, None, MODE_TRACE)
+    steps = json.loads(json_data)["trace"]["steps"]
+    window = min(TRACE_STREAM_WINDOW, TRACE_STREAM_MAX_CELLS // 60)
+
+    assert steps > window
+    assert f"{steps - window:,} earlier steps omitted" in trace
+    assert trace.count("+-- STEP") == window
+
+
+def test_trace_formatting_checks_the_deadline():
+    _, steps, *_ = sort_with_steps([int(v) for v in TEXT.split(", ")])
+
+    with pytest.raises(BudgetExceeded):
+        format_trace_tail(steps, deadline=Deadline(0))
+
+
+def test_run_lab_passes_its_deadline_to_the_trace(monkeypatch):
+    seen = []
+
+    def tail(steps, window, deadline=None):
+        seen.append(deadline)
+        return ""
+
+    monkeypatch.setattr(lab, "format_trace_tail", tail)
+    deadline = Deadline(60)
+    lab.run_lab_uncached([3, 1, 2], False, MODE_TRACE, "linear", None, deadline=deadline)
+
+    assert seen == [deadline]
+
+
+def test_validate_input_passes_the_dtype_through(tmp_path):
+    raw = tmp_path / "prices.f64"
+    raw.write_bytes(array("d", [2.5, -1.0, 3.0]).tobytes())
+    text = tmp_path / "prices.txt"
+    text.write_text("2.5, 1")
+
+    assert validate_input(None, str(raw), "auto") == [2.5, -1.0, 3.0]
+    assert validate_input(None, str(text), float) == [2.5, 1.0]
+    assert validate_input("3, 1", None, "auto") == [3, 1]
+    with pytest.raises(InputError, match="float64"):
+        validate_input(None, str(raw))
+    with pytest.raises(InputError, match="valid integer"):
+        validate_input(None, str(text))
+
+
+def test_run_lab_sorts_floats_with_dtype_auto():
+    data = json.loads(run_lab("2.5, 1, -3", False, None, MODE_TRACE, dtype="auto")[3])
+
+    assert data["sorted"] == [-3.0, 1.0, 2.5]
+
+
+@pytest.mark.parametrize("typecode, values", [("q", [3, -1, 2]), ("d", [2.5, float("inf"), -1.0])])
+def test_build_report_formats_typed_buffers_like_lists(typecode, values):
+    ordered = sorted(values)
+    as_list = build_report(values, ordered, None, 1, 2, 3, False)
+    typed = build_report(array(typecode, values), array(typecode, ordered), None, 1, 2, 3, False)
+
+    assert typed[0] == as_list[0]
+    assert json.loads(typed[2]) == json.loads(as_list[2])
@@ -0,0 +1,39 @@
+"""
+Cross-check the closed-form insertion_sort_metrics against the step-tracking
+insertion_sort_with_steps.
+"""
+
+import random
+
+import pytest
+
+from sortlab import insertion_sort_metrics, insertion_sort_with_steps
+
+
+def _inputs():
+    rng = random.Random(5)
+    yield "empty", []
+    yield "single", [7]
+    yield "pair-sorted", [1, 2]
+    yield "pair-reversed", [2, 1]
+    for n in (10, 100, 500):
+        yield f"random-{n}", [rng.randint(-1000, 1000) for _ in range(n)]
+        yield f"sorted-{n}", list(range(n))
+        yield f"reversed-{n}", list(range(n, 0, -1))
+        yield f"duplicates-{n}", [rng.randint(0, 3) for _ in range(n)]
+        yield f"all-equal-{n}", [4] * n
+
+
+@pytest.mark.parametrize("name, arr", list(_inputs()), ids=lambda v: v if isinstance(v, str) else "")
+def test_metrics_match_step_tracking(name, arr):
+    tracked, steps, comparisons, moves, accesses = insertion_sort_with_steps(arr)
+    sorted_arr, fast_comparisons, fast_moves, fast_accesses = insertion_sort_metrics(arr)
+
+    assert list(sorted_arr) == list(tracked) == sorted(arr)
+    assert (fast_comparisons, fast_moves, fast_accesses) == (comparisons, moves, accesses)
+
+
+def test_metrics_do_not_modify_input():
+    arr = [3, 1, 2]
+    insertion_sort_metrics(arr)
+    assert arr == [3, 1, 2]
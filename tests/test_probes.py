@@ -0,0 +1,84 @@
+"""
+Counter probes select what a metrics run counts, and with none the engine
+runs without any counting in its loops.
+"""
+
+import json
+import random
+from itertools import combinations
+
+import pytest
+
+from sortlab import (
+    COUNTERS,
+    MODE_METRICS,
+    MODE_TRACE,
+    SORT_ENGINES,
+    compile_sort,
+    run_lab,
+    sort_metrics,
+    sort_with_steps,
+)
+
+TEXT = "5, 3, 8, 1, 9, 2, 7, 7, 0"
+ENGINES = list(SORT_ENGINES)
+COUNTER_SETS = [subset for k in range(len(COUNTERS) + 1) for subset in combinations(COUNTERS, k)]
+
+
+def _code_objects(code):
+    yield code
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            yield from _code_objects(const)
+
+
+def _inputs():
+    rng = random.Random(7)
+    return [[], [1], list(range(40)), list(range(40, 0, -1)),
+            [rng.randint(0, 9) for _ in range(200)], [rng.randint(-999, 999) for _ in range(300)]]
+
+
+@pytest.mark.parametrize("counters", COUNTER_SETS)
+@pytest.mark.parametrize("engine", ENGINES)
+def test_variants_count_only_enabled_counters(engine, counters):
+    for arr in _inputs():
+        _, _, *expected = sort_with_steps(arr, engine)
+
+        out, *got = sort_metrics(arr, engine, counters=counters)
+
+        assert list(out) == sorted(arr)
+        for name, want, value in zip(COUNTERS, expected, got):
+            assert value == (want if name in counters else None), (name, arr)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_probe_off_variant_has_no_counting(engine):
+    sort = compile_sort(engine, ())
+
+    for code in _code_objects(sort.__code__):
+        assigned = set(code.co_varnames) | set(code.co_cellvars) | set(code.co_freevars)
+        assert not assigned.intersection(COUNTERS), code.co_name
+    assert sort([3, 1, 2], None)[1:] == (None, None, None)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_counter_probes_narrow_the_metrics_run(engine):
+    _, _, _, json_data, _ = run_lab(TEXT, False, None, MODE_METRICS, engine,
+                                    probes=("comparisons",))
+    data = json.loads(json_data)
+    _, _, comparisons, _, _ = sort_with_steps([int(v) for v in TEXT.split(",")], engine)
+
+    assert data["insertion"] == {"comparisons": comparisons, "moves": None, "accesses": None}
+    assert data["instrumentation"]["counters"] == ["comparisons"]
+
+
+@pytest.mark.parametrize("mode", [MODE_METRICS, MODE_TRACE])
+@pytest.mark.parametrize("engine", ENGINES)
+def test_timestamps_hook_every_step(engine, mode):
+    _, _, _, json_data, _ = run_lab(TEXT, False, None, mode, engine, probes=("timestamps",))
+    data = json.loads(json_data)
+    arr = [int(v) for v in TEXT.split(",")]
+    _, steps, *counters = sort_with_steps(arr, engine)
+
+    assert data["instrumentation"]["timestamps"]["steps"] == len(steps)
+    assert list(data["insertion"].values()) == counters
@@ -0,0 +1,118 @@
+"""
+Record sorting is stable with every engine and leaves the records untouched.
+"""
+
+import random
+
+import pytest
+
+from sortlab import (
+    BUBBLE_CLASSIC,
+    SORT_ENGINES,
+    bubble_sort_comparison,
+    decorate,
+    parse_key_spec,
+    parse_records,
+    quick_sort_comparison,
+    sort_records,
+    undecorate,
+    write_records,
+)
+
+ENGINES = list(SORT_ENGINES)
+
+
+def _people(n=80, seed=0):
+    rng = random.Random(seed)
+    return [{"id": k, "city": rng.choice("ABC"), "age": rng.randint(20, 25)} for k in range(n)]
+
+
+def _expected(records, key, reverse=False):
+    # sorted() is stable with reverse=True as well
+    return sorted(records, key=key, reverse=reverse)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stable_on_equal_keys(engine):
+    people = _people()
+
+    result, *_ = sort_records(people, fields=parse_key_spec("city"), engine=engine)
+
+    assert result == _expected(people, lambda p: p["city"])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_reverse_keeps_equal_key_order(engine):
+    people = _people()
+
+    result, *_ = sort_records(people, key=lambda p: p["age"], reverse=True, engine=engine)
+
+    assert result == _expected(people, lambda p: p["age"], reverse=True)
+    ages = [p["age"] for p in result]
+    for a, b in zip(result, result[1:]):
+        if a["age"] == b["age"]:
+            assert a["id"] < b["id"]
+    assert ages == sorted(ages, reverse=True)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_multi_field_descending(engine):
+    people = _people()
+
+    result, *_ = sort_records(people, fields=parse_key_spec("city,-age"), engine=engine)
+
+    assert result == _expected(people, lambda p: (p["city"], -p["age"]))
+
+
+@pytest.mark.parametrize("sort", [quick_sort_comparison,
+                                  lambda a: bubble_sort_comparison(a, BUBBLE_CLASSIC)])
+def test_comparison_sorts_are_stable_on_decorated_keys(sort):
+    people = _people()
+    decorated = decorate(people, fields=parse_key_spec("-city"))
+
+    result = undecorate(people, sort(decorated.tolist())[0])
+
+    assert result == _expected(people, lambda p: p["city"], reverse=True)
+
+
+def test_csv_round_trip_keeps_cell_text(tmp_path):
+    text = "zip,name\n02134,a\n00501,b\n1e3,c\n,d\n10,e\n 7 ,f\nn/a,g\n"
+    records = parse_records(text, "csv")
+
+    result, *_ = sort_records(records, fields=parse_key_spec("zip"))
+    path = write_records(result, str(tmp_path / "out.csv"))
+
+    # Numbers by value, then text, then blanks; cells come back unchanged
+    assert [r["name"] for r in result] == ["f", "e", "b", "c", "a", "g", "d"]
+    with open(path, encoding="utf-8", newline="") as f:
+        written = f.read().replace("\r\n", "\n")
+    assert written == "zip,name\n 7 ,f\n10,e\n00501,b\n1e3,c\n02134,a\nn/a,g\n,d\n"
+
+
+def test_mixed_json_values_have_a_deterministic_order():
+    records = [{"v": "x"}, {"v": None}, {"v": 3}, {"v": "2.5"}, {"v": [1]}, {"v": ""}, {"v": 1}]
+
+    result, *_ = sort_records(records, fields=parse_key_spec("v"))
+
+    assert [r["v"] for r in result] == [1, "2.5", 3, "x", [1], None, ""]
+
+
+def test_digit_field_names_are_dict_keys_and_list_indexes():
+    fields = parse_key_spec("-2024")
+    assert fields == [("2024", True)]
+
+    records = parse_records("name,2024\na,1\nb,3\nc,2\n", "csv")
+    result, *_ = sort_records(records, fields=fields)
+    assert [record["name"] for record in result] == ["b", "c", "a"]
+
+    rows = [["a", 1], ["b", 3], ["c", 2]]
+    result, *_ = sort_records(rows, fields=parse_key_spec("1"))
+    assert [row[0] for row in result] == ["a", "c", "b"]
+
+    with pytest.raises(ValueError, match="has no field 'x'"):
+        sort_records(rows, fields=parse_key_spec("x"))
+
+
+def test_csv_rows_with_extra_cells_are_rejected():
+    with pytest.raises(ValueError, match="CSV line 3 has 3 cells but the header names 2"):
+        parse_records("a,b\n1,2\n3,4,5\n", "csv")
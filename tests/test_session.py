@@ -0,0 +1,55 @@
+"""
+An online session's counters equal sort_metrics on everything it has received.
+"""
+
+import random
+
+import pytest
+
+from sortlab import InsertionSession, session_append, sort_metrics, sort_with_steps
+
+
+def _batches(seed):
+    rng = random.Random(seed)
+    return [[rng.randint(-20, 20) for _ in range(rng.randint(1, 15))] for _ in range(12)]
+
+
+def _totals(session):
+    return session.comparisons, session.moves, session.accesses
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("record", [True, False])
+def test_totals_match_sort_metrics(seed, record):
+    session = InsertionSession()
+    received = []
+    for batch in _batches(seed):
+        session.extend(batch, record)
+        received.extend(batch)
+
+        expected = sort_metrics(received, "linear")
+        assert session.sorted == expected[0]
+        assert _totals(session) == expected[1:]
+
+    # The closed form agrees with actually stepping through the sort
+    assert _totals(session) == tuple(sort_with_steps(received, "linear")[2:])
+
+
+@pytest.mark.parametrize("values", [[], [7], [1, 2, 3], [3, 2, 1], [2, 2, 2], [5, 1, 4, 1, 5]])
+def test_single_appends_and_initial_values(values):
+    one_by_one = InsertionSession()
+    for value in values:
+        one_by_one.append(value)
+
+    assert _totals(one_by_one) == sort_metrics(values, "linear")[1:]
+    assert _totals(InsertionSession(values)) == _totals(one_by_one)
+
+
+def test_session_append_counts_the_whole_input():
+    session, _, _ = session_append(None, "5, 3, 8")
+    session, _, _ = session_append(session, "1 9\n2")
+
+    assert _totals(session) == sort_metrics([5, 3, 8, 1, 9, 2], "linear")[1:]
+    assert session.to_dict()["insertion"] == dict(zip(
+        ("comparisons", "moves", "accesses"), sort_metrics([5, 3, 8, 1, 9, 2], "linear")[1:]
+    ))
@@ -0,0 +1,113 @@
+"""
+Binary trace files round-trip, and damaged ones fail with ValueError.
+"""
+
+import json
+import random
+import struct
+
+import pytest
+
+from sortlab import (
+    TRACEFILE_CODECS,
+    RequestLimits,
+    TraceFile,
+    lab,
+    load_trace,
+    render_player,
+    render_trace_page,
+    render_trace_page_for_i,
+    sort_with_steps,
+    write_trace,
+)
+from sortlab.cli import main
+
+
+def _steps(n=60, seed=0):
+    rng = random.Random(seed)
+    return sort_with_steps([rng.randint(-50, 50) for _ in range(n)], "linear")[1]
+
+
+@pytest.mark.parametrize("codec", TRACEFILE_CODECS)
+def test_round_trip(tmp_path, codec):
+    steps = _steps()
+    path = tmp_path / "run.sltrace"
+    write_trace(steps, str(path), codec, block_steps=64, metadata={"engine": "linear"})
+
+    loaded, metadata = load_trace(str(path))
+
+    assert metadata == {"engine": "linear"}
+    assert len(loaded) == len(steps)
+    assert [loaded[k] for k in range(len(loaded))] == [steps[k] for k in range(len(steps))]
+
+
+def test_unknown_codec_id(tmp_path):
+    path = tmp_path / "run.sltrace"
+    write_trace(_steps(), str(path))
+    data = bytearray(path.read_bytes())
+    data[10] = len(TRACEFILE_CODECS)  # codec byte after the magic and version
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="unknown codec id"):
+        TraceFile(str(path))
+
+
+@pytest.mark.parametrize("codec", TRACEFILE_CODECS)
+def test_corrupt_block(tmp_path, codec):
+    path = tmp_path / "run.sltrace"
+    write_trace(_steps(), str(path), codec, block_steps=64)
+    data = bytearray(path.read_bytes())
+    index_offset, _, _ = struct.unpack_from("<QI8s", data, len(data) - 20)
+    offset, length = struct.unpack_from("<QQ", data, index_offset + 16)
+    data[offset:offset + length] = b"\xff" * length
+    path.write_bytes(bytes(data))
+
+    with TraceFile(str(path)) as trace:
+        trace[0]
+        with pytest.raises(ValueError, match="corrupt trace block 1"):
+            trace[64]
+
+
+def test_trace_file_pages_and_plays_like_the_steplog(tmp_path):
+    steps = _steps()
+    path = tmp_path / "run.sltrace"
+    write_trace(steps, str(path), block_steps=64)
+
+    with TraceFile(str(path)) as trace:
+        assert render_trace_page(trace, 150, 40) == render_trace_page(steps, 150, 40)
+        assert render_trace_page_for_i(trace, 30) == render_trace_page_for_i(steps, 30)
+        assert render_player(trace) == render_player(steps)
+        with pytest.raises(ValueError):
+            trace.first_step_for(10_000)
+
+
+def test_trace_file_admission():
+    limits = RequestLimits(max_trace_elements=100, max_trace_file_bytes=1000)
+
+    limits.check_trace_file(1000, 100, 4096)
+    with pytest.raises(ValueError, match="byte upload limit"):
+        limits.check_trace_file(1001, 100, 4096)
+    with pytest.raises(ValueError, match="element trace limit"):
+        limits.check_trace_file(1000, 101, 4096)
+    with pytest.raises(ValueError, match="step limit"):
+        limits.check_trace_file(1000, 100, 1 << 20)
+
+
+def test_cli_saves_the_steps_of_the_analysis(tmp_path, monkeypatch, capsys):
+    source = tmp_path / "input.txt"
+    source.write_text("5, 2, 9, 1, 7")
+    path = tmp_path / "run.sltrace"
+    calls = []
+
+    def counting_sort(*args, **kwargs):
+        calls.append(args[0])
+        return sort_with_steps(*args, **kwargs)
+
+    monkeypatch.setattr(lab, "sort_with_steps", counting_sort)
+    assert main([str(source), "--save-trace", str(path)]) == 0
+
+    data = json.loads(capsys.readouterr().out)
+    steps, metadata = load_trace(str(path))
+    assert len(calls) == 1
+    assert data["trace_file"]["steps"] == len(steps) == data["trace"]["steps"]
+    assert metadata["source"] == str(source)
@@ -0,0 +1,76 @@
+"""
+Comparison runs reuse long-lived worker slots and recycle only the ones that timed out.
+"""
+
+import os
+import random
+import time
+
+import pytest
+
+from sortlab import (
+    COMPARISON_PARALLEL_MIN_SIZE,
+    WorkerPool,
+    bubble_sort_comparison,
+    quick_sort_comparison,
+    start_comparisons,
+)
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(size=4)
+    yield pool
+    pool.shutdown()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A killed child stays a zombie until its executor reaps it
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_finished_runs_hand_their_slots_back(pool):
+    arr = random.Random(1).sample(range(10_000), COMPARISON_PARALLEL_MIN_SIZE)
+
+    first = start_comparisons(arr, pool=pool)
+    slots = set(first.slots.values())
+    results = first.results()
+
+    assert results == {"bubble": bubble_sort_comparison(arr)[1:], "quick": quick_sort_comparison(arr)[1:]}
+    assert not first.timed_out
+
+    second = start_comparisons(arr, pool=pool)
+    assert set(second.slots.values()) == slots
+    assert second.results() == results
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc to inspect workers")
+def test_timeout_recycles_only_the_busy_workers(pool):
+    slow = start_comparisons(list(range(20_000, 0, -1)), pool=pool)
+    bubble, quick = slow.slots["bubble"], slow.slots["quick"]
+    while not bubble.pid.value:
+        time.sleep(0.01)
+    pid = bubble.pid.value
+
+    results = slow.results(timeout=0.05)
+
+    assert slow.timed_out
+    assert results["bubble"] == (None, None)
+    deadline = time.monotonic() + 5
+    while _alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not _alive(pid)
+    assert bubble not in pool._idle
+    # The quicksort may have finished in time; its slot is then kept warm
+    assert (quick in pool._idle) is (results["quick"] != (None, None))
+
+    arr = list(range(COMPARISON_PARALLEL_MIN_SIZE, 0, -1))
+    assert start_comparisons(arr, pool=pool).results()["quick"] == quick_sort_comparison(arr)[1:]